@@ -0,0 +1,411 @@
+"""
+Процедурный кампус: здания, этажи и блоки комнат из сида.
+
+План кампуса (здания, число этажей и блоков) вычисляется из сида сразу,
+но это лишь несколько чисел на здание. Комнаты генерируются по блокам
+(чанкам) - прямоугольникам этажа CHUNK_WIDTH x CHUNK_HEIGHT с коридором
+и двумя рядами комнат. Каждый блок выводится из сида и своего ключа
+(здание, этаж, столбец, ряд) собственным генератором случайных чисел,
+поэтому его можно сгенерировать в любой момент, выбросить и получить
+заново точно таким же, вместе с ID комнат. Блоки подгружаются, когда они
+нужны работнику или попадают в область вида, и вытесняются по LRU, если
+они не закреплены и в них нет работников и событий.
+
+Этажи одного здания раскладываются на плоскости в ряд, как листы
+поэтажного плана, так что остальной код работает с обычными
+координатами (x, y).
+"""
+
+import bisect
+import math
+import random
+from collections import OrderedDict
+from typing import Iterator, NamedTuple, Optional
+
+from models import Room, RoomType
+
+# Размер блока комнат (в единицах офиса)
+CHUNK_WIDTH = 400
+CHUNK_HEIGHT = 240
+# Зазор между этажами здания на плане и между зданиями
+FLOOR_GAP = 40
+BUILDING_GAP = 120
+# Диапазон числа зданий, если оно не задано явно
+CAMPUS_BUILDINGS = (4, 12)
+# Наибольшее число этажей здания
+CAMPUS_MAX_FLOORS = 6
+# Диапазоны числа блоков этажа по x и по y
+FLOOR_BLOCKS_X = (2, 4)
+FLOOR_BLOCKS_Y = (1, 3)
+# Сколько блоков держать в памяти (закрепленные и занятые не вытесняются)
+CAMPUS_CHUNK_CACHE_SIZE = 256
+# Рабочих мест в одном офисе блока
+OFFICE_SEATS = 4
+# Запас ID на блок: ID комнаты = номер блока * запас + порядковый номер
+MAX_ROOMS_PER_CHUNK = 32
+# Блок со входом в кампус: первый этаж первого здания
+ENTRANCE_CHUNK = (0, 0, 0, 0)
+
+# Коридор блока: отступ от краев, смещение от верха и ширина
+CORRIDOR_MARGIN = 10
+CORRIDOR_OFFSET = 110
+CORRIDOR_WIDTH = 20
+# Зазор между комнатой и коридором
+ROOM_GAP = 5
+
+
+class Building(NamedTuple):
+    """Здание кампуса: левый верхний угол плана и размеры в блоках"""
+
+    x: int
+    y: int
+    floors: int
+    blocks_x: int
+    blocks_y: int
+
+    @property
+    def floor_width(self) -> int:
+        return self.blocks_x * CHUNK_WIDTH
+
+    @property
+    def width(self) -> int:
+        """Ширина плана здания со всеми этажами"""
+        return self.floors * (self.floor_width + FLOOR_GAP) - FLOOR_GAP
+
+    @property
+    def height(self) -> int:
+        return self.blocks_y * CHUNK_HEIGHT
+
+    @property
+    def chunk_count(self) -> int:
+        return self.floors * self.blocks_x * self.blocks_y
+
+    def floor_x(self, floor: int) -> int:
+        """Левая граница этажа на плане"""
+        return self.x + floor * (self.floor_width + FLOOR_GAP)
+
+
+class CampusGenerator:
+    """
+    Генератор кампуса с ленивой подгрузкой блоков комнат.
+
+    Совместим с OfficeGenerator: generate() возвращает список комнат, но
+    только загруженных блоков (сначала - блока со входом). Список rooms
+    заменяется новым при каждой подгрузке или вытеснении, поэтому смену
+    планировки можно заметить по идентичности списка.
+    """
+
+    entrance_chunk = ENTRANCE_CHUNK
+    # Кампус не кэшируется целиком (см. layout_cache): индексы комнат
+    # строятся по загруженным блокам
+    layout = None
+
+    def __init__(
+        self,
+        seed=None,
+        buildings: Optional[int] = None,
+        max_floors: int = CAMPUS_MAX_FLOORS,
+        max_chunks: int = CAMPUS_CHUNK_CACHE_SIZE,
+    ):
+        """
+        Args:
+            seed: Сид кампуса (случайный, если не указан)
+            buildings: Число зданий (по умолчанию выводится из сида)
+            max_floors: Наибольшее число этажей здания
+            max_chunks: Сколько блоков держать в памяти
+        """
+        self.seed = seed or random.randint(1, 1000000)
+        # Настройки в том виде, в каком заданы: по ним снимок (snapshot.py)
+        # пересоздает тот же план кампуса
+        self.options = {
+            'buildings': buildings,
+            'max_floors': max_floors,
+            'max_chunks': max_chunks,
+        }
+        self.max_floors = max_floors
+        self.max_chunks = max_chunks
+        self.buildings: list[Building] = []
+        # Номер первого блока каждого здания в сквозной нумерации
+        self._chunk_offsets: list[int] = []
+        self.chunk_count = 0
+        self._plan(buildings)
+
+        # Загруженные блоки в порядке последнего использования
+        self._chunks: OrderedDict[tuple, list[Room]] = OrderedDict()
+        # Блоки, которые нельзя вытеснять (например, рабочие места)
+        self.pinned: set[tuple] = set()
+        self.rooms: list[Room] = []
+        # Заполнение рабочих мест: (сквозной номер блока, занято мест)
+        self.home_cursor = (0, 0)
+        # Счетчики генерации и вытеснения блоков
+        self.generated = 0
+        self.evicted = 0
+
+    def _plan(self, buildings: Optional[int]) -> None:
+        """Разложить здания кампуса рядами"""
+        rng = random.Random(f'{self.seed}:campus')
+        count = buildings or rng.randint(*CAMPUS_BUILDINGS)
+        per_row = math.ceil(math.sqrt(count))
+        x = y = row_height = 0
+        for i in range(count):
+            if i and i % per_row == 0:
+                x = 0
+                y += row_height + BUILDING_GAP
+                row_height = 0
+            building = Building(
+                x,
+                y,
+                rng.randint(1, self.max_floors),
+                rng.randint(*FLOOR_BLOCKS_X),
+                rng.randint(*FLOOR_BLOCKS_Y),
+            )
+            self.buildings.append(building)
+            self._chunk_offsets.append(self.chunk_count)
+            self.chunk_count += building.chunk_count
+            x += building.width + BUILDING_GAP
+            row_height = max(row_height, building.height)
+
+    @property
+    def bounds(self) -> tuple[int, int, int, int]:
+        """(x, y, ширина, высота) всего кампуса"""
+        width = max(b.x + b.width for b in self.buildings)
+        height = max(b.y + b.height for b in self.buildings)
+        return 0, 0, width, height
+
+    @property
+    def loaded_chunks(self) -> list[tuple]:
+        """Ключи загруженных блоков в порядке последнего использования"""
+        return list(self._chunks)
+
+    def generate(self) -> list[Room]:
+        """Начать кампус заново: загружен только блок со входом"""
+        self._chunks.clear()
+        self.pinned = {ENTRANCE_CHUNK}
+        self.home_cursor = (0, 0)
+        self.generated = 0
+        self.evicted = 0
+        self.rooms = []
+        self.load_chunk(ENTRANCE_CHUNK)
+        return self.rooms
+
+    def restore(self, keys: list[tuple], rooms: list[Room]) -> None:
+        """
+        Восстановить загруженные блоки из готовых комнат (см. snapshot.py)
+
+        keys - ключи блоков в порядке последнего использования, rooms -
+        список комнат кампуса; блок комнаты определяется по ее ID.
+        """
+        chunks: dict[int, list[Room]] = {}
+        for room in rooms:
+            index = (room.id - 1) // MAX_ROOMS_PER_CHUNK
+            chunks.setdefault(index, []).append(room)
+        self._chunks = OrderedDict(
+            (key, chunks.get(self.chunk_index(key), [])) for key in keys
+        )
+        self.rooms = rooms
+
+    def chunk_index(self, key: tuple) -> int:
+        """Сквозной номер блока"""
+        building_id, floor, block_x, block_y = key
+        building = self.buildings[building_id]
+        return (
+            self._chunk_offsets[building_id]
+            + (floor * building.blocks_y + block_y) * building.blocks_x
+            + block_x
+        )
+
+    def chunk_key(self, index: int) -> tuple:
+        """Ключ блока по сквозному номеру"""
+        building_id = bisect.bisect_right(self._chunk_offsets, index) - 1
+        building = self.buildings[building_id]
+        index -= self._chunk_offsets[building_id]
+        floor, index = divmod(index, building.blocks_x * building.blocks_y)
+        block_y, block_x = divmod(index, building.blocks_x)
+        return building_id, floor, block_x, block_y
+
+    def assign_home(self) -> tuple:
+        """
+        Блок для рабочего места нового работника
+
+        Блоки заполняются по порядку сквозной нумерации, пока в их офисах
+        есть места (OFFICE_SEATS на офис), поэтому число загруженных блоков
+        определяется числом работников. Блок закрепляется до подгрузки,
+        чтобы она не вытеснила его самого. Когда места кончаются во всем
+        кампусе, заполнение начинается с первого блока.
+        """
+        index, seats = self.home_cursor
+        while True:
+            key = self.chunk_key(index)
+            self.pinned.add(key)
+            capacity = OFFICE_SEATS * sum(
+                room.room_type == RoomType.OFFICE
+                for room in self.load_chunk(key)
+            )
+            if seats < capacity:
+                self.home_cursor = (index, seats + 1)
+                return key
+            index = (index + 1) % self.chunk_count
+            seats = 0
+
+    def chunk_origin(self, key: tuple) -> tuple[int, int]:
+        """Левый верхний угол блока"""
+        building_id, floor, block_x, block_y = key
+        building = self.buildings[building_id]
+        return (
+            building.floor_x(floor) + block_x * CHUNK_WIDTH,
+            building.y + block_y * CHUNK_HEIGHT,
+        )
+
+    def chunks_in_rect(
+        self, x: float, y: float, width: float, height: float
+    ) -> Iterator[tuple]:
+        """Ключи блоков, пересекающих прямоугольник (без генерации)"""
+        x1 = x + width
+        y1 = y + height
+        for building_id, building in enumerate(self.buildings):
+            if (
+                building.x >= x1
+                or building.x + building.width <= x
+                or building.y >= y1
+                or building.y + building.height <= y
+            ):
+                continue
+            row0 = max(0, int((y - building.y) // CHUNK_HEIGHT))
+            row1 = min(
+                building.blocks_y - 1, int((y1 - building.y) // CHUNK_HEIGHT)
+            )
+            for floor in range(building.floors):
+                floor_x = building.floor_x(floor)
+                if floor_x >= x1 or floor_x + building.floor_width <= x:
+                    continue
+                col0 = max(0, int((x - floor_x) // CHUNK_WIDTH))
+                col1 = min(
+                    building.blocks_x - 1, int((x1 - floor_x) // CHUNK_WIDTH)
+                )
+                for block_y in range(row0, row1 + 1):
+                    for block_x in range(col0, col1 + 1):
+                        yield building_id, floor, block_x, block_y
+
+    def load_chunk(self, key: tuple) -> list[Room]:
+        """Комнаты блока: из кэша или сгенерированные заново"""
+        rooms = self._chunks.get(key)
+        if rooms is not None:
+            self._chunks.move_to_end(key)
+            return rooms
+
+        rooms = self._chunks[key] = self._generate_chunk(key)
+        self._chunks_changed()
+        return rooms
+
+    def load_rect(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        limit: Optional[int] = None,
+    ) -> int:
+        """
+        Подгрузить блоки, пересекающие прямоугольник (например, область вида)
+
+        Args:
+            limit: Наибольшее число блоков (по умолчанию половина кэша)
+
+        Returns:
+            Количество новых блоков
+        """
+        if limit is None:
+            limit = self.max_chunks // 2
+        loaded = 0
+        for i, key in enumerate(self.chunks_in_rect(x, y, width, height)):
+            if i >= limit:
+                break
+            rooms = self._chunks.get(key)
+            if rooms is not None:
+                self._chunks.move_to_end(key)
+                continue
+            self._chunks[key] = self._generate_chunk(key)
+            loaded += 1
+
+        if loaded:
+            self._chunks_changed()
+        return loaded
+
+    def _chunks_changed(self) -> None:
+        """Вытеснить лишние блоки и собрать новый список комнат"""
+        self._evict()
+        self.rooms = [
+            room for chunk in self._chunks.values() for room in chunk
+        ]
+
+    def _evict(self) -> None:
+        """Вытеснить давно не использованные свободные блоки"""
+        excess = len(self._chunks) - self.max_chunks
+        if excess <= 0:
+            return
+        for key in [
+            key
+            for key, rooms in self._chunks.items()
+            if key not in self.pinned
+            and not any(room.occupants or room.events for room in rooms)
+        ][:excess]:
+            del self._chunks[key]
+            self.evicted += 1
+
+    def _generate_chunk(self, key: tuple) -> list[Room]:
+        """Сгенерировать комнаты блока: коридор и ряды комнат по бокам"""
+        building_id, floor, block_x, block_y = key
+        rng = random.Random(
+            f'{self.seed}:{building_id}:{floor}:{block_x}:{block_y}'
+        )
+        x0, y0 = self.chunk_origin(key)
+        corridor_y = y0 + CORRIDOR_OFFSET
+        rooms = [
+            Room(
+                RoomType.CORRIDOR,
+                x0 + CORRIDOR_MARGIN,
+                corridor_y,
+                CHUNK_WIDTH - 2 * CORRIDOR_MARGIN,
+                CORRIDOR_WIDTH,
+            )
+        ]
+
+        # Места комнат рядами над коридором и под ним
+        places = []
+        for above in (True, False):
+            x = x0 + CORRIDOR_MARGIN + rng.randint(0, 20)
+            while True:
+                room_width = rng.randint(50, 90)
+                room_height = rng.randint(60, 95)
+                if x + room_width > x0 + CHUNK_WIDTH - CORRIDOR_MARGIN:
+                    break
+                if above:
+                    y = corridor_y - room_height - ROOM_GAP
+                else:
+                    y = corridor_y + CORRIDOR_WIDTH + ROOM_GAP
+                places.append((x, y, room_width, room_height))
+                x += room_width + rng.randint(5, 15)
+
+        # В каждом блоке есть переговорная, кухня и туалет, у входа в
+        # здание - ресепшн, остальные комнаты - офисы
+        room_types = [
+            RoomType.MEETING_ROOM,
+            RoomType.KITCHEN,
+            RoomType.RESTROOM,
+        ]
+        if floor == 0 and block_x == 0 and block_y == 0:
+            room_types.append(RoomType.RECEPTION)
+        room_types += [RoomType.OFFICE] * (len(places) - len(room_types))
+        rng.shuffle(room_types)
+        rooms.extend(
+            Room(room_type, *place)
+            for room_type, place in zip(room_types, places)
+        )
+
+        # ID зависят только от положения блока в кампусе
+        first_id = self.chunk_index(key) * MAX_ROOMS_PER_CHUNK + 1
+        for room_id, room in enumerate(rooms, first_id):
+            room.id = room_id
+
+        self.generated += 1
+        return rooms
@@ -3,7 +3,7 @@
 """
 
 import pygame
-from models import RoomType
+from models import Department, RoomType
 
 # Инициализация pygame
 pygame.init()
@@ -32,6 +32,15 @@ ROOM_COLORS = {
     RoomType.RECEPTION: (255, 220, 220),    # Светло-красный
 }
 
+# Цвета работников по отделам
+DEPARTMENT_COLORS = {
+    Department.ENGINEERING: BLUE,
+    Department.MARKETING: GREEN,
+    Department.MANAGEMENT: PURPLE,
+    Department.HR: YELLOW,
+    Department.SUPPORT: ORANGE,
+}
+
 # Размеры экрана
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 800
@@ -42,6 +51,13 @@ SPEED_MULTIPLIER_1 = 1  # Множитель для клавиши 1
 SPEED_MULTIPLIER_2 = 10  # Множитель для клавиши 2
 SPEED_MULTIPLIER_3 = 100  # Множитель для клавиши 3
 
+# Фиксированный шаг симуляции: за кадр выполняется столько шагов по
+# SIM_STEP_MINUTES, сколько минут накопилось, но не дольше бюджета кадра
+SIM_STEP_MINUTES = 1  # Длительность одного шага симуляции (минут)
+SIM_FRAME_BUDGET_MS = 20  # Бюджет времени кадра на шаги симуляции (мс)
+MAX_FRAME_TIME_MS = 250  # Предел учитываемой длительности кадра (мс)
+SIM_MAX_BACKLOG_FRAMES = 30  # Предел отставания в кадрах при догонянии
+
 # Константы для меток скорости
 SPEED_SLOW_LABEL = "Медленно"
 SPEED_NORMAL_LABEL = "Нормально"
@@ -60,11 +76,24 @@ SCROLL_SPEED = 10
 INFO_PANEL_WIDTH = 300
 WORKER_CIRCLE_RADIUS = 6
 SELECTED_WORKER_CIRCLE_RADIUS = 8
+WORKER_HIT_RADIUS = 10  # Радиус выбора работника кликом (в единицах офиса)
 PROGRESS_BAR_WIDTH = 20
 TASK_PANEL_WIDTH = 300
 TASK_PANEL_HEIGHT = 400
 MAX_TASKS_DISPLAYED = 15
 
+# Уровень детализации: при слишком мелком масштабе или больше чем
+# WORKER_LOD_MAX_SPRITES видимых работниках вместо значков рисуются точки
+# плотности; 10 тысяч значков укладываются в кадр при 30 FPS
+WORKER_LOD_MAX_SPRITES = 20000  # Максимум значков работников в кадре
+WORKER_LOD_MIN_RADIUS = 2  # Минимальный радиус значка в пикселях
+DENSITY_CELL_SIZE = 8  # Размер ячейки сетки плотности в пикселях
+DENSITY_COLOR = (60, 60, 160)  # Цвет точек плотности
+
+# Частичный вывод кадра: при большем числе изменившихся областей
+# выводится вся область офиса
+MAX_DIRTY_RECTS = 256
+
 # Параметры симуляции
 DEFAULT_WORKER_COUNT = 8
 FPS = 30
@@ -0,0 +1,257 @@
+"""
+Событийный режим симуляции офиса.
+
+Вместо фиксированных минутных тиков все будущие события (завершение
+заданий, приход работников, конец дня в 18:00 и проверки сценариев)
+кладутся в очередь с приоритетом, и часы перескакивают сразу к ближайшему
+событию. Погода, как и в тиковом режиме, за прогон не меняется.
+Перемещение работников вычисляется по требованию: положение на момент
+события находится в замкнутом виде из времени, прошедшего с прошлого
+пересчета.
+"""
+
+import heapq
+import itertools
+import math
+from typing import Any, Optional
+
+from models import OfficeSimulation, Position, TaskStatus, Worker
+
+# Рабочий день в минутах: с 8:00 до 18:00
+DAY_START = 8 * 60
+DAY_END = 18 * 60
+DAY_LENGTH = DAY_END - DAY_START
+
+# Вероятность проверки случайных сценариев за минуту (как в тиковом режиме)
+SCENARIO_CHECK_PROBABILITY = 0.05
+
+# Типы событий в порядке обработки при совпадении времени
+EVENT_DAY_END = 0
+EVENT_ARRIVAL = 1
+EVENT_TASK_DONE = 2
+EVENT_SCENARIO_CHECK = 3
+
+
+class EventDrivenSimulation:
+    """
+    Событийный драйвер для OfficeSimulation.
+
+    Время событий хранится в абсолютных минутах рабочего времени с начала
+    прогона (ночь не учитывается, как и в тиковом режиме).
+    """
+
+    def __init__(
+        self,
+        simulation: OfficeSimulation,
+        scenario_check_probability: float = SCENARIO_CHECK_PROBABILITY,
+    ):
+        if simulation.worker_state is not None:
+            raise ValueError(
+                'Событийный режим несовместим с векторизованным движком'
+            )
+
+        self.simulation = simulation
+        self.scenario_check_probability = scenario_check_probability
+        self.queue: list[tuple[float, int, int, Any]] = []
+        self._sequence = itertools.count()
+        self.now = (simulation.day - 1) * DAY_LENGTH + (
+            simulation.time - DAY_START
+        )
+        self.events_processed = 0
+
+        # Момент последнего пересчета положения каждого работника
+        self._settled_at: dict[int, float] = {}
+        # Свободные работники (кроме охраны), ожидающие заданий
+        self._idle: dict[int, Worker] = {}
+
+        for worker in simulation.workers.values():
+            self._settled_at[id(worker)] = self.now
+            if worker.position != Position.SECURITY:
+                if worker.current_task is None:
+                    self._idle[id(worker)] = worker
+                else:
+                    self._schedule_task(worker)
+
+        self._schedule(self._day_end_time(), EVENT_DAY_END)
+        self._schedule_scenario_check()
+        self._assign_idle()
+
+    def _schedule(self, time: float, kind: int, payload: Any = None) -> None:
+        """Положить событие в очередь"""
+        heapq.heappush(self.queue, (time, kind, next(self._sequence), payload))
+
+    def _day_end_time(self) -> float:
+        """Абсолютное время конца текущего дня"""
+        return self.simulation.day * DAY_LENGTH
+
+    def _schedule_task(self, worker: Worker) -> None:
+        """Запланировать завершение текущего задания работника"""
+        task = worker.current_task
+        self._schedule(
+            self.now + max(0, task.duration - task.progress),
+            EVENT_TASK_DONE,
+            (worker, task),
+        )
+
+    def _schedule_scenario_check(self) -> None:
+        """Запланировать следующую проверку сценариев (геометрический интервал)"""
+        p = self.scenario_check_probability
+        if p <= 0:
+            return
+        if p >= 1:
+            delay = 1
+        else:
+            u = self.simulation.rng.random()
+            delay = int(math.log(1.0 - u) / math.log(1.0 - p)) + 1
+        self._schedule(self.now + delay, EVENT_SCENARIO_CHECK)
+
+    def run_until(
+        self, time: float, last_kind: int = EVENT_SCENARIO_CHECK
+    ) -> None:
+        """
+        Обработать все события до указанного абсолютного времени
+
+        Args:
+            last_kind: Последний обрабатываемый тип события в момент time
+                (события одного момента идут в порядке типов)
+        """
+        while self.queue and self.queue[0][:2] <= (time, last_kind):
+            event_time, kind, _, payload = heapq.heappop(self.queue)
+            self._advance_clock(event_time)
+            self._dispatch(kind, payload)
+            self.events_processed += 1
+        self._advance_clock(max(self.now, time))
+
+    def run_days(self, days: int) -> None:
+        """
+        Прогнать указанное число рабочих дней
+
+        Прогон останавливается на конце последнего дня, до прихода
+        работников: сводка дня, как и в тиковом режиме, видит пул заданий
+        до утренней раздачи.
+        """
+        self.run_until(
+            self._day_end_time() + (days - 1) * DAY_LENGTH, EVENT_DAY_END
+        )
+
+    def settle_all(self) -> None:
+        """Пересчитать положения всех работников на текущий момент"""
+        for worker in self.simulation.workers.values():
+            self._settle(worker)
+
+    def _advance_clock(self, time: float) -> None:
+        """Перевести часы симуляции"""
+        self.now = time
+        day_start = (self.simulation.day - 1) * DAY_LENGTH
+        self.simulation.time = DAY_START + (time - day_start)
+
+    def _settle(self, worker: Worker) -> None:
+        """Догнать перемещение работника до текущего момента"""
+        elapsed = self.now - self._settled_at.get(id(worker), self.now)
+        self._settled_at[id(worker)] = self.now
+        if not worker.is_at_office:
+            return
+        if elapsed > 0:
+            worker._move(elapsed)
+
+        room = self.simulation.room_index.find_room(worker.x, worker.y)
+        if room is not worker.current_room:
+            self.simulation._set_worker_room(worker, room)
+
+    def _dispatch(self, kind: int, payload: Any) -> None:
+        """Обработать одно событие"""
+        if kind == EVENT_TASK_DONE:
+            self._on_task_done(*payload)
+        elif kind == EVENT_DAY_END:
+            self._on_day_end()
+        elif kind == EVENT_ARRIVAL:
+            self._on_arrival()
+        elif kind == EVENT_SCENARIO_CHECK:
+            self._on_scenario_check()
+
+    def _on_task_done(self, worker: Worker, task) -> None:
+        """Завершить задание (если событие не устарело)"""
+        if worker.current_task is not task:
+            return
+
+        self._settle(worker)
+        if task.status == TaskStatus.IN_PROGRESS:
+            worker._update_task(task.duration - task.progress)
+        else:
+            # Общее задание уже сдал другой исполнитель: работник
+            # получает тот же итог и освобождается, как в тиковом режиме
+            worker._update_task(0)
+        if worker.current_task is not task:
+            self.simulation._record_task_result(worker, task)
+            self.simulation._invalidate_average_productivity()
+        if worker.pending_failed_tasks:
+            self.simulation._process_failed_tasks(worker)
+
+        if worker.current_task is None:
+            self._idle[id(worker)] = worker
+        self._assign_idle()
+
+    def _on_day_end(self) -> None:
+        """Конец рабочего дня: работники уходят, утром приходят снова"""
+        for worker in self.simulation.workers.values():
+            self._settle(worker)
+
+        self.simulation._roll_over_day()
+        # Положение после ухода задано явно, догонять его не нужно
+        for worker in self.simulation.workers.values():
+            self._settled_at[id(worker)] = self.now
+
+        self._schedule(self.now, EVENT_ARRIVAL)
+        self._schedule(self._day_end_time(), EVENT_DAY_END)
+
+    def _on_arrival(self) -> None:
+        """Приход работников в офис"""
+        self.simulation.start_day()
+        for worker in self.simulation.workers.values():
+            self._settled_at[id(worker)] = self.now
+            if (
+                worker.position != Position.SECURITY
+                and worker.current_task is None
+            ):
+                self._idle[id(worker)] = worker
+        self._assign_idle()
+
+    def _on_scenario_check(self) -> None:
+        """Проверка случайных сценариев"""
+        self.simulation.check_random_scenarios()
+        # Сценарии назначают задания свободным работникам напрямую
+        self._assign_idle(from_pool=False)
+        self._assign_idle()
+        self._schedule_scenario_check()
+
+    def _assign_idle(self, from_pool: bool = True) -> None:
+        """
+        Раздать задания из пула свободным работникам
+
+        Args:
+            from_pool: Если False, только запланировать завершение заданий,
+                уже назначенных в обход пула (например, сценарием)
+        """
+        pool = self.simulation.available_tasks
+        for key, worker in list(self._idle.items()):
+            if from_pool and not pool:
+                break
+            if not worker.is_at_office:
+                continue
+            if from_pool and worker.current_task is None:
+                self._settle(worker)
+                self.simulation._try_assign_task(worker)
+            if worker.current_task is not None:
+                del self._idle[key]
+                self._schedule_task(worker)
+
+
+def run_event_driven(
+    seed: Optional[int], days: int, worker_count: int = 10
+) -> EventDrivenSimulation:
+    """Создать симуляцию и прогнать ее в событийном режиме"""
+    simulation = OfficeSimulation(seed)
+    simulation.initialize(worker_count=worker_count)
+    engine = EventDrivenSimulation(simulation)
+    engine.run_days(days)
+    return engine
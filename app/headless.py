@@ -0,0 +1,249 @@
+"""
+Запуск симуляции без pygame.
+
+Модуль не импортирует pygame и constants, поэтому подходит для пакетных
+прогонов: симуляция крутится в плотном цикле без ограничения FPS.
+"""
+
+import argparse
+import logging
+import random
+import time
+from typing import Any, Optional
+
+from event_scheduler import EventDrivenSimulation
+from journal import EventJournal
+from layout_cache import LAYOUT_CACHE
+from models import OfficeSimulation
+from scenario_loader import SCENARIO_CACHE
+from worker_stats import TaskHistoryArchive
+
+# Длительность одного шага симуляции (минут)
+HEADLESS_STEP_MINUTES = 1
+
+
+def summarize_day(
+    simulation: OfficeSimulation, completed: int, failed: int
+) -> dict[str, Any]:
+    """Собрать сводку по завершенному дню"""
+    workers = list(simulation.workers.values())
+    avg_mood = (
+        sum(w.mood for w in workers) / len(workers) if workers else 0.0
+    )
+    return {
+        'day': simulation.day - 1,
+        'completed': completed,
+        'failed': failed,
+        'avg_mood': avg_mood,
+        'pending_tasks': len(simulation.available_tasks),
+    }
+
+
+def run_headless(
+    seed: Optional[int] = None,
+    days: int = 1,
+    worker_count: int = 10,
+    verbose: bool = True,
+    vectorized: bool = False,
+    event_driven: bool = False,
+    journal_path: Optional[str] = None,
+    history_path: Optional[str] = None,
+    campus: Any = None,
+) -> dict[str, Any]:
+    """
+    Прогнать симуляцию заданное число дней без отрисовки
+
+    Args:
+        seed: Сид симуляции (случайный, если не указан)
+        days: Количество рабочих дней
+        worker_count: Количество работников (без охраны)
+        verbose: Печатать сводку по дням и скорость
+        vectorized: Использовать векторизованный движок состояния работников
+        event_driven: Событийный режим; вместо тиков считаются события
+        journal_path: Файл для журнала событий (не пишется, если не указан;
+            только в тиковом режиме)
+        history_path: Файл архива полной истории заданий работников
+        campus: Кампус вместо одного этажа: True или настройки
+            CampusGenerator (например, {'buildings': 100})
+
+    Returns:
+        Словарь с итогами прогона, сводками по дням и самой симуляцией
+    """
+    if event_driven and journal_path:
+        # Журнал воспроизводится по тикам, а событийный режим их не считает
+        raise ValueError('Журнал событий не поддерживается в событийном режиме')
+    if seed is None:
+        seed = random.randint(1, 1000000)
+
+    simulation = OfficeSimulation({
+        'seed': seed,
+        'vectorized': vectorized,
+        'campus': campus,
+    })
+    simulation.initialize(worker_count=worker_count)
+    engine = EventDrivenSimulation(simulation) if event_driven else None
+    journal = EventJournal(journal_path) if journal_path else None
+    if journal is not None:
+        journal.attach(simulation)
+    if history_path:
+        simulation.history_archive = TaskHistoryArchive(history_path)
+
+    day_summaries: list[dict[str, Any]] = []
+    completed_before = 0
+    failed_before = 0
+    ticks = 0
+
+    started = time.perf_counter()
+    while simulation.day <= days:
+        if engine is not None:
+            # Часы перескакивают от события к событию до конца дня
+            engine.run_days(1)
+            ticks = engine.events_processed
+        else:
+            day = simulation.day
+            while simulation.day == day:
+                simulation.step(HEADLESS_STEP_MINUTES)
+                ticks += 1
+
+        completed_total = sum(
+            w.stats.completed for w in simulation.workers.values()
+        )
+        summary = summarize_day(
+            simulation,
+            completed_total - completed_before,
+            simulation.failed_task_count - failed_before,
+        )
+        completed_before = completed_total
+        failed_before = simulation.failed_task_count
+        day_summaries.append(summary)
+
+        if verbose:
+            print(
+                f'День {summary["day"]}: выполнено {summary["completed"]}, '
+                f'провалено {summary["failed"]}, '
+                f'настроение {summary["avg_mood"]:.2f}, '
+                f'в очереди {summary["pending_tasks"]}'
+            )
+    elapsed = time.perf_counter() - started
+    if journal is not None:
+        journal.close()
+    if simulation.history_archive is not None:
+        simulation.history_archive.close()
+
+    ticks_per_second = ticks / elapsed if elapsed > 0 else float('inf')
+    if verbose:
+        print(
+            f'{"Событий" if engine else "Тиков"}: {ticks}, '
+            f'время: {elapsed:.2f} с, '
+            f'скорость: {ticks_per_second:.0f} '
+            f'{"событий" if engine else "тиков"}/с'
+        )
+
+    return {
+        'seed': seed,
+        'days': days,
+        'worker_count': worker_count,
+        'ticks': ticks,
+        'elapsed': elapsed,
+        'ticks_per_second': ticks_per_second,
+        'day_summaries': day_summaries,
+        'simulation': simulation,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Точка входа командной строки"""
+    parser = argparse.ArgumentParser(
+        description='Запуск WorkSpaceSim без графического интерфейса'
+    )
+    parser.add_argument('--seed', type=int, default=None, help='Сид симуляции')
+    parser.add_argument(
+        '--days', type=int, default=1, help='Количество рабочих дней'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=10, help='Количество работников'
+    )
+    parser.add_argument(
+        '--vectorized',
+        action='store_true',
+        help='Хранить состояние работников в столбцах NumPy',
+    )
+    parser.add_argument(
+        '--events',
+        action='store_true',
+        help='Событийный режим: часы перескакивают к следующему событию',
+    )
+    parser.add_argument(
+        '--scenario-snapshot',
+        default=None,
+        help='Файл двоичного снимка кэша сценариев для быстрого старта',
+    )
+    parser.add_argument(
+        '--layout-cache',
+        default=None,
+        help='Каталог дискового кэша планировок офиса',
+    )
+    parser.add_argument(
+        '--journal',
+        default=None,
+        help='Файл двоичного журнала событий прогона',
+    )
+    parser.add_argument(
+        '--history',
+        default=None,
+        help='Файл архива полной истории заданий работников (TSV)',
+    )
+    parser.add_argument(
+        '--campus',
+        action='store_true',
+        help='Кампус из многих зданий с ленивой генерацией блоков комнат',
+    )
+    parser.add_argument(
+        '--buildings',
+        type=int,
+        default=None,
+        help='Число зданий кампуса (по умолчанию из сида)',
+    )
+    parser.add_argument(
+        '--quiet', action='store_true', help='Не печатать сводку по дням'
+    )
+    args = parser.parse_args(argv)
+    if args.vectorized and args.events:
+        parser.error(
+            'флаги --vectorized и --events несовместимы: событийный режим '
+            'работает только с обычным движком'
+        )
+    if args.journal and args.events:
+        parser.error(
+            'флаги --journal и --events несовместимы: журнал '
+            'воспроизводится по тикам, а событийный режим их не считает'
+        )
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.scenario_snapshot:
+        SCENARIO_CACHE.load_snapshot(args.scenario_snapshot)
+    if args.layout_cache:
+        LAYOUT_CACHE.directory = args.layout_cache
+
+    run_headless(
+        args.seed,
+        args.days,
+        args.workers,
+        verbose=not args.quiet,
+        vectorized=args.vectorized,
+        event_driven=args.events,
+        journal_path=args.journal,
+        history_path=args.history,
+        campus=(
+            {'buildings': args.buildings}
+            if args.campus or args.buildings
+            else None
+        ),
+    )
+
+    if args.scenario_snapshot:
+        SCENARIO_CACHE.save_snapshot(args.scenario_snapshot)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""
+Журнал событий симуляции и воспроизведение по нему.
+
+Журнал - двоичный файл, в который записи только дописываются. Каждая
+запись начинается с заголовка (длина полезной нагрузки, тип, номер тика),
+поэтому файл читается последовательно, а ненужные записи пропускаются без
+разбора. Записи копятся в буфере ограниченного размера и сбрасываются на
+диск при его заполнении или по таймеру.
+
+Через каждые keyframe_interval тиков в журнал кладется опорный кадр -
+полный двоичный снимок симуляции (см. snapshot.py). Чтобы получить
+состояние на произвольный тик, JournalReplay загружает ближайший
+предшествующий опорный кадр и досчитывает оставшиеся тики, подставляя
+записанные шаги времени и показания часов, от которых зависят сценарии.
+Воспроизведение поддерживается для тикового режима (OfficeSimulation.step).
+"""
+
+import bisect
+import struct
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Iterator, NamedTuple, Optional
+
+JOURNAL_MAGIC = b'WSSJ'
+JOURNAL_VERSION = 1
+
+# Типы записей
+EVENT_TASK_ASSIGNED = 1  # (ID работника, ID задания)
+EVENT_TASK_COMPLETED = 2  # (ID работника, ID задания)
+EVENT_TASK_FAILED = 3  # (ID работника, ID задания)
+EVENT_FAIL = 4  # (ID комнаты, событие)
+EVENT_SCENARIO_ACTIVATED = 5  # (ID сценария,)
+EVENT_ROOM_CHANGED = 6  # (ID работника, ID комнаты или None)
+EVENT_CLOCK = 7  # (время в ISO 8601,) - показание часов для сценариев
+EVENT_STEP = 8  # шаг времени тика (double)
+EVENT_KEYFRAME = 9  # шаг времени (double) + снимок симуляции
+EVENT_END = 10  # последний записанный тик, пишется при закрытии
+
+EVENT_NAMES = {
+    EVENT_TASK_ASSIGNED: 'task_assigned',
+    EVENT_TASK_COMPLETED: 'task_completed',
+    EVENT_TASK_FAILED: 'task_failed',
+    EVENT_FAIL: 'fail_event',
+    EVENT_SCENARIO_ACTIVATED: 'scenario_activated',
+    EVENT_ROOM_CHANGED: 'room_changed',
+    EVENT_CLOCK: 'clock',
+    EVENT_STEP: 'step',
+    EVENT_KEYFRAME: 'keyframe',
+    EVENT_END: 'end',
+}
+
+# Опорный кадр раз в рабочий день при шаге в минуту
+KEYFRAME_INTERVAL = 600
+# Размер буфера (байт), при котором записи сбрасываются на диск
+FLUSH_THRESHOLD = 64 * 1024
+# Максимальный интервал (секунд) между сбросами буфера
+FLUSH_INTERVAL = 1.0
+
+_FILE_HEADER = struct.Struct('<4sH')
+_RECORD_HEADER = struct.Struct('<IBQ')  # длина нагрузки, тип, тик
+_STRING_LENGTH = struct.Struct('<H')
+_STEP = struct.Struct('<d')
+
+_NONE_STRING = 0xFFFF
+
+
+def _pack_strings(values: tuple[Optional[str], ...]) -> bytes:
+    """Упаковать последовательность строк (None допустим)"""
+    payload = bytearray()
+    for value in values:
+        if value is None:
+            payload += _STRING_LENGTH.pack(_NONE_STRING)
+            continue
+        data = str(value).encode('utf-8')
+        payload += _STRING_LENGTH.pack(len(data))
+        payload += data
+    return bytes(payload)
+
+
+def _unpack_strings(payload: bytes) -> tuple[Optional[str], ...]:
+    """Распаковать строки, упакованные _pack_strings"""
+    values = []
+    offset = 0
+    while offset < len(payload):
+        (length,) = _STRING_LENGTH.unpack_from(payload, offset)
+        offset += _STRING_LENGTH.size
+        if length == _NONE_STRING:
+            values.append(None)
+            continue
+        values.append(payload[offset : offset + length].decode('utf-8'))
+        offset += length
+    return tuple(values)
+
+
+def _unpack_step(payload: bytes) -> float:
+    """Шаг времени; целые шаги возвращаются как int, как их передает UI"""
+    (dt,) = _STEP.unpack_from(payload)
+    return int(dt) if dt.is_integer() else dt
+
+
+class JournalRecord(NamedTuple):
+    """Запись журнала"""
+
+    tick: int
+    kind: int
+    values: Any  # кортеж строк, шаг времени или (шаг, снимок)
+
+
+class EventJournal:
+    """
+    Запись журнала событий симуляции.
+
+    Подключается к симуляции через attach(); дальше OfficeSimulation сама
+    вызывает record() для событий и end_tick() в конце каждого шага.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        keyframe_interval: int = KEYFRAME_INTERVAL,
+        flush_threshold: int = FLUSH_THRESHOLD,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        """
+        Args:
+            path: Файл журнала (перезаписывается)
+            keyframe_interval: Число тиков между опорными кадрами
+            flush_threshold: Размер буфера для сброса на диск
+            flush_interval: Максимальный интервал между сбросами
+        """
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.flush_threshold = flush_threshold
+        self.flush_interval = flush_interval
+        self.records_written = 0
+        self._buffer = bytearray()
+        self._step: Optional[float] = None
+        self._tick = 0
+        self._last_flush = time.monotonic()
+        self._file = open(path, 'wb')
+        self._file.write(_FILE_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION))
+
+    def attach(self, simulation) -> None:
+        """Начать запись событий симуляции с опорного кадра"""
+        simulation.journal = self
+        self._write_keyframe(simulation, 0.0)
+
+    def record(self, kind: int, tick: int, *values: Optional[str]) -> None:
+        """Записать событие со строковыми полями"""
+        self._write(kind, tick, _pack_strings(values))
+
+    def record_clock(self, tick: int, now: datetime) -> None:
+        """Записать показание часов, прочитанное симуляцией"""
+        self._write(EVENT_CLOCK, tick, _pack_strings((now.isoformat(),)))
+
+    def end_tick(self, simulation, dt: float) -> None:
+        """Завершить тик: шаг времени, опорный кадр и сброс по таймеру"""
+        tick = self._tick = simulation.ticks
+        if dt != self._step:
+            self._step = dt
+            self._write(EVENT_STEP, tick, _STEP.pack(dt))
+
+        if tick % self.keyframe_interval == 0:
+            self._write_keyframe(simulation, dt)
+
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _write_keyframe(self, simulation, dt: float) -> None:
+        """Записать полный снимок симуляции"""
+        # Импорт по требованию: модуль снимков зависит от models
+        from snapshot import dumps
+
+        self._tick = simulation.ticks
+        self._write(
+            EVENT_KEYFRAME,
+            simulation.ticks,
+            _STEP.pack(dt) + dumps(simulation),
+        )
+
+    def _write(self, kind: int, tick: int, payload: bytes) -> None:
+        self._buffer += _RECORD_HEADER.pack(len(payload), kind, tick)
+        self._buffer += payload
+        self.records_written += 1
+        if len(self._buffer) >= self.flush_threshold:
+            self.flush()
+
+    def flush(self) -> None:
+        """Сбросить буфер на диск"""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Сбросить буфер и закрыть файл"""
+        if self._file.closed:
+            return
+        self._write(EVENT_END, self._tick, b'')
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> 'EventJournal':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _read_records(
+    f, decode: bool = True
+) -> Iterator[tuple[int, JournalRecord]]:
+    """Читать записи с текущей позиции файла: (смещение, запись)"""
+    while True:
+        offset = f.tell()
+        header = f.read(_RECORD_HEADER.size)
+        if len(header) < _RECORD_HEADER.size:
+            return
+        length, kind, tick = _RECORD_HEADER.unpack(header)
+        if not decode:
+            # Нагрузка не нужна - пропускаем ее без чтения
+            f.seek(length, 1)
+            yield offset, JournalRecord(tick, kind, None)
+            continue
+
+        payload = f.read(length)
+        if len(payload) < length:
+            return  # оборванная последняя запись
+        if kind == EVENT_STEP:
+            values = _unpack_step(payload)
+        elif kind == EVENT_KEYFRAME:
+            values = (_unpack_step(payload), payload[_STEP.size :])
+        else:
+            values = _unpack_strings(payload)
+        yield offset, JournalRecord(tick, kind, values)
+
+
+def _open_journal(path: str):
+    """Открыть журнал и проверить заголовок"""
+    f = open(path, 'rb')
+    header = f.read(_FILE_HEADER.size)
+    if len(header) < _FILE_HEADER.size:
+        f.close()
+        raise ValueError('Файл не является журналом WorkSpaceSim')
+    magic, version = _FILE_HEADER.unpack(header)
+    if magic != JOURNAL_MAGIC:
+        f.close()
+        raise ValueError('Файл не является журналом WorkSpaceSim')
+    if version != JOURNAL_VERSION:
+        f.close()
+        raise ValueError(f'Неподдерживаемая версия журнала: {version}')
+    return f
+
+
+def read_journal(path: str) -> Iterator[JournalRecord]:
+    """Прочитать все записи журнала по порядку"""
+    with _open_journal(path) as f:
+        for _, record in _read_records(f):
+            yield record
+
+
+class _ReplayClock:
+    """Часы, выдающие записанные в журнале показания по порядку"""
+
+    def __init__(self, readings: deque):
+        self.readings = readings
+
+    def __call__(self) -> datetime:
+        if not self.readings:
+            raise RuntimeError('В журнале не хватает показаний часов')
+        return self.readings.popleft()
+
+
+class JournalReplay:
+    """
+    Восстановление состояния симуляции по журналу.
+
+    При создании файл просматривается по заголовкам записей и строится
+    индекс опорных кадров; сами снимки читаются только по требованию.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.keyframe_ticks: list[int] = []
+        self._keyframe_offsets: list[int] = []
+        self.last_tick = 0
+
+        with _open_journal(path) as f:
+            for offset, record in _read_records(f, decode=False):
+                self.last_tick = max(self.last_tick, record.tick)
+                if record.kind == EVENT_KEYFRAME:
+                    self.keyframe_ticks.append(record.tick)
+                    self._keyframe_offsets.append(offset)
+
+    def events(
+        self, start_tick: int = 0, end_tick: Optional[int] = None
+    ) -> Iterator[JournalRecord]:
+        """События журнала в диапазоне тиков (без служебных записей)"""
+        for record in read_journal(self.path):
+            if end_tick is not None and record.tick > end_tick:
+                return
+            if record.tick >= start_tick and record.kind not in (
+                EVENT_CLOCK,
+                EVENT_STEP,
+                EVENT_KEYFRAME,
+                EVENT_END,
+            ):
+                yield record
+
+    def state_at(self, tick: int):
+        """
+        Восстановить симуляцию на конец указанного тика
+
+        Args:
+            tick: Номер тика (0 - момент подключения журнала)
+
+        Returns:
+            Новый экземпляр OfficeSimulation
+        """
+        position = bisect.bisect_right(self.keyframe_ticks, tick) - 1
+        if position < 0 or tick > self.last_tick:
+            raise ValueError(f'Тик {tick} отсутствует в журнале')
+
+        # Импорт по требованию: модуль снимков зависит от models
+        from snapshot import loads
+
+        keyframe_tick = self.keyframe_ticks[position]
+        steps: dict[int, float] = {}
+        readings: deque = deque()
+        with _open_journal(self.path) as f:
+            f.seek(self._keyframe_offsets[position])
+            records = _read_records(f)
+            _, keyframe = next(records)
+            dt, data = keyframe.values
+            simulation = loads(data)
+
+            # Шаги времени и показания часов между кадром и целевым тиком
+            for _, record in records:
+                if record.tick > tick:
+                    break
+                if record.kind == EVENT_STEP:
+                    steps[record.tick] = record.values
+                elif record.kind == EVENT_CLOCK:
+                    readings.append(datetime.fromisoformat(record.values[0]))
+
+        simulation.clock = _ReplayClock(readings)
+        for step_tick in range(keyframe_tick + 1, tick + 1):
+            dt = steps.get(step_tick, dt)
+            simulation.step(dt)
+        simulation.clock = datetime.now
+        return simulation
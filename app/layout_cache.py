@@ -0,0 +1,184 @@
+"""
+Кэш планировок офиса по сиду.
+
+OfficeGenerator.generate() детерминирован для пары (сид, версия
+генератора), поэтому готовую планировку можно переиспользовать при сбросе,
+смене сида и в пакетных прогонах. Планировка хранится в неизменяемом виде -
+записи комнат и производные индексы (комнаты по типам и сетка кандидатов
+RoomIndex) - и при каждом запросе превращается в новые объекты комнат.
+Недавние планировки держатся в памяти (LRU); при заданном каталоге они
+также сохраняются на диск, по файлу на ключ, и переживают процесс.
+"""
+
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional
+
+from spatial_index import ROOM_INDEX_CELL_SIZE, RoomIndex
+
+# Сколько планировок держать в памяти
+LAYOUT_CACHE_SIZE = 64
+# Расширение файлов планировок в каталоге хранилища
+LAYOUT_FILE_SUFFIX = '.layout'
+
+
+class Layout(NamedTuple):
+    """
+    Неизменяемая планировка.
+
+    records - (тип, x, y, ширина, высота, ID) комнат в порядке генерации;
+    by_type - тип -> номера комнат этого типа по порядку;
+    cells - ячейка сетки RoomIndex -> номера комнат-кандидатов.
+    """
+
+    records: tuple
+    by_type: dict[Any, tuple[int, ...]]
+    cells: dict[tuple[int, int], tuple[int, ...]]
+    cell_size: int
+
+    @classmethod
+    def from_rooms(
+        cls, rooms: list, cell_size: int = ROOM_INDEX_CELL_SIZE
+    ) -> 'Layout':
+        """Снять планировку и построить индексы по списку комнат"""
+        numbers = {id(room): i for i, room in enumerate(rooms)}
+        by_type: dict[Any, list[int]] = {}
+        for i, room in enumerate(rooms):
+            by_type.setdefault(room.room_type, []).append(i)
+        index = RoomIndex(rooms, cell_size)
+        return cls(
+            tuple(
+                (r.room_type, r.x, r.y, r.width, r.height, r.id) for r in rooms
+            ),
+            {room_type: tuple(ids) for room_type, ids in by_type.items()},
+            {
+                cell: tuple(numbers[id(room)] for room in candidates)
+                for cell, candidates in index.cells.items()
+            },
+            cell_size,
+        )
+
+    def build_rooms(self, room_factory: Callable) -> list:
+        """Новые объекты комнат: room_factory(тип, x, y, ширина, высота, ID)"""
+        return [room_factory(*record) for record in self.records]
+
+    def rooms_by_type(self, rooms: list) -> dict[Any, list]:
+        """Комнаты по типам для списка, построенного build_rooms"""
+        return {
+            room_type: [rooms[i] for i in ids]
+            for room_type, ids in self.by_type.items()
+        }
+
+    def room_index(self, rooms: list) -> RoomIndex:
+        """RoomIndex для списка, построенного build_rooms, без пересчета"""
+        return RoomIndex(rooms, self.cell_size, self.cells)
+
+
+class LayoutCache:
+    """
+    Кэш планировок по ключу (сид, параметры генератора, версия).
+
+    Поиск идет в памяти, затем в каталоге хранилища, если он задан.
+    Счетчики попаданий позволяют оценить пользу.
+    """
+
+    STORE_VERSION = 1
+
+    def __init__(
+        self,
+        max_size: int = LAYOUT_CACHE_SIZE,
+        directory: Optional[str] = None,
+    ):
+        """
+        Args:
+            max_size: Сколько планировок держать в памяти
+            directory: Каталог хранилища на диске (не пишется, если None)
+        """
+        self.max_size = max_size
+        self.directory = directory
+        self._layouts: OrderedDict[tuple, Layout] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[Layout]:
+        """Планировка по ключу из памяти или с диска, иначе None"""
+        layout = self._layouts.get(key)
+        if layout is not None:
+            self.hits += 1
+            self._layouts.move_to_end(key)
+            return layout
+
+        layout = self._read(key)
+        if layout is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self._remember(key, layout)
+        return layout
+
+    def put(self, key: tuple, layout: Layout) -> None:
+        """Запомнить планировку в памяти и в хранилище"""
+        self._remember(key, layout)
+        if self.directory is not None:
+            self._write(key, layout)
+
+    def clear(self) -> None:
+        """Очистить кэш в памяти (хранилище на диске не трогается)"""
+        self._layouts.clear()
+
+    def _remember(self, key: tuple, layout: Layout) -> None:
+        self._layouts[key] = layout
+        self._layouts.move_to_end(key)
+        if len(self._layouts) > self.max_size:
+            self._layouts.popitem(last=False)
+
+    def _path(self, key: tuple) -> str:
+        """Файл планировки: имя - хэш ключа"""
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + LAYOUT_FILE_SUFFIX)
+
+    def _read(self, key: tuple) -> Optional[Layout]:
+        """
+        Прочитать планировку из хранилища, если файл подходит
+
+        Оборванный (убитый писатель) или устаревший (изменились Room,
+        RoomType) файл считается промахом; следующий put перезапишет его.
+        """
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                version, stored_key, layout = pickle.load(f)
+        except (
+            OSError,
+            EOFError,
+            pickle.UnpicklingError,
+            AttributeError,
+            ImportError,
+            ValueError,
+            TypeError,
+        ):
+            return None
+        if version != self.STORE_VERSION or stored_key != key:
+            return None
+        return layout
+
+    def _write(self, key: tuple, layout: Layout) -> None:
+        """Записать планировку атомарно: процессы перебора делят каталог"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump(
+                (self.STORE_VERSION, key, layout),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(temp_path, path)
+
+
+# Кэш планировок, общий для всех генераторов процесса
+LAYOUT_CACHE = LayoutCache()
@@ -1,22 +1,46 @@
+import math
 import random
 import sys
+import time
+from itertools import islice
 
 import constants as const
+import numpy as np
 import pygame
-from models import (
-    Department,
-    OfficeSimulation,
+from models import OfficeSimulation
+from render_cache import (
+    DENSITY_LEVELS,
+    RoomLayerCache,
+    TextCache,
+    WorkerSpriteCache,
+    draw_room,
 )
 
 # Инициализация pygame
 pygame.init()
 
+# Экранная метка работника для поиска изменившихся областей
+WORKER_MARK_DTYPE = np.dtype([
+    ('x', np.int32),
+    ('y', np.int32),
+    ('bar', np.float64),
+])
+
 
 class WorkSpaceSimApp:
     """Главный класс приложения WorkSpaceSim."""
 
-    def __init__(self, seed=None):
-        """Инициализация приложения."""
+    def __init__(self, seed=None, background=False, campus=False):
+        """
+        Инициализация приложения.
+
+        Args:
+            seed: Сид симуляции (случайный, если не указан)
+            background: Считать симуляцию в отдельном процессе
+                (sim_process.RemoteSimulation)
+            campus: Кампус из многих зданий вместо одного этажа; блоки
+                комнат подгружаются по мере прокрутки вида
+        """
         self.screen = pygame.display.set_mode((
             const.SCREEN_WIDTH,
             const.SCREEN_HEIGHT,
@@ -26,11 +50,15 @@ class WorkSpaceSimApp:
         self.font = pygame.font.SysFont('Arial', 12)
         self.title_font = pygame.font.SysFont('Arial', 20, bold=True)
         self.info_font = pygame.font.SysFont('Arial', 16)
+        # Кэш отрисованного текста панелей
+        self.text_cache = TextCache()
 
         # Состояние симуляции
         self.seed = seed or random.randint(1, 1000000)
-        self.simulation = OfficeSimulation(self.seed)
-        self.simulation.initialize(worker_count=const.DEFAULT_WORKER_COUNT)
+        self.background = background
+        self.campus = campus
+        self.simulation = None
+        self._reset_simulation()
 
         # Состояние интерфейса
         self.paused = False
@@ -40,6 +68,10 @@ class WorkSpaceSimApp:
         self.current_speed_level = (
             const.SPEED_MULTIPLIER_1
         )  # Текущий уровень скорости (1, 2 или 3)
+        # Накопленное, но еще не просчитанное время симуляции (минут)
+        self.sim_accumulator = 0.0
+        # Симуляция не успевает за выбранной скоростью
+        self.sim_lagging = False
         self.selected_worker = None
         self.scroll_speed = const.SCROLL_SPEED
 
@@ -62,6 +94,20 @@ class WorkSpaceSimApp:
         self.zoom = const.DEFAULT_ZOOM
         self.offset_x = const.DEFAULT_OFFSET_X
         self.offset_y = const.DEFAULT_OFFSET_Y
+        # Слой комнат, отрисованный заранее для текущей планировки
+        self.room_layer = RoomLayerCache(self.font)
+        # Значки работников по отделам для каждого масштаба
+        self.worker_sprites = WorkerSpriteCache()
+
+        # Что выведено на дисплей в прошлом кадре (для частичного вывода)
+        self._full_redraw = True
+        self._drawn_view = None
+        self._drawn_content = None
+        self._worker_marks = None  # экранные метки работников
+        self._selected_mark = None  # экранная точка выбранного работника
+        # Число событий видимых комнат с событиями и их планировка
+        self._event_marks = {}
+        self._event_rooms = None
 
     def handle_events(self):
         """Обработка событий pygame."""
@@ -69,6 +115,10 @@ class WorkSpaceSimApp:
             if event.type == pygame.QUIT:
                 return False
 
+            # Окно перекрывали или восстановили - выводим кадр целиком
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self._full_redraw = True
+
             # События клавиатуры
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
@@ -96,11 +146,7 @@ class WorkSpaceSimApp:
                     self.show_task_panel = not self.show_task_panel
                 elif event.key == pygame.K_r:
                     # Сброс симуляции с текущим сидом
-                    self.simulation = OfficeSimulation(self.seed)
-                    self.simulation.initialize(
-                        worker_count=const.DEFAULT_WORKER_COUNT
-                    )
-                    self.selected_worker = None
+                    self._reset_simulation()
 
                 # Обработка ввода сида
                 elif self.seed_input_active:
@@ -129,6 +175,36 @@ class WorkSpaceSimApp:
 
         return True
 
+    def _reset_simulation(self):
+        """Создать новую симуляцию с текущим сидом"""
+        self.close_simulation()
+        config = {'seed': self.seed, 'campus': self.campus}
+        if self.background:
+            # Импорт по требованию: модуль запускает дочерний процесс
+            from sim_process import RemoteSimulation
+
+            self.simulation = RemoteSimulation(
+                config,
+                const.DEFAULT_WORKER_COUNT,
+                {
+                    'frame_ms': 1000 / const.FPS,
+                    'step_minutes': const.SIM_STEP_MINUTES,
+                    'max_frame_ms': const.MAX_FRAME_TIME_MS,
+                    'max_backlog_frames': const.SIM_MAX_BACKLOG_FRAMES,
+                },
+            )
+        else:
+            self.simulation = OfficeSimulation(config)
+            self.simulation.initialize(worker_count=const.DEFAULT_WORKER_COUNT)
+        self.selected_worker = None
+        self.sim_accumulator = 0.0
+
+    def close_simulation(self):
+        """Остановить фоновую симуляцию, если она запущена"""
+        if self.background and self.simulation is not None:
+            self.simulation.close()
+            self.simulation = None
+
     def _handle_seed_input(self, event):
         """Обработка ввода значения сида."""
         if event.key == pygame.K_RETURN:
@@ -136,11 +212,7 @@ class WorkSpaceSimApp:
             try:
                 new_seed = int(self.seed_input_text)
                 self.seed = new_seed
-                self.simulation = OfficeSimulation(self.seed)
-                self.simulation.initialize(
-                    worker_count=const.DEFAULT_WORKER_COUNT
-                )
-                self.selected_worker = None
+                self._reset_simulation()
             except ValueError:
                 self.seed_input_text = str(self.seed)
         elif event.key == pygame.K_BACKSPACE:
@@ -168,21 +240,16 @@ class WorkSpaceSimApp:
         # Проверяем, находится ли клик в панели офиса
         panel_width = self.info_panel_width if self.show_info_panel else 0
         if x < const.SCREEN_WIDTH - panel_width:
-            # Проверяем, кликнули ли на работника
-            for worker in self.simulation.workers.values():
-                worker_screen_x = worker.x * self.zoom + self.offset_x
-                worker_screen_y = worker.y * self.zoom + self.offset_y
-
-                # Проверяем, находится ли клик внутри значка работника
-                radius = 10 * self.zoom
-                if (
-                    (worker_screen_x - x) ** 2 + (worker_screen_y - y) ** 2
-                ) <= radius**2:
-                    self.selected_worker = worker
-                    return
-
+            # Переводим клик в координаты офиса и ищем работника в сетке
+            worker = self.simulation.find_worker_at(
+                (x - self.offset_x) / self.zoom,
+                (y - self.offset_y) / self.zoom,
+                const.WORKER_HIT_RADIUS,
+            )
             # Если ни на одного работника не кликнули, снимаем выделение
-            self.selected_worker = None
+            self.selected_worker = worker
+            if worker is not None:
+                return
 
         # Проверяем, находится ли клик на поле ввода сида в информационной панели
         if self.show_info_panel:
@@ -195,142 +262,395 @@ class WorkSpaceSimApp:
             if seed_box_rect.collidepoint(pos):
                 self.seed_input_active = not self.seed_input_active
 
-    def update(self):
-        """Обновление состояния симуляции."""
-        if not self.paused:
-            self.simulation.update(int(self.speed_multiplier))
-
-            # Обработка неудачных заданий
-            for worker_id, worker in self.simulation.workers.items():
-                for task in worker.failed_tasks:
-                    if task.fail_event:
-                        self.simulation.handle_failed_task(task)
-                worker.failed_tasks = []
-
-            # Начинаем день, если сейчас утро
-            if (
-                self.simulation.time
-                == const.WORKDAY_START_HOUR * 60 + const.WORKDAY_START_MINUTE
-            ):
-                self.simulation.start_day()
+    def update(self, frame_ms=None):
+        """
+        Обновление состояния симуляции фиксированными шагами.
+
+        За кадр к накопителю добавляется speed_multiplier минут на каждый
+        номинальный кадр (1000 / FPS мс) прошедшего времени, после чего
+        выполняются шаги по SIM_STEP_MINUTES, пока накопитель не исчерпан
+        или не вышел бюджет кадра. Остаток догоняется в следующих кадрах;
+        отставание больше SIM_MAX_BACKLOG_FRAMES кадров отбрасывается, чтобы
+        медленная симуляция не съедала все кадры интерфейса.
+
+        Args:
+            frame_ms: Длительность прошедшего кадра (по умолчанию
+                номинальная)
+        """
+        if self.background:
+            # Шаги идут в фоновом процессе; забираем последний кадр
+            self.simulation.control(self.speed_multiplier, self.paused)
+            self.simulation.poll()
+            self.sim_lagging = self.simulation.lagging
+            return
+
+        if self.paused:
+            return
+
+        nominal_ms = 1000 / const.FPS
+        if frame_ms is None:
+            frame_ms = nominal_ms
+        frame_ms = min(frame_ms, const.MAX_FRAME_TIME_MS)
+        self.sim_accumulator += self.speed_multiplier * frame_ms / nominal_ms
+
+        step = const.SIM_STEP_MINUTES
+        deadline = time.perf_counter() + const.SIM_FRAME_BUDGET_MS / 1000
+        while self.sim_accumulator >= step:
+            self.simulation.step(step)
+            self.sim_accumulator -= step
+            if time.perf_counter() >= deadline:
+                break
+
+        max_backlog = self.speed_multiplier * const.SIM_MAX_BACKLOG_FRAMES
+        self.sim_lagging = self.sim_accumulator >= step
+        self.sim_accumulator = min(self.sim_accumulator, max_backlog)
 
     def draw(self):
-        """Отрисовка текущего состояния на экране."""
+        """
+        Отрисовка текущего состояния на экране.
+
+        Кадр собирается в буфере экрана целиком, но на дисплей выводятся
+        только изменившиеся области: сдвинувшиеся работники и их индикаторы,
+        новые подписи событий и панели. Смена вида (панорама, масштаб,
+        панели, сброс) выводит весь экран. Если с прошлого кадра не
+        изменились ни симуляция, ни интерфейс (пауза без ввода), кадр не
+        рисуется вовсе.
+
+        Returns:
+            True, если кадр был нарисован
+        """
+        view = (
+            self.simulation,
+            self.zoom,
+            self.offset_x,
+            self.offset_y,
+            self.show_info_panel,
+            self.show_task_panel,
+        )
+        content = (
+            self.simulation.ticks,
+            self.paused,
+            self.current_speed_level,
+            self.sim_lagging,
+            self.seed_input_active,
+            self.seed_input_text,
+            self.selected_worker,
+        )
+        full = self._full_redraw or view != self._drawn_view
+        if full and not self.background:
+            # В кампусе подгружаем блоки комнат, попавшие в область вида
+            view_width, view_height = self.office_display_surface.get_size()
+            self.simulation.load_area(
+                -self.offset_x / self.zoom,
+                -self.offset_y / self.zoom,
+                view_width / self.zoom,
+                view_height / self.zoom,
+            )
+        if not full and content == self._drawn_content:
+            return False
+
         self.screen.fill(const.WHITE)
 
         # Рисуем офис
-        self._draw_office()
+        dirty = self._draw_office(full)
 
         # Рисуем информационную панель
         if self.show_info_panel:
             self._draw_info_panel()
+            dirty.append((
+                const.SCREEN_WIDTH - self.info_panel_width,
+                0,
+                self.info_panel_width,
+                const.SCREEN_HEIGHT,
+            ))
 
         # Рисуем панель задач
         if self.show_task_panel:
             self._draw_task_panel()
+            dirty.append((
+                (const.SCREEN_WIDTH - const.TASK_PANEL_WIDTH) // 2,
+                (const.SCREEN_HEIGHT - const.TASK_PANEL_HEIGHT) // 2,
+                const.TASK_PANEL_WIDTH,
+                const.TASK_PANEL_HEIGHT,
+            ))
+
+        if full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
 
-        pygame.display.flip()
-
-    def _draw_office(self):
-        """Отрисовка планировки офиса и работников."""
-        self.office_display_surface.fill(const.WHITE)
+        self._full_redraw = False
+        self._drawn_view = view
+        self._drawn_content = content
+        return True
 
-        # Рисуем комнаты
-        for room in self.simulation.rooms:
-            color = const.ROOM_COLORS.get(room.room_type, const.GRAY)
-            x = room.x * self.zoom + self.offset_x
-            y = room.y * self.zoom + self.offset_y
-            width = room.width * self.zoom
-            height = room.height * self.zoom
+    def _draw_office(self, full=True):
+        """
+        Отрисовка планировки офиса и работников.
 
-            pygame.draw.rect(
-                self.office_display_surface, color, (x, y, width, height)
-            )
-            pygame.draw.rect(
-                self.office_display_surface,
-                const.BLACK,
-                (x, y, width, height),
-                2,
-            )
+        Args:
+            full: Кадр выводится целиком, изменения можно не искать
 
-            # Рисуем название комнаты
-            room_label = self.font.render(
-                room.room_type.value, True, const.BLACK
+        Returns:
+            Список изменившихся прямоугольников области офиса
+        """
+        self.office_display_surface.fill(const.WHITE)
+        office_rect = self.office_display_surface.get_rect()
+        dirty = []
+
+        # Рисуем комнаты: готовый слой выводится со смещением вида; без
+        # слоя (большая планировка, кампус) - только комнаты в области вида
+        rooms = self.simulation.rooms
+        visible = self.room_layer.visible_rooms(
+            rooms,
+            self.zoom,
+            self.offset_x,
+            self.offset_y,
+            office_rect.width,
+            office_rect.height,
+        )
+        layer = self.room_layer.get_layer(rooms, self.zoom)
+        if layer is not None:
+            surface, layer_x, layer_y = layer
+            self.office_display_surface.blit(
+                surface, (layer_x + self.offset_x, layer_y + self.offset_y)
             )
-            self.office_display_surface.blit(room_label, (x + 5, y + 5))
+        else:
+            for room in map(rooms.__getitem__, visible):
+                draw_room(
+                    self.office_display_surface,
+                    room,
+                    self.zoom,
+                    self.offset_x,
+                    self.offset_y,
+                    self.room_layer.room_label(room),
+                )
 
-            # Рисуем события в комнате
-            for i, event in enumerate(room.events):
-                event_text = f'Событие: {event}'
-                event_label = self.font.render(event_text, True, const.RED)
-                self.office_display_surface.blit(
+        # Рисуем события в видимых комнатах
+        event_marks = {
+            i: len(rooms[i].events) for i in visible if rooms[i].events
+        }
+        layout_changed = rooms is not self._event_rooms
+        if full or layout_changed:
+            changed_rooms = set()
+        else:
+            changed_rooms = {
+                i
+                for i, count in event_marks.items()
+                if count != self._event_marks.get(i)
+            }
+        self._event_marks = event_marks
+        self._event_rooms = rooms
+        for room_index in event_marks:
+            room = rooms[room_index]
+            x = room.x * self.zoom + self.offset_x
+            y = room.y * self.zoom + self.offset_y
+            for i, event_label in enumerate(
+                self.room_layer.event_labels(room)
+            ):
+                rect = self.office_display_surface.blit(
                     event_label, (x + 5, y + 25 + i * 15)
                 )
+                if room_index in changed_rooms:
+                    dirty.append(rect)
 
         # Рисуем работников
-        self._draw_workers()
+        worker_dirty = self._draw_workers(full)
+        if (
+            worker_dirty is None
+            or layout_changed
+            or len(dirty) + len(worker_dirty) > const.MAX_DIRTY_RECTS
+        ):
+            dirty = [office_rect]
+        else:
+            dirty.extend(worker_dirty)
 
         # Отображаем поверхность офиса на основном экране
         self.screen.blit(self.office_display_surface, (0, 0))
+        return dirty
+
+    def _draw_workers(self, full=True):
+        """
+        Отрисовка работников.
+
+        Для каждого работника запоминается экранная метка (точка и
+        прогресс задания); прямоугольники работников, чья метка
+        изменилась, возвращаются для частичного вывода.
+
+        Args:
+            full: Кадр выводится целиком, изменения можно не искать
+
+        Returns:
+            Изменившиеся прямоугольники или None, если меняется вся область
+            (точки плотности)
+        """
+        surface = self.office_display_surface
+        view_width, view_height = surface.get_size()
+        radius, sprites, selected_radius, selected_sprites = (
+            self.worker_sprites.get(self.zoom)
+        )
 
-    def _draw_workers(self):
-        """Отрисовка работников."""
-        for worker_id, worker in self.simulation.workers.items():
-            x = worker.x * self.zoom + self.offset_x
-            y = worker.y * self.zoom + self.offset_y
-
-            # Определяем цвет работника в зависимости от отдела
-            if worker.department == Department.ENGINEERING:
-                color = const.BLUE
-            elif worker.department == Department.MARKETING:
-                color = const.GREEN
-            elif worker.department == Department.MANAGEMENT:
-                color = const.PURPLE
-            elif worker.department == Department.HR:
-                color = const.YELLOW
-            else:
-                color = const.ORANGE
-
-            # Больший круг для выбранного работника
-            radius = (
-                const.SELECTED_WORKER_CIRCLE_RADIUS
-                if worker == self.selected_worker
-                else const.WORKER_CIRCLE_RADIUS
+        # Отсекаем работников вне офиса и за пределами области вида
+        workers, xs, ys, present = self._worker_positions()
+        screen_x = xs * self.zoom + self.offset_x
+        screen_y = ys * self.zoom + self.offset_y
+        margin = max(selected_radius, const.PROGRESS_BAR_WIDTH * self.zoom)
+        visible = np.flatnonzero(
+            present
+            & (screen_x >= -margin)
+            & (screen_x < view_width + margin)
+            & (screen_y >= -margin)
+            & (screen_y < view_height + margin + 15)
+        )
+
+        # Экранные метки работников: точка значка и прогресс задания
+        # (-1 - без задания, -2 - работник не выводится)
+        marks = np.zeros(len(workers), dtype=WORKER_MARK_DTYPE)
+        marks['bar'] = -2.0
+
+        # Индикаторы прогресса: (x, y, ширина заполненной части)
+        bars = []
+        indicator_width = const.PROGRESS_BAR_WIDTH * self.zoom
+        density = (
+            len(visible) > const.WORKER_LOD_MAX_SPRITES
+            or radius < const.WORKER_LOD_MIN_RADIUS
+        )
+        if density:
+            # Мелкий масштаб или толпа: точки плотности вместо значков
+            self._draw_worker_density(screen_x[visible], screen_y[visible])
+        else:
+            marks['x'][visible] = screen_x[visible]
+            marks['y'][visible] = screen_y[visible]
+            marks['bar'][visible] = -1.0
+            bar_workers = []
+            bar_values = []
+            blits = []
+            for i, x, y in zip(
+                visible.tolist(),
+                screen_x[visible].tolist(),
+                screen_y[visible].tolist(),
+            ):
+                worker = workers[i]
+                if worker is not self.selected_worker:
+                    blits.append((
+                        sprites[worker.department],
+                        (int(x) - radius, int(y) - radius),
+                    ))
+
+                # Индикатор прогресса задания, если у работника есть задание
+                task = worker.current_task
+                if task:
+                    progress = task.progress / task.duration
+                    bar_workers.append(i)
+                    bar_values.append(progress)
+                    bars.append((
+                        x - indicator_width / 2,
+                        y - 15,
+                        indicator_width * progress,
+                    ))
+            surface.blits(blits, doreturn=False)
+            marks['bar'][bar_workers] = bar_values
+
+        # Выбранный работник рисуется поверх остальных большим значком
+        selected_mark = None
+        worker = self.selected_worker
+        if worker is not None and worker.is_at_office:
+            x = int(worker.x * self.zoom + self.offset_x)
+            y = int(worker.y * self.zoom + self.offset_y)
+            surface.blit(
+                selected_sprites[worker.department],
+                (x - selected_radius, y - selected_radius),
             )
-            radius *= self.zoom
+            selected_mark = (x, y)
 
-            pygame.draw.circle(
-                self.office_display_surface, color, (int(x), int(y)), int(radius)
+        # Индикаторы рисуются поверх всех значков, как в исходном порядке
+        # "значок, затем индикатор"
+        for bar_x, bar_y, filled in bars:
+            pygame.draw.rect(
+                surface, const.BLACK, (bar_x, bar_y, indicator_width, 5)
             )
-            pygame.draw.circle(
-                self.office_display_surface,
-                const.BLACK,
-                (int(x), int(y)),
-                int(radius),
-                1,
+            pygame.draw.rect(surface, const.GREEN, (bar_x, bar_y, filled, 5))
+
+        previous = self._worker_marks
+        previous_selected = self._selected_mark
+        self._worker_marks = None if density else marks
+        self._selected_mark = selected_mark
+        if density:
+            return None
+        if full or previous is None or len(previous) != len(marks):
+            return []
+
+        # Прямоугольники старого и нового положения изменившихся работников
+        changed = np.flatnonzero(marks != previous)
+        points = [
+            (int(x), int(y))
+            for frame_marks in (previous[changed], marks[changed])
+            for x, y, bar in frame_marks.tolist()
+            if bar != -2.0
+        ]
+        if selected_mark != previous_selected:
+            points.extend(
+                mark
+                for mark in (previous_selected, selected_mark)
+                if mark is not None
             )
+        if len(points) > const.MAX_DIRTY_RECTS:
+            return None
 
-            # Рисуем индикатор прогресса задания, если у работника есть задание
-            if worker.current_task:
-                progress = (
-                    worker.current_task.progress / worker.current_task.duration
-                )
-                indicator_width = const.PROGRESS_BAR_WIDTH * self.zoom
-                pygame.draw.rect(
-                    self.office_display_surface,
-                    const.BLACK,
-                    (x - indicator_width / 2, y - 15, indicator_width, 5),
-                )
-                pygame.draw.rect(
-                    self.office_display_surface,
-                    const.GREEN,
-                    (
-                        x - indicator_width / 2,
-                        y - 15,
-                        indicator_width * progress,
-                        5,
-                    ),
-                )
+        half_width = (
+            max(
+                selected_radius,
+                math.ceil(const.PROGRESS_BAR_WIDTH * self.zoom / 2),
+            )
+            + 2
+        )
+        top = max(selected_radius, 15) + 2
+        bottom = selected_radius + 2
+        return [
+            pygame.Rect(
+                x - half_width, y - top, 2 * half_width + 1, top + bottom + 1
+            )
+            for x, y in points
+        ]
+
+    def _worker_positions(self):
+        """Работники и массивы их координат и присутствия в офисе"""
+        state = self.simulation.worker_state
+        if state is not None:
+            n = state.size
+            return (
+                state.workers,
+                state.x[:n],
+                state.y[:n],
+                state.is_at_office[:n],
+            )
+
+        workers = list(self.simulation.workers.values())
+        count = len(workers)
+        return (
+            workers,
+            np.fromiter((w.x for w in workers), np.float64, count),
+            np.fromiter((w.y for w in workers), np.float64, count),
+            np.fromiter((w.is_at_office for w in workers), bool, count),
+        )
+
+    def _draw_worker_density(self, screen_x, screen_y):
+        """Точки плотности работников по ячейкам экранной сетки"""
+        cell = const.DENSITY_CELL_SIZE
+        cells_x = (screen_x // cell).astype(np.int64)
+        cells_y = (screen_y // cell).astype(np.int64)
+        keys, counts = np.unique(
+            np.stack((cells_x, cells_y), axis=1), axis=0, return_counts=True
+        )
+        levels = np.searchsorted(DENSITY_LEVELS, counts)
+        dots = self.worker_sprites.density_dots()
+        self.office_display_surface.blits(
+            [
+                (dots[level], (cx * cell, cy * cell))
+                for (cx, cy), level in zip(keys.tolist(), levels.tolist())
+            ],
+            doreturn=False,
+        )
 
     def _draw_info_panel(self):
         """Отрисовка информационной панели."""
@@ -350,16 +670,22 @@ class WorkSpaceSimApp:
         )
 
         # Рисуем заголовок
-        title = self.title_font.render('WorkSpaceSim', True, const.BLACK)
+        title = self.text_cache.render(
+            self.title_font, 'WorkSpaceSim', const.BLACK
+        )
         self.screen.blit(title, (panel_x + 10, 10))
 
         # Рисуем время симуляции
         time_text = self.simulation.get_current_time_str()
-        time_label = self.info_font.render(time_text, True, const.BLACK)
+        time_label = self.text_cache.render(
+            self.info_font, time_text, const.BLACK
+        )
         self.screen.blit(time_label, (panel_x + 10, 80))
 
         # Рисуем ввод сида
-        seed_label = self.info_font.render('Сид:', True, const.BLACK)
+        seed_label = self.text_cache.render(
+            self.info_font, 'Сид:', const.BLACK
+        )
         self.screen.blit(seed_label, (panel_x + 10, 110))
 
         seed_box_color = (
@@ -370,8 +696,8 @@ class WorkSpaceSimApp:
             seed_box_color,
             (panel_x + 10, 140, self.info_panel_width - 20, 30),
         )
-        seed_value = self.info_font.render(
-            self.seed_input_text, True, const.BLACK
+        seed_value = self.text_cache.render(
+            self.info_font, self.seed_input_text, const.BLACK
         )
         self.screen.blit(seed_value, (panel_x + 15, 145))
 
@@ -386,7 +712,11 @@ class WorkSpaceSimApp:
         speed_text = f'Скорость: {speed_label} (×{self.current_speed_level})'
         if self.paused:
             speed_text += ' (Пауза)'
-        speed_info = self.info_font.render(speed_text, True, const.BLACK)
+        elif self.sim_lagging:
+            speed_text += ' (не успевает)'
+        speed_info = self.text_cache.render(
+            self.info_font, speed_text, const.BLACK
+        )
         self.screen.blit(speed_info, (panel_x + 10, 180))
 
         # Рисуем справку по управлению
@@ -403,7 +733,9 @@ class WorkSpaceSimApp:
         ]
 
         for i, control in enumerate(controls):
-            control_label = self.font.render(control, True, const.BLACK)
+            control_label = self.text_cache.render(
+                self.font, control, const.BLACK
+            )
             self.screen.blit(control_label, (panel_x + 10, 220 + i * 20))
 
         # Отображаем информацию о выбранном работнике
@@ -421,8 +753,10 @@ class WorkSpaceSimApp:
             1,
         )
 
-        worker_title = self.info_font.render(
-            f'Работник: {self.selected_worker.name}', True, const.BLACK
+        worker_title = self.text_cache.render(
+            self.info_font,
+            f'Работник: {self.selected_worker.name}',
+            const.BLACK,
         )
         self.screen.blit(worker_title, (panel_x + 10, worker_y))
 
@@ -431,13 +765,16 @@ class WorkSpaceSimApp:
             f'Должность: {self.selected_worker.position.value}',
             f'Личность: {self.selected_worker.personality.value}',
             f'Настроение: {self.selected_worker.mood:.2f}',
-            f'Выполнено заданий: {len(self.selected_worker.completed_tasks)}',
-            f'Провалено заданий: {len(self.selected_worker.failed_tasks)}',
+            f'Выполнено заданий: {self.selected_worker.stats.completed}',
+            f'Провалено заданий: {self.selected_worker.stats.failed}',
+            f'Успешность: {self.selected_worker.stats.success_ratio:.0%}',
         ]
 
         for i, info in enumerate(worker_info):
-            info_label = self.font.render(info, True, const.BLACK)
-            self.screen.blit(info_label, (panel_x + 10, worker_y + 30 + i * 20))
+            info_label = self.text_cache.render(self.font, info, const.BLACK)
+            self.screen.blit(
+                info_label, (panel_x + 10, worker_y + 30 + i * 20)
+            )
 
         # Рисуем текущее задание, если есть
         if self.selected_worker.current_task:
@@ -445,7 +782,9 @@ class WorkSpaceSimApp:
 
     def _draw_task_info(self, panel_x, task_y):
         """Отрисовка информации о текущем задании работника."""
-        task_title = self.info_font.render('Текущее задание:', True, const.BLACK)
+        task_title = self.text_cache.render(
+            self.info_font, 'Текущее задание:', const.BLACK
+        )
         self.screen.blit(task_title, (panel_x + 10, task_y))
 
         task = self.selected_worker.current_task
@@ -457,7 +796,7 @@ class WorkSpaceSimApp:
         ]
 
         for i, info in enumerate(task_info):
-            info_label = self.font.render(info, True, const.BLACK)
+            info_label = self.text_cache.render(self.font, info, const.BLACK)
             self.screen.blit(info_label, (panel_x + 10, task_y + 30 + i * 20))
 
     def _draw_task_panel(self):
@@ -481,21 +820,27 @@ class WorkSpaceSimApp:
         )
 
         # Рисуем заголовок
-        title = self.title_font.render('Доступные задания', True, const.BLACK)
+        title = self.text_cache.render(
+            self.title_font, 'Доступные задания', const.BLACK
+        )
         self.screen.blit(title, (panel_x + 10, panel_y + 10))
 
         # Рисуем список заданий
         for i, task in enumerate(
-            self.simulation.available_tasks[: const.MAX_TASKS_DISPLAYED]
+            islice(self.simulation.available_tasks, const.MAX_TASKS_DISPLAYED)
         ):
             y_pos = panel_y + 40 + i * 20
             task_text = f'{task.name} - {task.duration}мин'
-            task_label = self.font.render(task_text, True, const.BLACK)
+            task_label = self.text_cache.render(
+                self.font, task_text, const.BLACK
+            )
             self.screen.blit(task_label, (panel_x + 10, y_pos))
 
         # Рисуем инструкции по закрытию
         close_text = 'Нажмите T для закрытия'
-        close_label = self.font.render(close_text, True, const.BLACK)
+        close_label = self.text_cache.render(
+            self.font, close_text, const.BLACK
+        )
         self.screen.blit(
             close_label,
             (panel_x + panel_width - 150, panel_y + panel_height - 20),
@@ -506,10 +851,11 @@ class WorkSpaceSimApp:
         running = True
         while running:
             running = self.handle_events()
-            self.update()
+            self.update(self.clock.get_time())
             self.draw()
             self.clock.tick(const.FPS)
 
+        self.close_simulation()
         pygame.quit()
         sys.exit()
 
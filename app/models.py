@@ -1,15 +1,28 @@
-import json
 import logging
 import math
-import os
 import random
-import uuid
 from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
+from journal import (
+    EVENT_FAIL,
+    EVENT_ROOM_CHANGED,
+    EVENT_SCENARIO_ACTIVATED,
+    EVENT_TASK_ASSIGNED,
+    EVENT_TASK_COMPLETED,
+    EVENT_TASK_FAILED,
+)
+from layout_cache import LAYOUT_CACHE, Layout, LayoutCache
 from scenario_loader import ScenarioLoader
+from spatial_index import RoomIndex, WorkerGrid
+from task_pool import TaskPool
+from task_store import TASK_RETENTION_DAYS, TaskStore
+from task_templates import TaskTemplateStore
 from weather_simulator import WeatherSimulator
+from worker_stats import WorkerStats
 
 
 # Перечисления для свойств работников
@@ -46,6 +59,39 @@ class Personality(Enum):
     CHAOTIC = 'Chaotic'  # Непредсказуемое поведение
 
 
+def coerce_position(value: Any) -> Any:
+    """
+    Привести должность из JSON (значение или имя элемента) к Position
+
+    Неизвестные строки возвращаются как есть: такое задание не подойдет
+    ни одному работнику, как и раньше.
+    """
+    if value is None or isinstance(value, Position):
+        return value
+    try:
+        return Position(value)
+    except ValueError:
+        return Position.__members__.get(str(value).upper(), value)
+
+
+class IdAllocator:
+    """Источник возрастающих целых ID для объектов одной симуляции"""
+
+    __slots__ = ('next_id',)
+
+    def __init__(self, start: int = 1):
+        self.next_id = start
+
+    def __call__(self) -> int:
+        value = self.next_id
+        self.next_id += 1
+        return value
+
+
+# ID для объектов, созданных вне симуляции
+DEFAULT_IDS = IdAllocator()
+
+
 class RoomType(Enum):
     OFFICE = 'Office'
     MEETING_ROOM = 'Meeting Room'
@@ -57,6 +103,21 @@ class RoomType(Enum):
 
 # Класс Task, представляющий рабочее задание
 class Task:
+    __slots__ = (
+        'id',
+        'name',
+        'description',
+        'duration',
+        'success_rate',
+        'status',
+        'required_position',
+        'fail_event',
+        'assigned_to',
+        'progress',
+        'scenario_id',
+        'scenario_task_id',
+    )
+
     def __init__(
         self,
         name: str,
@@ -65,9 +126,9 @@ class Task:
         success_rate: float,
         required_position: Optional[Position] = None,
         fail_event: Optional[str] = None,
-        id: Optional[str] = None,
+        id: Optional[int] = None,
     ):
-        self.id = id if id is not None else str(uuid.uuid4())
+        self.id = id if id is not None else DEFAULT_IDS()
         self.name = name
         self.description = description
         self.duration = duration  # в минутах
@@ -77,19 +138,27 @@ class Task:
         self.fail_event = fail_event
         self.assigned_to = None
         self.progress = 0
+        # Происхождение: сценарий и ID задания в его JSON (если есть)
+        self.scenario_id: Optional[str] = None
+        self.scenario_task_id: Optional[str] = None
+
+    @property
+    def display_id(self) -> str:
+        """ID для отображения"""
+        return f'T-{self.id}'
 
     def can_be_assigned_to(self, worker) -> bool:
         if self.required_position is None:
             return True
         return worker.position == self.required_position
 
-    def update(self, elapsed_time: int) -> None:
+    def update(self, elapsed_time: int, rng=random) -> None:
         """Обновить прогресс задания на основе прошедшего времени"""
         if self.status == TaskStatus.IN_PROGRESS:
             self.progress += elapsed_time
             if self.progress >= self.duration:
                 # Задание завершено, определяем успех или неудачу
-                if random.random() < self.get_adjusted_success_rate():
+                if rng.random() < self.get_adjusted_success_rate():
                     self.status = TaskStatus.COMPLETED
                 else:
                     self.status = TaskStatus.FAILED
@@ -113,24 +182,64 @@ class Task:
 
 # Класс Worker, представляющий сотрудника
 class Worker:
-    def __init__(self, name: str, department: Department, position: Position):
-        self.id = str(uuid.uuid4())
+    __slots__ = (
+        'id',
+        'rng',
+        'name',
+        'department',
+        'position',
+        'personality',
+        'mood',
+        'current_task',
+        'stats',
+        'pending_failed_tasks',
+        'x',
+        'y',
+        'target_x',
+        'target_y',
+        'speed',
+        'current_room',
+        'is_at_office',
+        'productivity',
+        'grid',
+    )
+
+    def __init__(
+        self,
+        name: str,
+        department: Department,
+        position: Position,
+        rng: Optional[random.Random] = None,
+        id: Optional[int] = None,
+    ):
+        self.id = id if id is not None else DEFAULT_IDS()
+        # Генератор случайных чисел симуляции, которой принадлежит работник
+        self.rng = rng if rng is not None else random
         self.name = name
         self.department = department
         self.position = position
-        self.personality = random.choice(list(Personality))
-        self.mood = random.uniform(0.5, 1.0)  # 0.0-1.0
+        self.personality = self.rng.choice(list(Personality))
+        self.mood = self.rng.uniform(0.5, 1.0)  # 0.0-1.0
         self.current_task = None
-        self.completed_tasks: list[Task] = []
-        self.failed_tasks: list[Task] = []
+        # Счетчики и гистограммы заданий фиксированного размера
+        self.stats = WorkerStats()
+        # Проваленные задания, еще не обработанные симуляцией (происшествия)
+        self.pending_failed_tasks: list[Task] = []
         self.x = 0  # позиция в офисе
         self.y = 0
         self.target_x = 0  # цель движения
         self.target_y = 0
-        self.speed = random.uniform(1.5, 3.0)  # скорость передвижения
+        self.speed = self.rng.uniform(1.5, 3.0)  # скорость передвижения
         self.current_room = None
         self.is_at_office = True  # флаг присутствия в офисе
         self.productivity = 0  # показатель продуктивности за день
+        # Сетка работников, которой сообщается о перемещениях (WorkerGrid)
+        self.grid = None
+
+    @property
+    def display_id(self) -> str:
+        """ID для отображения"""
+        return f'W-{self.id}'
 
     def assign_task(self, task: Task) -> bool:
         """Назначить задание этому работнику, если возможно"""
@@ -151,21 +260,29 @@ class Worker:
         if not self.is_at_office:
             return
 
-        # Обновить текущее задание, если есть
+        self._update_task(elapsed_time)
+
+        # Движение к целевой точке
+        self._move(elapsed_time)
+
+    def _update_task(self, elapsed_time: int) -> None:
+        """Обновить текущее задание, если есть"""
         if self.current_task:
-            self.current_task.update(elapsed_time)
+            self.current_task.update(elapsed_time, self.rng)
             if self.current_task.status == TaskStatus.COMPLETED:
-                self.completed_tasks.append(self.current_task)
-                self.mood = min(1.0, self.mood + 0.1)
+                self.stats.record(self.current_task.name, True)
+                self._change_mood(0.1)
                 self.productivity += 1
                 self.current_task = None
             elif self.current_task.status == TaskStatus.FAILED:
-                self.failed_tasks.append(self.current_task)
-                self.mood = max(0.0, self.mood - 0.1)
+                self.stats.record(self.current_task.name, False)
+                self.pending_failed_tasks.append(self.current_task)
+                self._change_mood(-0.1)
                 self.current_task = None
 
-        # Движение к целевой точке
-        self._move(elapsed_time)
+    def _change_mood(self, delta: float) -> None:
+        """Изменить настроение с ограничением в диапазоне 0.0-1.0"""
+        self.mood = max(0.0, min(1.0, self.mood + delta))
 
     def _move(self, elapsed_time: int) -> None:
         """Перемещение работника к целевой позиции"""
@@ -176,14 +293,16 @@ class Worker:
         if distance < 1:  # Достаточно близко к цели
             self.x = self.target_x
             self.y = self.target_y
-            return
+        else:
+            # Нормализуем направление и применяем скорость
+            move_distance = min(
+                distance, self.speed * elapsed_time / 60
+            )  # конвертируем в секунды
+            self.x += (dx / distance) * move_distance
+            self.y += (dy / distance) * move_distance
 
-        # Нормализуем направление и применяем скорость
-        move_distance = min(
-            distance, self.speed * elapsed_time / 60
-        )  # конвертируем в секунды
-        self.x += (dx / distance) * move_distance
-        self.y += (dy / distance) * move_distance
+        if self.grid is not None:
+            self.grid.move(self)
 
     def leave_office(self) -> None:
         """Работник покидает офис в конце рабочего дня"""
@@ -206,16 +325,20 @@ class Worker:
         self.y = -100
         self.target_x = -100
         self.target_y = -100
+        if self.grid is not None:
+            self.grid.remove(self)
 
     def enter_office(self, room: 'Room') -> None:
         """Работник приходит в офис в начале рабочего дня"""
         self.is_at_office = True
-        x, y = room.get_random_position()
+        x, y = room.get_random_position(self.rng)
         self.x = x
         self.y = y
         self.target_x = x
         self.target_y = y
         room.add_occupant(self)
+        if self.grid is not None:
+            self.grid.move(self)
 
         # Настроение в начале дня зависит от личности
         if self.personality == Personality.DILIGENT:
@@ -235,10 +358,27 @@ class Worker:
 
 # Класс Room для офисных помещений
 class Room:
+    __slots__ = (
+        'id',
+        'room_type',
+        'x',
+        'y',
+        'width',
+        'height',
+        'occupants',
+        'events',
+    )
+
     def __init__(
-        self, room_type: RoomType, x: int, y: int, width: int, height: int
+        self,
+        room_type: RoomType,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        id: Optional[int] = None,
     ):
-        self.id = str(uuid.uuid4())
+        self.id = id if id is not None else DEFAULT_IDS()
         self.room_type = room_type
         self.x = x
         self.y = y
@@ -249,6 +389,11 @@ class Room:
             str
         ] = []  # Текущие события в комнате (например, "разлив воды")
 
+    @property
+    def display_id(self) -> str:
+        """ID для отображения"""
+        return f'R-{self.id}'
+
     def contains_point(self, x: int, y: int) -> bool:
         """Проверить, содержит ли комната точку"""
         return (
@@ -269,29 +414,57 @@ class Room:
             if worker.current_room == self:
                 worker.current_room = None
 
-    def get_random_position(self) -> Tuple[int, int]:
+    def get_random_position(self, rng=random) -> Tuple[int, int]:
         """Получить случайную позицию внутри комнаты"""
         return (
-            random.randint(self.x + 1, self.x + self.width - 1),
-            random.randint(self.y + 1, self.y + self.height - 1),
+            rng.randint(self.x + 1, self.x + self.width - 1),
+            rng.randint(self.y + 1, self.y + self.height - 1),
         )
 
 
 # Генератор офисной планировки
 class OfficeGenerator:
-    def __init__(self, seed=None):
-        if seed is not None:
-            random.seed(seed)
+    # Версия алгоритма планировки: увеличивать при любом изменении генерации,
+    # чтобы кэш планировок не отдавал устаревшие
+    VERSION = 1
+
+    def __init__(self, seed=None, cache: Optional[LayoutCache] = LAYOUT_CACHE):
         self.seed = seed or random.randint(1, 1000000)
+        # Собственный генератор: планировка зависит только от сида
+        self.rng = random.Random(self.seed)
         self.width = 800
         self.height = 600
         self.rooms: list[Room] = []
         self.corridors: list[Room] = []
+        # Кэш планировок (None - генерировать каждый раз)
+        self.cache = cache
+        # Планировка последнего generate() с производными индексами
+        self.layout: Optional[Layout] = None
+
+    @property
+    def params(self) -> tuple:
+        """Параметры, от которых зависит планировка (кроме сида)"""
+        return (self.width, self.height)
 
     def generate(self) -> list[Room]:
-        """Сгенерировать процедурную планировку офиса с заданным сидом"""
+        """
+        Сгенерировать процедурную планировку офиса с заданным сидом
+
+        Готовая планировка берется из кэша по ключу (сид, параметры,
+        версия); комнаты в любом случае возвращаются новыми объектами.
+        """
+        key = (self.seed, self.params, self.VERSION)
+        layout = self.cache.get(key) if self.cache is not None else None
+        if layout is not None:
+            self.rooms = layout.build_rooms(Room)
+            self.corridors = [
+                r for r in self.rooms if r.room_type == RoomType.CORRIDOR
+            ]
+            self.layout = layout
+            return self.rooms
+
         # Сбросить состояние
-        random.seed(self.seed)
+        self.rng.seed(self.seed)
         self.rooms = []
         self.corridors = []
 
@@ -303,6 +476,13 @@ class OfficeGenerator:
         # Добавляем различные комнаты
         self._add_rooms()
 
+        # ID комнат зависят только от планировки: 1..N в порядке списка
+        for room_id, room in enumerate(self.rooms, 1):
+            room.id = room_id
+
+        self.layout = Layout.from_rooms(self.rooms)
+        if self.cache is not None:
+            self.cache.put(key, self.layout)
         return self.rooms
 
     def _create_corridor(self) -> Room:
@@ -345,20 +525,20 @@ class OfficeGenerator:
         corridor = self.corridors[0]
 
         # Добавляем офисы вдоль коридора
-        room_count = random.randint(4, 8)
+        room_count = self.rng.randint(4, 8)
         room_types = [RoomType.OFFICE] * (room_count - 3) + [
             RoomType.MEETING_ROOM,
             RoomType.KITCHEN,
             RoomType.RESTROOM,
         ]
-        random.shuffle(room_types)
+        self.rng.shuffle(room_types)
 
         # Добавляем комнаты вдоль горизонтальной части коридора
         corridor_y = corridor.y
         x_start = corridor.x + corridor.width // 4
         for i in range(3):
-            room_width = random.randint(60, 100)
-            room_height = random.randint(60, 80)
+            room_width = self.rng.randint(60, 100)
+            room_height = self.rng.randint(60, 80)
             room = Room(
                 room_types[i],
                 x_start,
@@ -367,15 +547,15 @@ class OfficeGenerator:
                 room_height,
             )
             self.rooms.append(room)
-            x_start += room_width + random.randint(10, 30)
+            x_start += room_width + self.rng.randint(10, 30)
 
         # Добавляем комнаты вдоль вертикальной части коридора
         corridor_x = corridor.x
         y_start = corridor.y + corridor.height // 3
         for i in range(3, 6):
             if i < len(room_types):
-                room_width = random.randint(60, 100)
-                room_height = random.randint(60, 80)
+                room_width = self.rng.randint(60, 100)
+                room_height = self.rng.randint(60, 80)
                 room = Room(
                     room_types[i],
                     corridor_x + corridor.width // 4,
@@ -384,7 +564,7 @@ class OfficeGenerator:
                     room_height,
                 )
                 self.rooms.append(room)
-                y_start += room_height + random.randint(10, 30)
+                y_start += room_height + self.rng.randint(10, 30)
 
         # Добавляем ресепшн у входа
         reception = Room(
@@ -393,6 +573,82 @@ class OfficeGenerator:
         self.rooms.append(reception)
 
 
+# Встроенные шаблоны заданий, из которых генерируется пул
+BUILTIN_TASK_TEMPLATES: list[dict[str, Any]] = [
+    # Общие задания
+    {
+        'name': 'Review documents',
+        'description': 'Review important project documents',
+        'duration': 60,
+        'success_rate': 0.8,
+    },
+    {
+        'name': 'Team meeting',
+        'description': 'Attend team sync meeting',
+        'duration': 45,
+        'success_rate': 0.9,
+    },
+    {
+        'name': 'Send emails',
+        'description': 'Send important emails to clients',
+        'duration': 30,
+        'success_rate': 0.85,
+    },
+    {
+        'name': 'Phone call',
+        'description': 'Make an important phone call',
+        'duration': 15,
+        'success_rate': 0.75,
+    },
+    {
+        'name': 'Coffee break',
+        'description': 'Take a coffee break',
+        'duration': 15,
+        'success_rate': 0.95,
+    },
+    # Задания с возможными сбоями
+    {
+        'name': 'Fill water glass',
+        'description': 'Fill glass from water cooler',
+        'duration': 5,
+        'success_rate': 0.7,
+        'fail_event': 'Water spill',
+    },
+    {
+        'name': 'Carry documents',
+        'description': 'Carry stack of documents to another room',
+        'duration': 10,
+        'success_rate': 0.6,
+        'fail_event': 'Dropped papers',
+    },
+    {
+        'name': 'Bring coffee',
+        'description': 'Bring coffee to colleague',
+        'duration': 8,
+        'success_rate': 0.65,
+        'fail_event': 'Coffee spill',
+    },
+    # Задания для конкретных отделов
+    {
+        'name': 'Code review',
+        'description': 'Review code for the project',
+        'duration': 60,
+        'success_rate': 0.7,
+        'required_position': Position.SENIOR,
+    },
+    {
+        'name': 'Interview candidate',
+        'description': 'Interview job candidate',
+        'duration': 90,
+        'success_rate': 0.8,
+        'required_position': Position.MANAGER,
+    },
+]
+
+# Реестр шаблонов, общий для всех симуляций процесса
+TASK_TEMPLATES = TaskTemplateStore(builtin_templates=BUILTIN_TASK_TEMPLATES)
+
+
 # Класс симуляции для управления офисом
 class OfficeSimulation:
     """Симуляция офиса"""
@@ -404,14 +660,60 @@ class OfficeSimulation:
         else:
             self.seed = config  # Если передано прямое значение (int)
 
-        self.generator = OfficeGenerator(self.seed)
+        # Векторизованный движок: состояние работников в столбцах NumPy
+        self.worker_state = None
+        if isinstance(config, dict) and config.get('vectorized'):
+            # Импорт по требованию: движок зависит от numpy и от этого модуля
+            from worker_state import WorkerStateArrays
+
+            self.worker_state = WorkerStateArrays()
+
+        # Кампус из многих зданий вместо одного этажа: блоки комнат
+        # генерируются по мере надобности (campus.CampusGenerator)
+        self.campus = None
+        if isinstance(config, dict) and config.get('campus'):
+            # Импорт по требованию: генератор кампуса зависит от этого модуля
+            from campus import CampusGenerator
+
+            options = config['campus']
+            self.campus = CampusGenerator(
+                self.seed, **(options if isinstance(options, dict) else {})
+            )
+        self.generator = self.campus or OfficeGenerator(self.seed)
+        # Блок кампуса с рабочим местом каждого работника (по ID)
+        self.home_chunks: dict[int, tuple] = {}
+        # Целые ID работников и заданий этой симуляции
+        self.ids = IdAllocator()
+        # Генератор случайных чисел этой симуляции (работники, задания, погода)
+        self.rng = random.Random(self.generator.seed)
         self.rooms: list[Room] = []
-        self.workers: dict[str, Worker] = {}
-        self.tasks: dict[str, Task] = {}
-        self.available_tasks: list[Task] = []
+        self.room_index = RoomIndex(self.rooms)
+        self.rooms_by_type: dict[RoomType, list[Room]] = {}
+        self._worker_room_ids = None  # комнаты работников с прошлого тика
+        self.workers: dict[int, Worker] = {}
+        self._worker_grid: Optional[WorkerGrid] = None
+        # Живые задания по ID; завершенные уплотняются в конце дня
+        self.tasks = TaskStore(
+            (TaskStatus.COMPLETED, TaskStatus.FAILED),
+            config.get('task_retention_days', TASK_RETENTION_DAYS)
+            if isinstance(config, dict)
+            else TASK_RETENTION_DAYS,
+        )
+        self.available_tasks = TaskPool()
         self.time = 8 * 60  # 8:00 утра в минутах
         self.day = 1
-        self.weather = WeatherSimulator(self.seed)
+        self.ticks = 0  # число выполненных шагов step
+        self.failed_task_count = 0  # всего проваленных заданий за прогон
+        # Журнал событий (EventJournal) и часы для условий сценариев;
+        # при воспроизведении журнала часы подменяются записанными
+        self.journal = None
+        self.clock = datetime.now
+        # Архив полной истории заданий на диске (TaskHistoryArchive)
+        self.history_archive = None
+        # Средняя продуктивность в офисе (None - нужно пересчитать)
+        self._average_productivity: Optional[float] = None
+        self.weather = WeatherSimulator(self.seed, rng=self.rng)
+        self.task_templates = TASK_TEMPLATES
         self.scenario_loader = ScenarioLoader()
         self.scenarios: dict[str, dict[str, Any]] = (
             self.scenario_loader.load_all_scenarios()
@@ -421,7 +723,7 @@ class OfficeSimulation:
     def initialize(self, worker_count=10):
         """Инициализировать симуляцию с процедурным офисом и работниками"""
         # Генерируем планировку офиса
-        self.rooms = self.generator.generate()
+        self._set_rooms(self.generator.generate(), self.generator.layout)
 
         # Создаем работников
         departments = list(Department)
@@ -431,17 +733,15 @@ class OfficeSimulation:
 
         for i in range(worker_count):
             name = f'Worker-{i + 1}'
-            department = random.choice(departments)
-            position = random.choice(positions)
-            worker = Worker(name, department, position)
+            department = self.rng.choice(departments)
+            position = self.rng.choice(positions)
+            worker = self._create_worker(name, department, position)
 
             # Размещаем работника в подходящей комнате
-            suitable_rooms = [
-                r for r in self.rooms if r.room_type == RoomType.OFFICE
-            ]
+            suitable_rooms = self._rooms_of_type(RoomType.OFFICE, worker)
             if suitable_rooms:
-                room = random.choice(suitable_rooms)
-                x, y = room.get_random_position()
+                room = self.rng.choice(suitable_rooms)
+                x, y = room.get_random_position(self.rng)
                 worker.x = x
                 worker.y = y
                 worker.target_x = x
@@ -451,99 +751,131 @@ class OfficeSimulation:
             self.workers[worker.id] = worker
 
         # Добавляем одного охранника
-        security = Worker('Security', Department.SUPPORT, Position.SECURITY)
+        security = self._create_worker(
+            'Security', Department.SUPPORT, Position.SECURITY
+        )
         reception = next(
-            (r for r in self.rooms if r.room_type == RoomType.RECEPTION), None
+            iter(self._rooms_of_type(RoomType.RECEPTION, security)), None
         )
         if reception:
-            x, y = reception.get_random_position()
+            x, y = reception.get_random_position(self.rng)
             security.x = x
             security.y = y
             security.target_x = x
             security.target_y = y
             reception.add_occupant(security)
         self.workers[security.id] = security
+        self._sync_campus_rooms()
 
         # Создаем начальный пул заданий
         self._generate_tasks(20)
 
+    def _set_rooms(
+        self, rooms: list[Room], layout: Optional[Layout] = None
+    ) -> None:
+        """
+        Установить планировку и перестроить индексы комнат
+
+        Индексы готовой планировки (layout из кэша) берутся без пересчета.
+        """
+        self.rooms = rooms
+        if layout is not None:
+            self.room_index = layout.room_index(rooms)
+            self.rooms_by_type = layout.rooms_by_type(rooms)
+        else:
+            self.room_index = RoomIndex(rooms)
+            self.rooms_by_type = {}
+            for room in rooms:
+                self.rooms_by_type.setdefault(room.room_type, []).append(room)
+        self._worker_room_ids = None
+
+    def _sync_campus_rooms(self) -> None:
+        """Перейти на новый список комнат кампуса после подгрузки блоков"""
+        if self.campus is not None and self.campus.rooms is not self.rooms:
+            self._set_rooms(self.campus.rooms)
+
+    def _rooms_of_type(
+        self, room_type: RoomType, worker: Optional[Worker] = None
+    ) -> list[Room]:
+        """
+        Комнаты заданного типа, доступные работнику
+
+        В кампусе это комнаты блока с рабочим местом работника: блок
+        назначается при первом обращении (CampusGenerator.assign_home).
+        Список комнат симуляции обновляется в _sync_campus_rooms. Иначе
+        возвращается список из индекса по типам - его нельзя изменять.
+        """
+        if self.campus is None or worker is None:
+            return self.rooms_by_type.get(room_type, [])
+
+        key = self.home_chunks.get(worker.id)
+        if key is None:
+            if worker.position == Position.SECURITY:
+                key = self.campus.entrance_chunk
+            else:
+                key = self.campus.assign_home()
+            self.home_chunks[worker.id] = key
+        rooms = self.campus.load_chunk(key)
+        return [r for r in rooms if r.room_type == room_type]
+
+    def load_area(
+        self, x: float, y: float, width: float, height: float
+    ) -> None:
+        """Подгрузить блоки кампуса в прямоугольнике (например, области вида)"""
+        if self.campus is not None:
+            self.campus.load_rect(x, y, width, height)
+            self._sync_campus_rooms()
+
+    @property
+    def worker_grid(self) -> WorkerGrid:
+        """
+        Сетка работников в офисе для поиска по координатам
+
+        Создается при первом обращении. Обычные работники обновляют ее сами
+        при перемещении; для векторизованного движка она перестраивается из
+        столбцов координат, если с прошлого запроса прошел шаг.
+        """
+        grid = self._worker_grid
+        if grid is None:
+            grid = self._worker_grid = WorkerGrid()
+            if self.worker_state is None:
+                grid.track(self.workers.values())
+
+        state = self.worker_state
+        if state is not None and grid.version != self.ticks:
+            n = state.size
+            grid.rebuild(
+                state.workers,
+                state.x[:n],
+                state.y[:n],
+                state.is_at_office[:n],
+                self.ticks,
+            )
+        return grid
+
+    def find_worker_at(
+        self, x: float, y: float, radius: float
+    ) -> Optional[Worker]:
+        """Найти работника в офисе не дальше radius от точки"""
+        return self.worker_grid.find(x, y, radius)
+
+    def _create_worker(
+        self, name: str, department: Department, position: Position
+    ) -> Worker:
+        """Создать работника для текущего движка симуляции"""
+        if self.worker_state is not None:
+            return self.worker_state.create_worker(
+                name, department, position, self.rng, self.ids()
+            )
+        return Worker(name, department, position, self.rng, self.ids())
+
     def _generate_tasks(self, count: int) -> None:
         """Сгенерировать набор заданий"""
-        task_templates = [
-            # Общие задания
-            {
-                'name': 'Review documents',
-                'description': 'Review important project documents',
-                'duration': 60,
-                'success_rate': 0.8,
-            },
-            {
-                'name': 'Team meeting',
-                'description': 'Attend team sync meeting',
-                'duration': 45,
-                'success_rate': 0.9,
-            },
-            {
-                'name': 'Send emails',
-                'description': 'Send important emails to clients',
-                'duration': 30,
-                'success_rate': 0.85,
-            },
-            {
-                'name': 'Phone call',
-                'description': 'Make an important phone call',
-                'duration': 15,
-                'success_rate': 0.75,
-            },
-            {
-                'name': 'Coffee break',
-                'description': 'Take a coffee break',
-                'duration': 15,
-                'success_rate': 0.95,
-            },
-            # Задания с возможными сбоями
-            {
-                'name': 'Fill water glass',
-                'description': 'Fill glass from water cooler',
-                'duration': 5,
-                'success_rate': 0.7,
-                'fail_event': 'Water spill',
-            },
-            {
-                'name': 'Carry documents',
-                'description': 'Carry stack of documents to another room',
-                'duration': 10,
-                'success_rate': 0.6,
-                'fail_event': 'Dropped papers',
-            },
-            {
-                'name': 'Bring coffee',
-                'description': 'Bring coffee to colleague',
-                'duration': 8,
-                'success_rate': 0.65,
-                'fail_event': 'Coffee spill',
-            },
-            # Задания для конкретных отделов
-            {
-                'name': 'Code review',
-                'description': 'Review code for the project',
-                'duration': 60,
-                'success_rate': 0.7,
-                'required_position': Position.SENIOR,
-            },
-            {
-                'name': 'Interview candidate',
-                'description': 'Interview job candidate',
-                'duration': 90,
-                'success_rate': 0.8,
-                'required_position': Position.MANAGER,
-            },
-        ]
-
+        templates = self.task_templates.builtin
         for _ in range(count):
-            template = random.choice(task_templates)
-            task = Task(**template)
-            self.tasks[task.id] = task
+            template = self.rng.choice(templates)
+            task = Task(**template, id=self.ids())
+            self.tasks.add(task)
             self.available_tasks.append(task)
 
     def _load_scenarios(self):
@@ -558,93 +890,91 @@ class OfficeSimulation:
             self.logger.error(f'Не удалось загрузить сценарии: {str(e)}')
             self.scenarios = {}
 
-    def check_scenario_conditions(self, scenario_id: str) -> bool:
+    def check_scenario_conditions(
+        self, scenario_id: str, now: Optional[datetime] = None
+    ) -> bool:
         """Проверяет, выполняются ли условия для активации сценария"""
-        scenario = self.scenario_loader.get_scenario(scenario_id)
-        if not scenario:
+        requirements = self.scenario_loader.get_requirements(scenario_id)
+        if requirements is None:
             return False
 
-        # Проверка условий активации сценария
-        if 'requirements' not in scenario:
-            return True  # Нет условий - сценарий всегда активируется
-
-        requirements = scenario['requirements']
-
-        # Проверка времени
-        current_time = datetime.now().time()
-        if 'time_start' in requirements and 'time_end' in requirements:
-            time_start = datetime.strptime(
-                requirements['time_start'], '%H:%M'
-            ).time()
-            time_end = datetime.strptime(
-                requirements['time_end'], '%H:%M'
-            ).time()
-
-            if not (time_start <= current_time <= time_end):
-                return False
-
-        # Проверка дня недели
-        if 'weekdays' in requirements:
-            current_weekday = datetime.now().weekday()
-            if current_weekday not in requirements['weekdays']:
-                return False
-
-        # Проверка погоды
-        if 'weather' in requirements:
-            current_weather = self.weather.get_current_weather()
-            if current_weather not in requirements['weather']:
-                return False
-
-        # Проверка средней продуктивности
-        if (
-            'min_productivity' in requirements
-            or 'max_productivity' in requirements
-        ):
-            avg_productivity = self._get_average_productivity()
-
-            if (
-                'min_productivity' in requirements
-                and avg_productivity < requirements['min_productivity']
-            ):
-                return False
-
-            if (
-                'max_productivity' in requirements
-                and avg_productivity > requirements['max_productivity']
-            ):
-                return False
-
-        return True
+        return requirements.matches(
+            now or self.now(),
+            self.weather.get_current_weather(),
+            self._get_average_productivity()
+            if requirements.needs_productivity
+            else 0.0,
+        )
 
     def _get_average_productivity(self) -> float:
         """Получает среднюю продуктивность всех сотрудников в офисе"""
-        workers_in_office = [
-            w
-            for w in self.workers.values()
-            if hasattr(w, 'is_at_office') and w.is_at_office
-        ]
-        if not workers_in_office:
-            return 0.0
-
-        return sum(w.productivity for w in workers_in_office) / len(
-            workers_in_office
-        )
+        # Значение пересчитывается только после изменений (см.
+        # _invalidate_average_productivity); в тиковом режиме его
+        # заранее накапливает цикл update
+        if self._average_productivity is not None:
+            return self._average_productivity
+
+        if self.worker_state is not None:
+            state = self.worker_state
+            in_office = state.is_at_office[: state.size]
+            count = int(in_office.sum())
+            total = float(state.productivity[: state.size][in_office].sum())
+        else:
+            count = 0
+            total = 0
+            for w in self.workers.values():
+                if w.is_at_office:
+                    count += 1
+                    total += w.productivity
+
+        self._set_average_productivity(total, count)
+        return self._average_productivity
+
+    def _set_average_productivity(self, total: float, count: int) -> None:
+        """Запомнить среднюю продуктивность до следующего изменения"""
+        self._average_productivity = total / count if count else 0.0
+
+    def _invalidate_average_productivity(self) -> None:
+        """Сбросить среднюю продуктивность после изменений в офисе"""
+        self._average_productivity = None
+
+    def now(self) -> datetime:
+        """Текущее время для условий сценариев (попадает в журнал)"""
+        value = self.clock()
+        if self.journal is not None:
+            self.journal.record_clock(self.ticks, value)
+        return value
+
+    def _record(self, kind: int, *values: Optional[str]) -> None:
+        """Записать событие в журнал, если он подключен"""
+        if self.journal is not None:
+            self.journal.record(kind, self.ticks, *values)
+
+    def _record_task_result(self, worker: Worker, task: Task) -> None:
+        """Записать итог задания, которое работник только что сдал"""
+        if self.history_archive is not None:
+            self.history_archive.append(self.day, self.time, worker, task)
+        if task.status == TaskStatus.COMPLETED:
+            self._record(EVENT_TASK_COMPLETED, worker.id, task.id)
+        elif task.status == TaskStatus.FAILED:
+            self._record(EVENT_TASK_FAILED, worker.id, task.id)
 
     def check_random_scenarios(self):
         """Проверяет и активирует случайные сценарии"""
         random_scenarios = self.scenario_loader.get_scenarios_by_type('random')
+        now = self.now()
 
         for scenario in random_scenarios:
             scenario_id = scenario['id']
 
             # Проверяем, выполняются ли условия для активации сценария
-            if not self.check_scenario_conditions(scenario_id):
+            if not self.check_scenario_conditions(scenario_id, now):
                 continue
 
             # Вычисляем вероятность активации
             probability = scenario.get('probability', 0.1)
 
-            if random.random() <= probability:
+            if self.rng.random() <= probability:
                 self.activate_scenario(scenario_id)
 
     def activate_scenario(self, scenario_id: str):
@@ -657,6 +987,7 @@ class OfficeSimulation:
             return
 
         self.logger.info(f'Активирован сценарий: {scenario["name"]}')
+        self._record(EVENT_SCENARIO_ACTIVATED, scenario_id)
 
         # Создаем задачи из сценария
         if 'tasks' in scenario:
@@ -667,9 +998,13 @@ class OfficeSimulation:
         self, task_data: dict[str, Any], scenario_id: str
     ):
         """Создает задачу из данных сценария"""
-        task_id = task_data.get(
-            'id', f'{scenario_id}_{random.randint(1000, 9999)}'
-        )
+        # Каждое срабатывание дает новое задание со своим ID; ID из JSON
+        # хранится отдельно и не используется как ключ
+        task_id = self.ids()
+        scenario_task_id = task_data.get('id')
+        if scenario_task_id is not None:
+            # В JSON ID может быть числом; в снимке он хранится строкой
+            scenario_task_id = str(scenario_task_id)
 
         # Если есть ссылка на шаблон задачи, используем его
         if 'reference_task' in task_data:
@@ -681,22 +1016,30 @@ class OfficeSimulation:
 
         # Создаем задачу
         task = Task(
-            name=task_data.get('name', f'Задача {task_id}'),
+            name=task_data.get(
+                'name', f'Задача {scenario_task_id or task_id}'
+            ),
             description=task_data.get('description', ''),
             duration=task_data.get('duration', 30),
             success_rate=task_data.get('success_rate', 0.8),
-            required_position=task_data.get('required_position'),
+            required_position=coerce_position(
+                task_data.get('required_position')
+            ),
             fail_event=task_data.get('fail_event'),
+            id=task_id,
         )
+        task.scenario_id = scenario_id
+        task.scenario_task_id = scenario_task_id
 
         # Добавляем задачу в офис
-        self.tasks[task_id] = task
+        self.tasks.add(task)
 
         # Если указаны исполнители, назначаем задачу
         if 'assignees' in task_data:
-            for worker_id in task_data['assignees']:
-                if worker_id in self.workers:
-                    self.workers[worker_id].assign_task(task)
+            for worker_ref in task_data['assignees']:
+                worker = self._find_worker(worker_ref)
+                if worker is not None and worker.assign_task(task):
+                    self._record(EVENT_TASK_ASSIGNED, worker.id, task.id)
         else:
             # Если исполнители не указаны, выбираем случайных работников
             assignee_count = task_data.get('random_assignees', 1)
@@ -707,44 +1050,58 @@ class OfficeSimulation:
             ]
 
             if workers_in_office:
-                selected_workers = random.sample(
+                selected_workers = self.rng.sample(
                     workers_in_office,
                     min(assignee_count, len(workers_in_office)),
                 )
 
                 for worker in selected_workers:
-                    worker.assign_task(task)
+                    if worker.assign_task(task):
+                        self._record(EVENT_TASK_ASSIGNED, worker.id, task.id)
+
+    def _find_worker(self, worker_ref: Any) -> Optional[Worker]:
+        """Найти работника по ID, отображаемому ID или имени"""
+        worker = self.workers.get(worker_ref)
+        if worker is None and isinstance(worker_ref, str):
+            worker = next(
+                (
+                    w
+                    for w in self.workers.values()
+                    if worker_ref in (w.display_id, w.name)
+                ),
+                None,
+            )
+        return worker
 
     def _get_task_template(self, template_id: str) -> Optional[dict[str, Any]]:
         """Получает шаблон задачи по ID"""
-        templates_dir = 'data/tasks'
-        template_path = os.path.join(templates_dir, f'{template_id}.json')
-
-        if not os.path.exists(template_path):
-            return None
-
-        try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return None
+        return self.task_templates.get(template_id)
 
     def update(self, dt: float):
         """Обновление состояния симуляции"""
         # Обновляем время
         self.time += dt
+        self._sync_campus_rooms()
 
         # Проверка на смену дня (после 18:00)
         if self.time >= 18 * 60:
-            self.time = 8 * 60  # Сброс на 8:00 утра
-            self.day += 1
-            # Отправляем работников домой и генерируем новые задания
-            self._end_day()
-            self._generate_tasks(random.randint(5, 15))
+            self._roll_over_day()
 
-        # Обновляем всех работников
+        # Обновляем всех работников и попутно накапливаем продуктивность
+        productivity_total = 0
+        workers_in_office = 0
+        track_results = (
+            self.journal is not None or self.history_archive is not None
+        )
         for worker in self.workers.values():
+            task = worker.current_task
             worker.update(dt)
+            if (
+                track_results
+                and task is not None
+                and worker.current_task is not task
+            ):
+                self._record_task_result(worker, task)
 
             # Пытаемся назначить задания свободным работникам (кроме охраны)
             if (
@@ -753,91 +1110,186 @@ class OfficeSimulation:
             ):
                 self._try_assign_task(worker)
 
+            if self.worker_state is None and worker.is_at_office:
+                workers_in_office += 1
+                productivity_total += worker.productivity
+
+        if self.worker_state is None:
+            self._set_average_productivity(
+                productivity_total, workers_in_office
+            )
+        else:
+            # Столбцы продуктивности меняются при шаге движка
+            self._invalidate_average_productivity()
+
+        # Векторизованное перемещение всех работников одной операцией
+        if self.worker_state is not None:
+            self.worker_state.step(dt)
+
         # Проверяем изменения комнат
-        for worker in self.workers.values():
-            current_room = None
-            for room in self.rooms:
-                if room.contains_point(worker.x, worker.y):
-                    current_room = room
-                    break
-
-            if current_room != worker.current_room:
-                if worker.current_room:
-                    worker.current_room.remove_occupant(worker)
-                if current_room:
-                    current_room.add_occupant(worker)
+        if self.worker_state is not None:
+            self._update_rooms_batched()
+        else:
+            find_room = self.room_index.find_room
+            for worker in self.workers.values():
+                room = find_room(worker.x, worker.y)
+                if room is not worker.current_room:
+                    self._set_worker_room(worker, room)
 
         # Проверка случайных сценариев
-        if random.random() < 0.05:  # 5% шанс каждый тик
+        if self.rng.random() < 0.05:  # 5% шанс каждый тик
             self.check_random_scenarios()
 
+    def _update_rooms_batched(self) -> None:
+        """Определить комнаты всех работников одним запросом к индексу"""
+        state = self.worker_state
+        room_ids = self.room_index.find_room_ids(
+            state.x[: state.size], state.y[: state.size]
+        )
+
+        # Обрабатываем только работников, чья комната могла измениться
+        previous = self._worker_room_ids
+        if previous is None or len(previous) != len(room_ids):
+            changed = range(len(room_ids))
+        else:
+            changed = np.flatnonzero(room_ids != previous).tolist()
+
+        for i in changed:
+            room_id = room_ids[i]
+            self._set_worker_room(
+                state.workers[i],
+                self.room_index.rooms[room_id] if room_id >= 0 else None,
+            )
+        self._worker_room_ids = room_ids
+
+    def _set_worker_room(self, worker: Worker, room: Optional[Room]) -> None:
+        """Переместить работника в комнату, если она изменилась"""
+        if room != worker.current_room:
+            self._record(
+                EVENT_ROOM_CHANGED, worker.id, room.id if room else None
+            )
+            if worker.current_room:
+                worker.current_room.remove_occupant(worker)
+            if room:
+                room.add_occupant(worker)
+
+    def step(self, dt: int) -> None:
+        """Полный шаг симуляции: обновление, неудачные задания и начало дня"""
+        self.ticks += 1
+        self.update(dt)
+
+        # Обработка неудачных заданий
+        for worker in self.workers.values():
+            if worker.pending_failed_tasks:
+                self._process_failed_tasks(worker)
+
+        # Начинаем день, если сейчас утро
+        if self.time == 8 * 60:
+            self.start_day()
+
+        if self.journal is not None:
+            self.journal.end_tick(self, dt)
+
+    def _roll_over_day(self) -> None:
+        """Перейти к следующему дню в 8:00"""
+        self.time = 8 * 60  # Сброс на 8:00 утра
+        self.day += 1
+        for worker in self.workers.values():
+            worker.stats.start_day(self.day)
+        # Отправляем работников домой и генерируем новые задания
+        self._end_day()
+        self._generate_tasks(self.rng.randint(5, 15))
+
+    def _process_failed_tasks(self, worker: Worker) -> None:
+        """Обработать накопленные работником неудачные задания"""
+        for task in worker.pending_failed_tasks:
+            if task.fail_event:
+                self.handle_failed_task(task)
+        self.failed_task_count += len(worker.pending_failed_tasks)
+        worker.pending_failed_tasks = []
+
     def _try_assign_task(self, worker: Worker) -> None:
         """Попытаться назначить доступное задание работнику"""
-        suitable_tasks = [
-            t for t in self.available_tasks if t.can_be_assigned_to(worker)
-        ]
-        if suitable_tasks:
-            task = random.choice(suitable_tasks)
+        task = self.available_tasks.pick(worker.position, self.rng)
+        if task is not None:
             if worker.assign_task(task):
                 self.available_tasks.remove(task)
+                self._record(EVENT_TASK_ASSIGNED, worker.id, task.id)
 
                 # Находим подходящее место назначения для задания
                 if task.name == 'Coffee break' or task.name.startswith(
                     'Fill water'
                 ):
-                    destinations = [
-                        r for r in self.rooms if r.room_type == RoomType.KITCHEN
-                    ]
+                    destinations = self._rooms_of_type(
+                        RoomType.KITCHEN, worker
+                    )
                 elif (
                     task.name == 'Team meeting'
                     or task.name == 'Interview candidate'
                 ):
-                    destinations = [
-                        r
-                        for r in self.rooms
-                        if r.room_type == RoomType.MEETING_ROOM
-                    ]
+                    destinations = self._rooms_of_type(
+                        RoomType.MEETING_ROOM, worker
+                    )
                 else:
-                    destinations = [
-                        r for r in self.rooms if r.room_type == RoomType.OFFICE
-                    ]
+                    destinations = self._rooms_of_type(
+                        RoomType.OFFICE, worker
+                    )
 
                 if destinations:
-                    destination = random.choice(destinations)
-                    x, y = destination.get_random_position()
+                    destination = self.rng.choice(destinations)
+                    x, y = destination.get_random_position(self.rng)
                     worker.set_target(x, y)
 
     def _end_day(self) -> None:
         """Завершить рабочий день - сбросить позиции работников, кроме охраны"""
         for worker in self.workers.values():
             if worker.position != Position.SECURITY:
+                # leave_office сбрасывает текущее задание, запоминаем его заранее
+                unfinished_task = worker.current_task
+
                 # Используем метод leave_office для работников
                 worker.leave_office()
 
                 # Возвращаем незавершенные задания в пул
-                if worker.current_task:
-                    self.available_tasks.append(worker.current_task)
+                if unfinished_task:
+                    self.available_tasks.append(unfinished_task)
             else:
                 # Охранники патрулируют ночью
                 corridor = next(
-                    (r for r in self.rooms if r.room_type == RoomType.CORRIDOR),
-                    None,
+                    iter(self._rooms_of_type(RoomType.CORRIDOR, worker)), None
                 )
                 if corridor:
-                    x, y = corridor.get_random_position()
+                    x, y = corridor.get_random_position(self.rng)
                     worker.set_target(x, y)
 
+        self._invalidate_average_productivity()
+
+        # Завершенные за день задания уходят из живых в поколение дня
+        self.tasks.compact(self.day - 1)
+
     def start_day(self) -> None:
         """Начать новый рабочий день - вернуть всех работников в офис"""
-        offices = [r for r in self.rooms if r.room_type == RoomType.OFFICE]
-        if not offices:
-            return
-
         for worker in self.workers.values():
             if worker.position != Position.SECURITY and not worker.is_at_office:
                 # Используем метод enter_office для работников
-                office = random.choice(offices)
-                worker.enter_office(office)
+                offices = self._rooms_of_type(RoomType.OFFICE, worker)
+                if offices:
+                    worker.enter_office(self.rng.choice(offices))
+        self._invalidate_average_productivity()
+
+    def save_snapshot(self, path: str) -> None:
+        """Сохранить полное состояние симуляции в двоичный файл"""
+        # Импорт по требованию: модуль снимков сам зависит от этого модуля
+        from snapshot import save_snapshot
+
+        save_snapshot(self, path)
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> 'OfficeSimulation':
+        """Восстановить симуляцию из файла, сохраненного save_snapshot"""
+        from snapshot import load_snapshot
+
+        return load_snapshot(path)
 
     def get_current_time_str(self) -> str:
         """Получить текущее время в виде строки"""
@@ -856,13 +1308,19 @@ class OfficeSimulation:
 
         # Добавляем событие в комнату
         worker.current_room.events.append(task.fail_event)
+        self._record(EVENT_FAIL, worker.current_room.id, task.fail_event)
 
         # Создаем задание на уборку, если применимо
         if task.fail_event == 'Water spill':
             cleanup = Task(
-                'Clean spill', 'Clean up water spill', 15, 0.9, fail_event=None
+                'Clean spill',
+                'Clean up water spill',
+                15,
+                0.9,
+                fail_event=None,
+                id=self.ids(),
             )
-            self.tasks[cleanup.id] = cleanup
+            self.tasks.add(cleanup)
             self.available_tasks.append(cleanup)
         elif task.fail_event == 'Dropped papers':
             cleanup = Task(
@@ -871,8 +1329,9 @@ class OfficeSimulation:
                 10,
                 0.95,
                 fail_event=None,
+                id=self.ids(),
             )
-            self.tasks[cleanup.id] = cleanup
+            self.tasks.add(cleanup)
             self.available_tasks.append(cleanup)
         elif task.fail_event == 'Coffee spill':
             cleanup = Task(
@@ -881,6 +1340,7 @@ class OfficeSimulation:
                 20,
                 0.85,
                 fail_event=None,
+                id=self.ids(),
             )
-            self.tasks[cleanup.id] = cleanup
+            self.tasks.add(cleanup)
             self.available_tasks.append(cleanup)
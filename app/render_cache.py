@@ -0,0 +1,286 @@
+"""
+Кэши отрисовки офиса, работников и текста.
+
+Планировка меняется только при сбросе симуляции, поэтому слой комнат
+(заливка, рамки и подписи) рисуется один раз для пары (планировка, масштаб)
+в отдельную поверхность, которую каждый кадр достаточно вывести со
+смещением вида. Подписи событий кэшируются по комнатам и перерисовываются,
+только когда меняется список событий комнаты. Значки работников заранее
+рисуются для каждого отдела и масштаба и выводятся пачкой через
+Surface.blits.
+"""
+
+import math
+from collections import OrderedDict
+from typing import Optional
+
+import constants as const
+import numpy as np
+import pygame
+
+# Сколько масштабов слоя комнат держать в кэше
+ROOM_LAYER_CACHE_SIZE = 4
+# Максимальная площадь слоя (пикселей); больше - комнаты рисуются напрямую
+MAX_ROOM_LAYER_PIXELS = 16_000_000
+# Толщина рамки комнаты
+ROOM_BORDER_WIDTH = 2
+# Запас (пикселей) слева и сверху области вида: подписи событий комнаты
+# выходят за ее правый и нижний край
+ROOM_LABEL_MARGIN = 200
+# Сколько надписей держать в кэше текста
+TEXT_CACHE_SIZE = 512
+# Сколько масштабов значков работников держать в кэше
+WORKER_SPRITE_CACHE_SIZE = 4
+# Верхние границы числа работников в ячейке для уровней точек плотности
+DENSITY_LEVELS = (1, 4, 16)
+
+
+def draw_room(
+    surface: pygame.Surface,
+    room,
+    zoom: float,
+    dx: float,
+    dy: float,
+    label: pygame.Surface,
+) -> None:
+    """Нарисовать комнату с рамкой и подписью в точке (room * zoom + d)"""
+    color = const.ROOM_COLORS.get(room.room_type, const.GRAY)
+    rect = (
+        room.x * zoom + dx,
+        room.y * zoom + dy,
+        room.width * zoom,
+        room.height * zoom,
+    )
+    pygame.draw.rect(surface, color, rect)
+    pygame.draw.rect(surface, const.BLACK, rect, ROOM_BORDER_WIDTH)
+    surface.blit(label, (rect[0] + 5, rect[1] + 5))
+
+
+class RoomLayerCache:
+    """Кэш слоя комнат по масштабам и подписей событий по комнатам"""
+
+    def __init__(self, font: pygame.font.Font):
+        self.font = font
+        self._rooms: Optional[list] = None  # планировка, для которой кэш
+        self._bounds = (0, 0, 0, 0)
+        # Границы комнат (x0, y0, x1, y1) для отсечения по области вида
+        self._room_bounds = np.zeros((0, 4))
+        # масштаб -> поверхность слоя
+        self._layers: OrderedDict[float, pygame.Surface] = OrderedDict()
+        # тип комнаты -> подпись
+        self._room_labels: dict = {}
+        # id(комнаты) -> (комната, число событий, подписи)
+        self._event_labels: dict[int, tuple] = {}
+
+    def _check_layout(self, rooms: list) -> None:
+        """Сбросить кэш, если планировка сменилась"""
+        if rooms is self._rooms:
+            return
+        self._rooms = rooms
+        self._layers.clear()
+        self._event_labels.clear()
+        self._room_bounds = np.array(
+            [(r.x, r.y, r.x + r.width, r.y + r.height) for r in rooms],
+            dtype=np.float64,
+        ).reshape(-1, 4)
+        if rooms:
+            self._bounds = (
+                min(r.x for r in rooms),
+                min(r.y for r in rooms),
+                max(r.x + r.width for r in rooms),
+                max(r.y + r.height for r in rooms),
+            )
+        else:
+            self._bounds = (0, 0, 0, 0)
+
+    def room_label(self, room) -> pygame.Surface:
+        """Подпись комнаты (одна на тип комнаты)"""
+        label = self._room_labels.get(room.room_type)
+        if label is None:
+            label = self._room_labels[room.room_type] = self.font.render(
+                room.room_type.value, True, const.BLACK
+            )
+        return label
+
+    def visible_rooms(
+        self,
+        rooms: list,
+        zoom: float,
+        offset_x: float,
+        offset_y: float,
+        view_width: int,
+        view_height: int,
+    ) -> list[int]:
+        """Номера комнат, попадающих в область вида вместе с подписями"""
+        self._check_layout(rooms)
+        margin = ROOM_LABEL_MARGIN / zoom
+        x0 = -offset_x / zoom - margin
+        y0 = -offset_y / zoom - margin
+        x1 = (view_width - offset_x) / zoom
+        y1 = (view_height - offset_y) / zoom
+        bounds = self._room_bounds
+        return np.flatnonzero(
+            (bounds[:, 0] < x1)
+            & (bounds[:, 2] > x0)
+            & (bounds[:, 1] < y1)
+            & (bounds[:, 3] > y0)
+        ).tolist()
+
+    def get_layer(
+        self, rooms: list, zoom: float
+    ) -> Optional[tuple[pygame.Surface, float, float]]:
+        """
+        Слой комнат для масштаба
+
+        Returns:
+            (поверхность, x, y) - слой и его левый верхний угол в мировых
+            координатах, умноженных на масштаб; None, если слой слишком
+            велик и комнаты нужно рисовать напрямую
+        """
+        self._check_layout(rooms)
+        min_x, min_y, max_x, max_y = self._bounds
+        origin_x = min_x * zoom
+        origin_y = min_y * zoom
+
+        layer = self._layers.get(zoom)
+        if layer is not None:
+            self._layers.move_to_end(zoom)
+            return layer, origin_x, origin_y
+
+        width = math.ceil((max_x - min_x) * zoom) + ROOM_BORDER_WIDTH
+        height = math.ceil((max_y - min_y) * zoom) + ROOM_BORDER_WIDTH
+        if width * height > MAX_ROOM_LAYER_PIXELS:
+            return None
+
+        layer = pygame.Surface((max(width, 1), max(height, 1)))
+        layer.fill(const.WHITE)  # фон офиса, прозрачность не нужна
+        for room in rooms:
+            draw_room(
+                layer, room, zoom, -origin_x, -origin_y, self.room_label(room)
+            )
+        layer = layer.convert() if pygame.display.get_surface() else layer
+
+        self._layers[zoom] = layer
+        if len(self._layers) > ROOM_LAYER_CACHE_SIZE:
+            self._layers.popitem(last=False)
+        return layer, origin_x, origin_y
+
+    def event_labels(self, room) -> list[pygame.Surface]:
+        """Подписи событий комнаты (перерисовываются при их изменении)"""
+        cached = self._event_labels.get(id(room))
+        if (
+            cached is not None
+            and cached[0] is room
+            and cached[1] == len(room.events)
+        ):
+            return cached[2]
+
+        labels = [
+            self.font.render(f'Событие: {event}', True, const.RED)
+            for event in room.events
+        ]
+        self._event_labels[id(room)] = (room, len(room.events), labels)
+        return labels
+
+
+class TextCache:
+    """
+    LRU-кэш отрисованного текста по ключу (шрифт, строка, цвет).
+
+    Растеризация шрифта - одна из самых дорогих операций кадра, а текст
+    панелей меняется редко. Счетчики попаданий позволяют оценить пользу.
+    """
+
+    def __init__(self, max_size: int = TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(
+        self, font: pygame.font.Font, text: str, color: tuple
+    ) -> pygame.Surface:
+        """Сглаженная надпись из кэша или отрисованная заново"""
+        key = (font, text, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self._surfaces[key] = font.render(text, True, color)
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля запросов, обслуженных из кэша"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+
+def _circle_sprite(color: tuple, radius: int) -> pygame.Surface:
+    """Круг с черной обводкой на прозрачном фоне"""
+    size = 2 * radius + 1
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, color, (radius, radius), radius)
+    pygame.draw.circle(sprite, const.BLACK, (radius, radius), radius, 1)
+    return sprite
+
+
+class WorkerSpriteCache:
+    """Значки работников по отделам и точки плотности для каждого масштаба"""
+
+    def __init__(self):
+        # масштаб -> (радиус, {отдел: значок}, радиус выбранного, {...})
+        self._sprites: OrderedDict[float, tuple] = OrderedDict()
+        self._density_dots: Optional[list[pygame.Surface]] = None
+
+    def get(self, zoom: float) -> tuple:
+        """
+        Значки для масштаба
+
+        Returns:
+            (радиус, значки по отделам, радиус выбранного, значки выбранного)
+        """
+        sprites = self._sprites.get(zoom)
+        if sprites is not None:
+            self._sprites.move_to_end(zoom)
+            return sprites
+
+        radius = int(const.WORKER_CIRCLE_RADIUS * zoom)
+        selected_radius = int(const.SELECTED_WORKER_CIRCLE_RADIUS * zoom)
+        sprites = self._sprites[zoom] = (
+            radius,
+            {
+                department: _circle_sprite(color, radius)
+                for department, color in const.DEPARTMENT_COLORS.items()
+            },
+            selected_radius,
+            {
+                department: _circle_sprite(color, selected_radius)
+                for department, color in const.DEPARTMENT_COLORS.items()
+            },
+        )
+        if len(self._sprites) > WORKER_SPRITE_CACHE_SIZE:
+            self._sprites.popitem(last=False)
+        return sprites
+
+    def density_dots(self) -> list[pygame.Surface]:
+        """Точки плотности: чем больше работников в ячейке, тем крупнее"""
+        if self._density_dots is None:
+            cell = const.DENSITY_CELL_SIZE
+            self._density_dots = []
+            for level in range(len(DENSITY_LEVELS) + 1):
+                radius = max(1, (level + 1) * cell // 8)
+                dot = pygame.Surface((cell, cell), pygame.SRCALPHA)
+                pygame.draw.circle(
+                    dot, const.DENSITY_COLOR, (cell // 2, cell // 2), radius
+                )
+                self._density_dots.append(dot)
+        return self._density_dots
@@ -1,9 +1,184 @@
 import json
 import logging
 import os
+import pickle
+from datetime import datetime, time
 from typing import Any, Dict, List, Optional
 
 
+class ScenarioRequirements:
+    """
+    Скомпилированные условия активации сценария.
+
+    Строки времени разбираются, а списки дней недели и погоды превращаются
+    в множества один раз при загрузке, поэтому проверка условий сводится
+    к нескольким сравнениям.
+    """
+
+    def __init__(self, requirements: Optional[dict[str, Any]] = None):
+        """
+        Args:
+            requirements: Раздел requirements из файла сценария
+        """
+        requirements = requirements or {}
+
+        self.time_start: Optional[time] = None
+        self.time_end: Optional[time] = None
+        if requirements.get('time_start') and requirements.get('time_end'):
+            self.time_start = datetime.strptime(
+                requirements['time_start'], '%H:%M'
+            ).time()
+            self.time_end = datetime.strptime(
+                requirements['time_end'], '%H:%M'
+            ).time()
+
+        self.weekdays: Optional[frozenset] = None
+        if requirements.get('weekdays') is not None:
+            self.weekdays = frozenset(requirements['weekdays'])
+
+        self.weather: Optional[frozenset] = None
+        if requirements.get('weather') is not None:
+            self.weather = frozenset(requirements['weather'])
+
+        self.min_productivity: Optional[float] = requirements.get(
+            'min_productivity'
+        )
+        self.max_productivity: Optional[float] = requirements.get(
+            'max_productivity'
+        )
+
+    @property
+    def needs_productivity(self) -> bool:
+        """Зависят ли условия от средней продуктивности"""
+        return (
+            self.min_productivity is not None
+            or self.max_productivity is not None
+        )
+
+    def matches(
+        self, now: datetime, weather: str, average_productivity: float = 0.0
+    ) -> bool:
+        """
+        Проверяет условия активации
+
+        Args:
+            now: Текущие дата и время
+            weather: Текущая погода
+            average_productivity: Средняя продуктивность работников в офисе
+                (используется, только если needs_productivity)
+
+        Returns:
+            True, если все условия выполнены
+        """
+        if self.time_start is not None:
+            if not (self.time_start <= now.time() <= self.time_end):
+                return False
+
+        if self.weekdays is not None and now.weekday() not in self.weekdays:
+            return False
+
+        if self.weather is not None and weather not in self.weather:
+            return False
+
+        if (
+            self.min_productivity is not None
+            and average_productivity < self.min_productivity
+        ):
+            return False
+
+        if (
+            self.max_productivity is not None
+            and average_productivity > self.max_productivity
+        ):
+            return False
+
+        return True
+
+
+class ScenarioCache:
+    """
+    Общий для процесса кэш разобранных файлов сценариев.
+
+    Для каждого файла хранятся время изменения и размер; файл разбирается
+    заново, только если они изменились. Содержимое кэша можно сохранить
+    в двоичный снимок и загрузить при холодном старте.
+    """
+
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self):
+        # Абсолютный путь -> (mtime_ns, размер, разобранный JSON)
+        self._files: dict[str, tuple[int, int, dict[str, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, file_path: str) -> dict[str, Any]:
+        """
+        Получает разобранное содержимое файла
+
+        Args:
+            file_path: Путь к JSON-файлу сценария
+
+        Returns:
+            Копия верхнего уровня данных сценария (ее можно дополнять)
+        """
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+        entry = self._files.get(key)
+        if (
+            entry is not None
+            and entry[0] == stat.st_mtime_ns
+            and entry[1] == stat.st_size
+        ):
+            self.hits += 1
+        else:
+            self.misses += 1
+            with open(key, 'r', encoding='utf-8') as f:
+                entry = (stat.st_mtime_ns, stat.st_size, json.load(f))
+            self._files[key] = entry
+        return dict(entry[2])
+
+    def clear(self) -> None:
+        """Очищает кэш"""
+        self._files = {}
+
+    def dumps(self) -> bytes:
+        """Сериализует кэш в двоичный снимок"""
+        return pickle.dumps(
+            (self.SNAPSHOT_VERSION, self._files),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+    def loads(self, data: bytes) -> bool:
+        """
+        Загружает кэш из двоичного снимка
+
+        Returns:
+            True, если снимок подходящей версии загружен
+        """
+        version, files = pickle.loads(data)
+        if version != self.SNAPSHOT_VERSION:
+            return False
+        self._files.update(files)
+        return True
+
+    def save_snapshot(self, path: str) -> None:
+        """Сохраняет двоичный снимок кэша в файл"""
+        with open(path, 'wb') as f:
+            f.write(self.dumps())
+
+    def load_snapshot(self, path: str) -> bool:
+        """Загружает снимок кэша из файла, если он существует"""
+        if not os.path.exists(path):
+            return False
+        with open(path, 'rb') as f:
+            return self.loads(f.read())
+
+
+# Кэш сценариев, общий для всех загрузчиков процесса
+SCENARIO_CACHE = ScenarioCache()
+
+
 class ScenarioLoader:
     """
     Класс для загрузки сценариев из отдельных JSON-файлов.
@@ -12,21 +187,32 @@ class ScenarioLoader:
     получать сценарии по ID или типу, а также сохранять новые сценарии.
     """
 
-    def __init__(self, scenarios_dir: str = "data/scenarios"):
+    def __init__(
+        self,
+        scenarios_dir: str = "data/scenarios",
+        cache: Optional[ScenarioCache] = None,
+    ):
         """
         Инициализация загрузчика сценариев
 
         Args:
             scenarios_dir: Путь к директории со сценариями
+            cache: Кэш разобранных файлов (по умолчанию общий для процесса)
         """
         self.scenarios_dir = scenarios_dir
+        self.cache = cache if cache is not None else SCENARIO_CACHE
         self.scenarios: dict[str, dict[str, Any]] = {}
+        self.requirements: dict[str, ScenarioRequirements] = {}
+        self._scenarios_by_type: dict[str, list[dict[str, Any]]] = {}
         self.logger = logging.getLogger(__name__)
 
     def load_all_scenarios(self) -> dict[str, dict[str, Any]]:
         """
         Загружает все сценарии из директории.
 
+        Разбираются только новые и измененные файлы, остальные берутся
+        из кэша сценариев.
+
         Returns:
             Словарь сценариев, где ключ - ID сценария
         """
@@ -46,8 +232,7 @@ class ScenarioLoader:
                 scenario_id = os.path.splitext(filename)[0]
 
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        scenario_data = json.load(f)
+                    scenario_data = self.cache.load(file_path)
 
                     # Проверяем, совпадает ли ID в файле с именем файла
                     if 'id' in scenario_data and scenario_data['id'] != scenario_id:
@@ -75,9 +260,42 @@ class ScenarioLoader:
                 except Exception as e:
                     self.logger.error(f"Ошибка при загрузке сценария {file_path}: {str(e)}")
 
+        self._compile()
         self.logger.info(f"Всего загружено сценариев: {len(self.scenarios)}")
         return self.scenarios
 
+    def _compile(self) -> None:
+        """Скомпилировать условия и сгруппировать сценарии по типу"""
+        self.requirements = {}
+        self._scenarios_by_type = {}
+        for scenario_id, scenario_data in self.scenarios.items():
+            try:
+                self.requirements[scenario_id] = ScenarioRequirements(
+                    scenario_data.get('requirements')
+                )
+            except (TypeError, ValueError) as e:
+                self.logger.error(
+                    f"Некорректные условия сценария {scenario_id}: {str(e)}"
+                )
+                continue
+            self._scenarios_by_type.setdefault(
+                scenario_data.get('type'), []
+            ).append(scenario_data)
+
+    def get_requirements(
+        self, scenario_id: str
+    ) -> Optional[ScenarioRequirements]:
+        """
+        Получает скомпилированные условия сценария
+
+        Args:
+            scenario_id: ID сценария
+
+        Returns:
+            Условия или None, если сценарий не найден
+        """
+        return self.requirements.get(scenario_id)
+
     def get_scenario(self, scenario_id: str) -> Optional[dict[str, Any]]:
         """
         Получает сценарий по его ID
@@ -100,10 +318,7 @@ class ScenarioLoader:
         Returns:
             Список сценариев указанного типа
         """
-        return [
-            scenario for scenario in self.scenarios.values()
-            if scenario.get('type') == scenario_type
-        ]
+        return self._scenarios_by_type.get(scenario_type, [])
 
     def save_scenario(self, scenario_data: dict[str, Any]) -> bool:
         """
@@ -139,6 +354,7 @@ class ScenarioLoader:
 
             # Обновляем кэш сценариев
             self.scenarios[scenario_id] = scenario_data
+            self._compile()
             self.logger.info(f"Сценарий {scenario_id} сохранен в {file_path}")
             return True
 
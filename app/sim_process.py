@@ -0,0 +1,705 @@
+"""
+Симуляция в фоновом процессе с состоянием в разделяемой памяти.
+
+OfficeSimulation крутится в отдельном процессе (_run_simulation) своими
+фиксированными шагами и публикует координаты работников, прогресс заданий,
+события комнат и начало очереди заданий в один из двух буферов
+multiprocessing.shared_memory. Интерфейс читает последний опубликованный
+буфер через массивы NumPy поверх разделяемой памяти - без копирования и
+без блокировок. Команды (пауза, скорость, остановка) и редкие данные
+(планировка, сведения о работниках, таблица строк) идут через канал Pipe.
+
+Протокол двойной буферизации: в управляющем блоке лежат номер
+опубликованного буфера (front) и номер буфера, который держит читатель
+(reading). Писатель пишет только в буфер, не являющийся front, и
+пропускает публикацию, пока читатель держит этот буфер. Читатель
+захватывает front и перепроверяет его, поэтому буфер не меняется, пока
+читатель его не отпустит (захватом следующего).
+
+Модуль не импортирует pygame и constants: фоновый процесс запускается
+методом spawn и не должен поднимать графику.
+"""
+
+import atexit
+import time
+from itertools import islice
+from multiprocessing import get_context, shared_memory
+from typing import Any, Optional
+
+import numpy as np
+
+from models import (
+    Department,
+    OfficeSimulation,
+    Personality,
+    Position,
+    Room,
+    RoomType,
+)
+from spatial_index import WorkerGrid
+from worker_stats import WorkerStats
+
+# Сколько событий комнаты публикуется (больше на плане все равно не видно)
+MAX_PUBLISHED_ROOM_EVENTS = 8
+# Сколько заданий из начала очереди публикуется для панели задач
+MAX_PUBLISHED_TASKS = 15
+# Минимальный интервал между публикациями состояния (секунд)
+PUBLISH_INTERVAL = 1 / 60
+# Сколько ждать команд, когда шагать пока нечего (секунд)
+IDLE_POLL_INTERVAL = 0.05
+# Сколько ждать запуска фонового процесса и первого кадра (секунд)
+STARTUP_TIMEOUT = 30.0
+# Сколько ждать завершения фонового процесса (секунд)
+SHUTDOWN_TIMEOUT = 5.0
+
+# Параметры шагов по умолчанию: speed минут за номинальный кадр frame_ms
+DEFAULT_TIMING = {
+    'frame_ms': 1000 / 30,
+    'step_minutes': 1,
+    'max_frame_ms': 250,
+    'max_backlog_frames': 30,
+}
+
+# Поля заголовка буфера
+HEADER_FIELDS = ('seq', 'day', 'time', 'ticks', 'lagging', 'task_count')
+_SEQ, _DAY, _TIME, _TICKS, _LAGGING, _TASK_COUNT = range(len(HEADER_FIELDS))
+# Код отсутствующей строки
+NO_STRING = -1
+
+# Управляющий блок: номер опубликованного буфера и буфера читателя
+_CONTROL_FRONT = 0
+_CONTROL_READING = 1
+_CONTROL_SIZE = 2 * np.dtype(np.int64).itemsize
+
+
+class SharedFrameBuffers:
+    """
+    Два буфера кадров состояния в одном сегменте разделяемой памяти.
+
+    Поля буфера - массивы NumPy прямо поверх памяти сегмента: header
+    (HEADER_FIELDS); по работникам x, y, mood, at_office, completed,
+    failed и текущее задание (task_name, task_description, task_progress,
+    task_duration, task_success); по комнатам event_total и event_codes;
+    по началу очереди заданий tasks_name и tasks_duration. Строки хранятся
+    кодами таблицы строк, которая передается через канал.
+    """
+
+    def __init__(
+        self,
+        worker_count: int,
+        room_count: int,
+        task_count: int = MAX_PUBLISHED_TASKS,
+        name: Optional[str] = None,
+    ):
+        """
+        Args:
+            worker_count: Число работников
+            room_count: Число комнат
+            task_count: Сколько заданий очереди публикуется
+            name: Имя существующего сегмента (None - создать новый)
+        """
+        self.worker_count = worker_count
+        self.room_count = room_count
+        self.task_count = task_count
+        fields = (
+            ('header', np.int64, (len(HEADER_FIELDS),)),
+            ('x', np.float64, (worker_count,)),
+            ('y', np.float64, (worker_count,)),
+            ('mood', np.float64, (worker_count,)),
+            ('completed', np.int64, (worker_count,)),
+            ('failed', np.int64, (worker_count,)),
+            ('task_progress', np.int64, (worker_count,)),
+            ('task_duration', np.int64, (worker_count,)),
+            ('task_success', np.float64, (worker_count,)),
+            ('task_name', np.int32, (worker_count,)),
+            ('task_description', np.int32, (worker_count,)),
+            ('at_office', np.bool_, (worker_count,)),
+            ('event_total', np.int32, (room_count,)),
+            (
+                'event_codes',
+                np.int32,
+                (room_count, MAX_PUBLISHED_ROOM_EVENTS),
+            ),
+            ('tasks_name', np.int32, (task_count,)),
+            ('tasks_duration', np.int64, (task_count,)),
+        )
+
+        # Смещения полей внутри буфера с выравниванием на 8 байт
+        layout = []
+        buffer_size = 0
+        for field, dtype, shape in fields:
+            layout.append((field, dtype, shape, buffer_size))
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            buffer_size += -(-nbytes // 8) * 8
+
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(
+            name=name,
+            create=self.owner,
+            size=_CONTROL_SIZE + 2 * buffer_size if self.owner else 0,
+        )
+        self.control = np.ndarray((2,), np.int64, self.shm.buf)
+        if self.owner:
+            self.control[:] = -1  # ничего не опубликовано и не захвачено
+
+        self.buffers: list[dict[str, np.ndarray]] = [
+            {
+                field: np.ndarray(
+                    shape,
+                    dtype,
+                    self.shm.buf,
+                    _CONTROL_SIZE + i * buffer_size + offset,
+                )
+                for field, dtype, shape, offset in layout
+            }
+            for i in range(2)
+        ]
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def begin_write(self) -> Optional[int]:
+        """Номер буфера для записи или None, если его держит читатель"""
+        front = int(self.control[_CONTROL_FRONT])
+        target = 1 - front if front >= 0 else 0
+        if self.control[_CONTROL_READING] == target:
+            return None
+        return target
+
+    def publish(self, index: int) -> None:
+        """Сделать записанный буфер последним опубликованным"""
+        self.control[_CONTROL_FRONT] = index
+
+    def acquire(self) -> Optional[int]:
+        """
+        Захватить последний опубликованный буфер (для читателя)
+
+        Returns:
+            Номер буфера или None, если еще ничего не опубликовано
+        """
+        while True:
+            front = int(self.control[_CONTROL_FRONT])
+            if front < 0:
+                return None
+            self.control[_CONTROL_READING] = front
+            # Писатель мог опубликовать новый буфер до захвата - повторяем
+            if self.control[_CONTROL_FRONT] == front:
+                return front
+
+    def close(self) -> None:
+        """Отпустить массивы и закрыть сегмент (владелец его удаляет)"""
+        self.control = None
+        self.buffers = []
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class _FramePublisher:
+    """Запись состояния симуляции в буферы и ведение таблицы строк"""
+
+    def __init__(self, simulation: OfficeSimulation, frames, conn):
+        self.simulation = simulation
+        self.frames = frames
+        self.conn = conn
+        self.workers = list(simulation.workers.values())
+        self.seq = 0
+        self._codes: dict[str, int] = {}
+        self._new_strings: list[str] = []
+
+    def _code(self, text: Optional[str]) -> int:
+        """Код строки в таблице (новые строки уходят читателю)"""
+        if text is None:
+            return NO_STRING
+        code = self._codes.get(text)
+        if code is None:
+            code = self._codes[text] = len(self._codes)
+            self._new_strings.append(text)
+        return code
+
+    def publish(self, lagging: bool) -> bool:
+        """Опубликовать текущее состояние; False, если буфер занят"""
+        index = self.frames.begin_write()
+        if index is None:
+            return False
+
+        simulation = self.simulation
+        frame = self.frames.buffers[index]
+        workers = self.workers
+        n = len(workers)
+        code = self._code
+
+        state = simulation.worker_state
+        if state is not None:
+            frame['x'][:] = state.x[:n]
+            frame['y'][:] = state.y[:n]
+            frame['mood'][:] = state.mood[:n]
+            frame['at_office'][:] = state.is_at_office[:n]
+        else:
+            frame['x'][:] = np.fromiter((w.x for w in workers), np.float64, n)
+            frame['y'][:] = np.fromiter((w.y for w in workers), np.float64, n)
+            frame['mood'][:] = np.fromiter(
+                (w.mood for w in workers), np.float64, n
+            )
+            frame['at_office'][:] = np.fromiter(
+                (w.is_at_office for w in workers), bool, n
+            )
+
+        for i, worker in enumerate(workers):
+            frame['completed'][i] = worker.stats.completed
+            frame['failed'][i] = worker.stats.failed
+            task = worker.current_task
+            if task is None:
+                frame['task_name'][i] = NO_STRING
+                continue
+            frame['task_name'][i] = code(task.name)
+            frame['task_description'][i] = code(task.description)
+            frame['task_progress'][i] = task.progress
+            frame['task_duration'][i] = task.duration
+            frame['task_success'][i] = task.get_adjusted_success_rate()
+
+        event_codes = frame['event_codes']
+        for i, room in enumerate(simulation.rooms):
+            events = room.events
+            frame['event_total'][i] = len(events)
+            for j, event in enumerate(
+                islice(events, MAX_PUBLISHED_ROOM_EVENTS)
+            ):
+                event_codes[i, j] = code(event)
+
+        task_count = 0
+        for task in islice(simulation.available_tasks, self.frames.task_count):
+            frame['tasks_name'][task_count] = code(task.name)
+            frame['tasks_duration'][task_count] = task.duration
+            task_count += 1
+
+        self.seq += 1
+        frame['header'][:] = (
+            self.seq,
+            simulation.day,
+            simulation.time,
+            simulation.ticks,
+            lagging,
+            task_count,
+        )
+
+        # Новые строки уходят в канал до публикации буфера, поэтому читатель
+        # получает их не позже кадра, в котором они встречаются
+        if self._new_strings:
+            self.conn.send(('strings', self._new_strings))
+            self._new_strings = []
+        self.frames.publish(index)
+        return True
+
+
+def _run_simulation(
+    conn, config: Any, worker_count: int, timing: dict[str, float]
+) -> None:
+    """
+    Точка входа фонового процесса
+
+    Шаги выполняются по timing['step_minutes'] минут: за каждый
+    номинальный кадр (frame_ms) реального времени накапливается speed
+    минут, отставание больше max_backlog_frames кадров отбрасывается.
+    Между публикациями проходит не меньше PUBLISH_INTERVAL.
+    """
+    simulation = OfficeSimulation(config)
+    simulation.initialize(worker_count=worker_count)
+    frames = SharedFrameBuffers(len(simulation.workers), len(simulation.rooms))
+    try:
+        conn.send((
+            'ready',
+            frames.name,
+            [
+                (r.id, r.room_type.name, r.x, r.y, r.width, r.height)
+                for r in simulation.rooms
+            ],
+            [
+                (
+                    w.id,
+                    w.name,
+                    w.department.name,
+                    w.position.name,
+                    w.personality.name,
+                )
+                for w in simulation.workers.values()
+            ],
+        ))
+        publisher = _FramePublisher(simulation, frames, conn)
+        publisher.publish(False)
+
+        step = timing['step_minutes']
+        speed = 1
+        paused = False
+        accumulator = 0.0
+        lagging = False
+        dirty = False  # есть неопубликованные шаги
+        last = time.perf_counter()
+        while True:
+            while conn.poll():
+                command, value = conn.recv()
+                if command == 'stop':
+                    return
+                if command == 'speed':
+                    speed = value
+                elif command == 'pause':
+                    paused = value
+                    accumulator = 0.0
+
+            now = time.perf_counter()
+            elapsed_ms = min((now - last) * 1000, timing['max_frame_ms'])
+            last = now
+            if not paused:
+                accumulator += speed * elapsed_ms / timing['frame_ms']
+
+            deadline = now + PUBLISH_INTERVAL
+            while accumulator >= step:
+                simulation.step(step)
+                accumulator -= step
+                dirty = True
+                if time.perf_counter() >= deadline:
+                    break
+            lagging = accumulator >= step
+            accumulator = min(
+                accumulator, speed * timing['max_backlog_frames']
+            )
+
+            if dirty and publisher.publish(lagging):
+                dirty = False
+            if not lagging:
+                # До следующего шага (или повторной публикации) ждем команд
+                timeout = IDLE_POLL_INTERVAL
+                if speed and not paused:
+                    timeout = min(
+                        timeout,
+                        (step - accumulator)
+                        / speed
+                        * timing['frame_ms']
+                        / 1000,
+                    )
+                if dirty:
+                    timeout = min(timeout, PUBLISH_INTERVAL)
+                conn.poll(timeout)
+    except (EOFError, OSError, KeyboardInterrupt):
+        pass  # интерфейс закрылся
+    finally:
+        conn.close()
+        frames.close()
+
+
+class RemoteTask:
+    """Задание в кадре фоновой симуляции (только для отображения)"""
+
+    __slots__ = ('name', 'description', 'progress', 'duration', 'success')
+
+    def __init__(self, name, description, progress, duration, success):
+        self.name = name
+        self.description = description
+        self.progress = progress
+        self.duration = duration
+        self.success = success
+
+    def get_adjusted_success_rate(self) -> float:
+        return self.success
+
+
+class RemoteWorker:
+    """
+    Представление работника фоновой симуляции.
+
+    Неизменные сведения приходят при запуске, остальное читается из
+    последнего захваченного кадра при каждом обращении.
+    """
+
+    __slots__ = (
+        '_simulation',
+        '_index',
+        'id',
+        'name',
+        'department',
+        'position',
+        'personality',
+    )
+
+    def __init__(
+        self,
+        simulation: 'RemoteSimulation',
+        index: int,
+        id: int,
+        name: str,
+        department: Department,
+        position: Position,
+        personality: Personality,
+    ):
+        self._simulation = simulation
+        self._index = index
+        self.id = id
+        self.name = name
+        self.department = department
+        self.position = position
+        self.personality = personality
+
+    @property
+    def display_id(self) -> str:
+        return f'W-{self.id}'
+
+    def _value(self, field: str):
+        return self._simulation.frame[field][self._index]
+
+    @property
+    def x(self) -> float:
+        return float(self._value('x'))
+
+    @property
+    def y(self) -> float:
+        return float(self._value('y'))
+
+    @property
+    def mood(self) -> float:
+        return float(self._value('mood'))
+
+    @property
+    def is_at_office(self) -> bool:
+        return bool(self._value('at_office'))
+
+    @property
+    def stats(self) -> WorkerStats:
+        """Счетчики заданий из кадра (без гистограмм)"""
+        stats = WorkerStats(self._simulation.day)
+        stats.completed = int(self._value('completed'))
+        stats.failed = int(self._value('failed'))
+        return stats
+
+    @property
+    def current_task(self) -> Optional[RemoteTask]:
+        name = int(self._value('task_name'))
+        if name == NO_STRING:
+            return None
+        strings = self._simulation.strings
+        return RemoteTask(
+            strings[name],
+            strings[int(self._value('task_description'))],
+            int(self._value('task_progress')),
+            int(self._value('task_duration')),
+            float(self._value('task_success')),
+        )
+
+
+class RemoteWorkerState:
+    """
+    Столбцы работников последнего кадра (как у WorkerStateArrays).
+
+    x, y и is_at_office - массивы поверх разделяемой памяти, workers -
+    представления работников в порядке строк.
+    """
+
+    __slots__ = ('_simulation', 'workers', 'size')
+
+    def __init__(self, simulation: 'RemoteSimulation', workers: list):
+        self._simulation = simulation
+        self.workers = workers
+        self.size = len(workers)
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._simulation.frame['x']
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._simulation.frame['y']
+
+    @property
+    def is_at_office(self) -> np.ndarray:
+        return self._simulation.frame['at_office']
+
+
+class RemoteSimulation:
+    """
+    Симуляция в фоновом процессе с интерфейсом OfficeSimulation для чтения.
+
+    poll() захватывает последний опубликованный кадр; worker_state дает
+    координаты работников массивами поверх разделяемой памяти, как
+    векторизованный движок.
+    """
+
+    def __init__(
+        self,
+        config: Any,
+        worker_count: int = 10,
+        timing: Optional[dict[str, float]] = None,
+    ):
+        """
+        Args:
+            config: Сид или словарь настроек OfficeSimulation
+            worker_count: Количество работников (без охраны)
+            timing: Параметры шагов (ключи DEFAULT_TIMING)
+        """
+        timing = {**DEFAULT_TIMING, **(timing or {})}
+        context = get_context('spawn')
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_run_simulation,
+            args=(child_conn, config, worker_count, timing),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+        try:
+            if not self._conn.poll(STARTUP_TIMEOUT):
+                raise EOFError
+            _, shm_name, rooms, workers = self._conn.recv()
+        except EOFError:
+            self.process.join(SHUTDOWN_TIMEOUT)
+            raise RuntimeError('Фоновая симуляция не запустилась') from None
+
+        self.seed = config.get('seed') if isinstance(config, dict) else config
+        self.frames = SharedFrameBuffers(
+            len(workers), len(rooms), name=shm_name
+        )
+        self.rooms = [
+            Room(RoomType[room_type], x, y, width, height, id)
+            for id, room_type, x, y, width, height in rooms
+        ]
+        self.workers: dict[int, RemoteWorker] = {}
+        for index, (id, name, department, position, personality) in enumerate(
+            workers
+        ):
+            self.workers[id] = RemoteWorker(
+                self,
+                index,
+                id,
+                name,
+                Department[department],
+                Position[position],
+                Personality[personality],
+            )
+        self.worker_state = RemoteWorkerState(
+            self, list(self.workers.values())
+        )
+        self.strings: list[str] = []
+        self.frame: Optional[dict[str, np.ndarray]] = None
+        self.seq = 0
+        # Число событий комнат в последнем прочитанном кадре
+        self._event_totals = np.zeros(len(rooms), dtype=np.int32)
+        self._sent: dict[str, Any] = {}
+        self._worker_grid = WorkerGrid()
+        # Останавливаем процесс и при выходе без close()
+        atexit.register(self.close)
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while not self.poll():
+            if time.monotonic() >= deadline or not self.process.is_alive():
+                self.close()
+                raise RuntimeError('Фоновая симуляция не опубликовала кадр')
+            time.sleep(0.001)
+
+    @property
+    def day(self) -> int:
+        return int(self.frame['header'][_DAY])
+
+    @property
+    def time(self) -> int:
+        return int(self.frame['header'][_TIME])
+
+    @property
+    def ticks(self) -> int:
+        return int(self.frame['header'][_TICKS])
+
+    @property
+    def lagging(self) -> bool:
+        """Фоновая симуляция не успевает за выбранной скоростью"""
+        return bool(self.frame['header'][_LAGGING])
+
+    @property
+    def available_tasks(self) -> list[RemoteTask]:
+        """Начало очереди заданий (не больше MAX_PUBLISHED_TASKS)"""
+        frame = self.frame
+        count = frame['header'][_TASK_COUNT]
+        return [
+            RemoteTask(self.strings[name], None, 0, duration, 0.0)
+            for name, duration in zip(
+                frame['tasks_name'][:count].tolist(),
+                frame['tasks_duration'][:count].tolist(),
+            )
+        ]
+
+    @property
+    def worker_grid(self) -> WorkerGrid:
+        """Сетка работников, перестраиваемая по кадру при запросе"""
+        grid = self._worker_grid
+        if grid.version != self.seq:
+            state = self.worker_state
+            grid.rebuild(
+                state.workers, state.x, state.y, state.is_at_office, self.seq
+            )
+        return grid
+
+    def find_worker_at(
+        self, x: float, y: float, radius: float
+    ) -> Optional[RemoteWorker]:
+        """Найти работника в офисе не дальше radius от точки"""
+        return self.worker_grid.find(x, y, radius)
+
+    def get_current_time_str(self) -> str:
+        """Получить текущее время в виде строки"""
+        hours = self.time // 60
+        minutes = self.time % 60
+        return f'День {self.day} - {hours:02d}:{minutes:02d}'
+
+    def poll(self) -> bool:
+        """
+        Захватить последний опубликованный кадр
+
+        Returns:
+            True, если кадр новый
+        """
+        index = self.frames.acquire()
+        if index is None:
+            return False
+        frame = self.frames.buffers[index]
+        seq = int(frame['header'][_SEQ])
+        # Строки, нужные кадру, отправлены до его публикации
+        while self._conn.poll():
+            _, strings = self._conn.recv()
+            self.strings.extend(strings)
+        if seq == self.seq:
+            return False
+
+        self.frame = frame
+        self.seq = seq
+        totals = frame['event_total']
+        changed = np.flatnonzero(totals != self._event_totals)
+        self._event_totals[:] = totals
+        for i in changed.tolist():
+            count = min(int(totals[i]), MAX_PUBLISHED_ROOM_EVENTS)
+            self.rooms[i].events = [
+                self.strings[code]
+                for code in frame['event_codes'][i, :count].tolist()
+            ]
+        return True
+
+    def control(self, speed: float, paused: bool) -> None:
+        """Передать скорость и паузу (только при изменении)"""
+        for command, value in (('speed', speed), ('pause', paused)):
+            if self._sent.get(command) != value:
+                self._conn.send((command, value))
+                self._sent[command] = value
+
+    def close(self) -> None:
+        """Остановить фоновый процесс и отключиться от памяти"""
+        if self.frames is None:
+            return
+        atexit.unregister(self.close)
+        try:
+            self._conn.send(('stop', None))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(SHUTDOWN_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._conn.close()
+        self.frame = None
+        self.frames.close()
+        self.frames = None
@@ -0,0 +1,515 @@
+"""
+Двоичные снимки полного состояния симуляции.
+
+Снимок содержит комнаты, работников, задания, пул доступных заданий,
+часы, день, погоду и состояние генератора случайных чисел, а для кампуса -
+его настройки, загруженные блоки и рабочие места работников. Перечисления
+хранятся как небольшие целые, координаты - упакованными массивами,
+а ссылки между объектами - целочисленными индексами. Все строки собраны
+в одну таблицу. Полезная нагрузка сжимается zlib.
+"""
+
+import struct
+import zlib
+from array import array
+from typing import Any, Optional
+
+from models import (
+    Department,
+    OfficeSimulation,
+    Personality,
+    Position,
+    Room,
+    RoomType,
+    Task,
+    TaskStatus,
+)
+from weather_simulator import WeatherType
+
+SNAPSHOT_MAGIC = b'WSSS'
+SNAPSHOT_VERSION = 7
+
+_HEADER = struct.Struct('<4sH')
+
+DEPARTMENTS = list(Department)
+POSITIONS = list(Position)
+PERSONALITIES = list(Personality)
+ROOM_TYPES = list(RoomType)
+TASK_STATUSES = list(TaskStatus)
+WEATHER_TYPES = list(WeatherType)
+
+
+class _Writer:
+    """Последовательная запись значений и массивов в буфер"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.strings: dict[str, int] = {}
+
+    def pack(self, fmt: str, *values) -> None:
+        self.buffer += struct.pack('<' + fmt, *values)
+
+    def array(self, typecode: str, values) -> None:
+        data = array(typecode, values)
+        self.pack('I', len(data))
+        self.buffer += data.tobytes()
+
+    def string(self, value: Optional[str]) -> int:
+        """Индекс строки в таблице (-1 для None)"""
+        if value is None:
+            return -1
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+
+class _Reader:
+    """Последовательное чтение значений и массивов из буфера"""
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+        self.strings: list[str] = []
+
+    def unpack(self, fmt: str) -> tuple:
+        fmt = struct.Struct('<' + fmt)
+        values = fmt.unpack_from(self.data, self.offset)
+        self.offset += fmt.size
+        return values
+
+    def array(self, typecode: str) -> array:
+        (count,) = self.unpack('I')
+        result = array(typecode)
+        size = count * result.itemsize
+        result.frombytes(self.data[self.offset : self.offset + size])
+        self.offset += size
+        return result
+
+    def string(self, index: int) -> Optional[str]:
+        return self.strings[index] if index >= 0 else None
+
+
+def _encode_position(writer: _Writer, position: Any) -> int:
+    """Требуемая должность: -1 - нет, >= 0 - Position, <= -2 - строка"""
+    if position is None:
+        return -1
+    if isinstance(position, Position):
+        return POSITIONS.index(position)
+    return -2 - writer.string(str(position))
+
+
+def _decode_position(reader: _Reader, code: int) -> Any:
+    if code == -1:
+        return None
+    if code >= 0:
+        return POSITIONS[code]
+    return reader.string(-2 - code)
+
+
+def _collect_tasks(simulation: OfficeSimulation) -> list[Task]:
+    """Все задания, на которые ссылается симуляция, без повторов"""
+    seen: dict[int, Task] = {}
+    for _, task in simulation.tasks.live_items():
+        seen.setdefault(id(task), task)
+    for _, finished in simulation.tasks.generations:
+        for task in finished.values():
+            seen.setdefault(id(task), task)
+    for task in simulation.available_tasks:
+        seen.setdefault(id(task), task)
+    for worker in simulation.workers.values():
+        for task in [worker.current_task] + worker.pending_failed_tasks:
+            if task is not None:
+                seen.setdefault(id(task), task)
+    return list(seen.values())
+
+
+def dumps(simulation: OfficeSimulation) -> bytes:
+    """Сериализовать состояние симуляции в байты"""
+    w = _Writer()
+    campus = simulation.campus
+    # Комнаты кампуса берутся у генератора: блоки, подгруженные за тик,
+    # попадают в список симуляции только в начале следующего
+    rooms = campus.rooms if campus is not None else simulation.rooms
+    workers = list(simulation.workers.values())
+    tasks = _collect_tasks(simulation)
+    room_index = {id(room): i for i, room in enumerate(rooms)}
+    worker_index = {id(worker): i for i, worker in enumerate(workers)}
+    task_index = {id(task): i for i, task in enumerate(tasks)}
+
+    # Часы, день и настройки
+    w.pack(
+        'qdqqqqB',
+        simulation.generator.seed,
+        simulation.time,
+        simulation.day,
+        simulation.ticks,
+        simulation.failed_task_count,
+        simulation.ids.next_id,
+        simulation.worker_state is not None,
+    )
+
+    # Настройки кампуса (число зданий 0 - выводится из сида)
+    w.pack('B', campus is not None)
+    if campus is not None:
+        options = campus.options
+        w.pack(
+            'qqq',
+            options['buildings'] or 0,
+            options['max_floors'],
+            options['max_chunks'],
+        )
+
+    # Генератор случайных чисел
+    version, internal, gauss = simulation.rng.getstate()
+    w.pack('B?d', version, gauss is not None, gauss or 0.0)
+    w.array('I', internal)
+
+    # Погода
+    weather = simulation.weather
+    w.pack(
+        'Bdd',
+        WEATHER_TYPES.index(weather.current_weather),
+        weather.last_update_time,
+        weather.update_interval,
+    )
+
+    # Комнаты
+    w.array('B', (ROOM_TYPES.index(r.room_type) for r in rooms))
+    w.array('i', (v for r in rooms for v in (r.x, r.y, r.width, r.height)))
+    w.array('q', (r.id for r in rooms))
+    w.array('I', (len(r.events) for r in rooms))
+    w.array('i', (w.string(e) for r in rooms for e in r.events))
+
+    # Кампус: загруженные и закрепленные блоки, заполнение рабочих мест
+    if campus is not None:
+        w.pack('qqqq', *campus.home_cursor, campus.generated, campus.evicted)
+        w.array('q', (campus.chunk_index(k) for k in campus.loaded_chunks))
+        w.array('q', (campus.chunk_index(k) for k in campus.pinned))
+        home_chunks = simulation.home_chunks
+        w.array('q', home_chunks)
+        w.array('q', (campus.chunk_index(k) for k in home_chunks.values()))
+
+    # Задания
+    w.array('q', (t.id for t in tasks))
+    w.array('i', (w.string(t.name) for t in tasks))
+    w.array('i', (w.string(t.description) for t in tasks))
+    w.array('i', (w.string(t.fail_event) for t in tasks))
+    w.array('i', (_encode_position(w, t.required_position) for t in tasks))
+    w.array('B', (TASK_STATUSES.index(t.status) for t in tasks))
+    w.array(
+        'd',
+        (v for t in tasks for v in (t.duration, t.success_rate, t.progress)),
+    )
+    w.array(
+        'i',
+        (
+            worker_index.get(id(t.assigned_to), -1)
+            if t.assigned_to is not None
+            else -1
+            for t in tasks
+        ),
+    )
+    w.array('i', (w.string(t.scenario_id) for t in tasks))
+    w.array('i', (w.string(t.scenario_task_id) for t in tasks))
+
+    # Хранилище заданий: живые, поколения завершенных и счетчики
+    store = simulation.tasks
+    generations = [({}, store.live_items())] + [
+        (day, finished.items()) for day, finished in store.generations
+    ]
+    w.pack('Iqq', len(store.generations), store.retention_days, store.created)
+    w.array('q', (store.finished[s] for s in store.finished_statuses))
+    w.array('q', (day for day, _ in store.generations))
+    for _, items in generations:
+        task_keys = list(items)
+        w.array('q', (key for key, _ in task_keys))
+        w.array('I', (task_index[id(task)] for _, task in task_keys))
+    w.array('I', (task_index[id(task)] for task in simulation.available_tasks))
+
+    # Работники
+    w.array('q', (wk.id for wk in workers))
+    w.array('i', (w.string(wk.name) for wk in workers))
+    w.array(
+        'B',
+        (
+            v
+            for wk in workers
+            for v in (
+                DEPARTMENTS.index(wk.department),
+                POSITIONS.index(wk.position),
+                PERSONALITIES.index(wk.personality),
+                bool(wk.is_at_office),
+            )
+        ),
+    )
+    w.array(
+        'd',
+        (
+            float(v)
+            for wk in workers
+            for v in (
+                wk.x,
+                wk.y,
+                wk.target_x,
+                wk.target_y,
+                wk.speed,
+                wk.mood,
+                wk.productivity,
+            )
+        ),
+    )
+    w.array(
+        'i',
+        (
+            room_index.get(id(wk.current_room), -1)
+            if wk.current_room is not None
+            else -1
+            for wk in workers
+        ),
+    )
+    w.array(
+        'i',
+        (
+            task_index[id(wk.current_task)] if wk.current_task else -1
+            for wk in workers
+        ),
+    )
+    w.array('I', (len(wk.pending_failed_tasks) for wk in workers))
+    w.array(
+        'I',
+        (task_index[id(t)] for wk in workers for t in wk.pending_failed_tasks),
+    )
+
+    # Статистика работников: счетчики и гистограммы по дням и названиям
+    stats = [wk.stats for wk in workers]
+    w.array('q', (v for st in stats for v in (st.completed, st.failed)))
+    w.array('I', (len(st.by_day) for st in stats))
+    w.array('q', (v for st in stats for entry in st.by_day for v in entry))
+    w.array('I', (len(st.by_task) for st in stats))
+    w.array('i', (w.string(name) for st in stats for name in st.by_task))
+    w.array(
+        'q',
+        (v for st in stats for counts in st.by_task.values() for v in counts),
+    )
+
+    # Таблица строк идет перед данными, чтобы читать ее первой
+    table = bytearray()
+    table += struct.pack('<I', len(w.strings))
+    for value in w.strings:
+        encoded = value.encode('utf-8')
+        table += struct.pack('<I', len(encoded)) + encoded
+
+    payload = zlib.compress(bytes(table + w.buffer), 1)
+    return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION) + payload
+
+
+def loads(data: bytes) -> OfficeSimulation:
+    """Восстановить симуляцию из байтов, полученных dumps"""
+    magic, version = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError('Данные не являются снимком WorkSpaceSim')
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f'Неподдерживаемая версия снимка: {version}')
+
+    r = _Reader(zlib.decompress(data[_HEADER.size :]))
+    (string_count,) = r.unpack('I')
+    for _ in range(string_count):
+        (length,) = r.unpack('I')
+        r.strings.append(
+            bytes(r.data[r.offset : r.offset + length]).decode('utf-8')
+        )
+        r.offset += length
+
+    seed, time, day, ticks, failed_task_count, next_id, vectorized = r.unpack(
+        'qdqqqqB'
+    )
+    (has_campus,) = r.unpack('B')
+    campus_options = None
+    if has_campus:
+        buildings, max_floors, max_chunks = r.unpack('qqq')
+        campus_options = {
+            'buildings': buildings or None,
+            'max_floors': max_floors,
+            'max_chunks': max_chunks,
+        }
+    simulation = OfficeSimulation({
+        'seed': seed,
+        'vectorized': bool(vectorized),
+        'campus': campus_options,
+    })
+    simulation.time = int(time) if time == int(time) else time
+    simulation.day = day
+    simulation.ticks = ticks
+    simulation.failed_task_count = failed_task_count
+
+    rng_version, has_gauss, gauss = r.unpack('B?d')
+    rng_internal = tuple(r.array('I'))
+
+    weather_type, last_update_time, update_interval = r.unpack('Bdd')
+    simulation.weather.current_weather = WEATHER_TYPES[weather_type]
+    simulation.weather.last_update_time = last_update_time
+    simulation.weather.update_interval = update_interval
+
+    # Комнаты
+    room_types = r.array('B')
+    geometry = r.array('i')
+    room_ids = r.array('q')
+    event_counts = r.array('I')
+    events = iter(r.array('i'))
+    rooms = []
+    for i, room_type in enumerate(room_types):
+        x, y, width, height = geometry[4 * i : 4 * i + 4]
+        room = Room(ROOM_TYPES[room_type], x, y, width, height)
+        room.id = room_ids[i]
+        room.events = [r.string(next(events)) for _ in range(event_counts[i])]
+        rooms.append(room)
+    simulation._set_rooms(rooms)
+
+    campus = simulation.campus
+    if campus is not None:
+        (
+            home_index,
+            home_seats,
+            campus.generated,
+            campus.evicted,
+        ) = r.unpack('qqqq')
+        campus.home_cursor = (home_index, home_seats)
+        campus.restore([campus.chunk_key(i) for i in r.array('q')], rooms)
+        campus.pinned = {campus.chunk_key(i) for i in r.array('q')}
+        home_workers = r.array('q')
+        simulation.home_chunks = {
+            worker_id: campus.chunk_key(index)
+            for worker_id, index in zip(home_workers, r.array('q'))
+        }
+
+    # Задания
+    task_ids = r.array('q')
+    names = r.array('i')
+    descriptions = r.array('i')
+    fail_events = r.array('i')
+    positions = r.array('i')
+    statuses = r.array('B')
+    numbers = r.array('d')
+    assigned = r.array('i')
+    scenario_ids = r.array('i')
+    scenario_task_ids = r.array('i')
+    tasks = []
+    for i in range(len(task_ids)):
+        duration, success_rate, progress = numbers[3 * i : 3 * i + 3]
+        task = Task(
+            r.string(names[i]),
+            r.string(descriptions[i]),
+            int(duration) if duration == int(duration) else duration,
+            success_rate,
+            required_position=_decode_position(r, positions[i]),
+            fail_event=r.string(fail_events[i]),
+            id=task_ids[i],
+        )
+        task.status = TASK_STATUSES[statuses[i]]
+        task.progress = int(progress) if progress == int(progress) else progress
+        task.scenario_id = r.string(scenario_ids[i])
+        task.scenario_task_id = r.string(scenario_task_ids[i])
+        tasks.append(task)
+
+    store = simulation.tasks
+    generation_count, store.retention_days, created = r.unpack('Iqq')
+    store.finished = dict(zip(store.finished_statuses, r.array('q')))
+    generation_days = r.array('q')
+    for generation in range(generation_count + 1):
+        key_ids = r.array('q')
+        key_tasks = r.array('I')
+        items = {
+            key: tasks[index] for key, index in zip(key_ids, key_tasks)
+        }
+        if generation == 0:
+            for key, task in items.items():
+                store.add(task, key)
+        else:
+            store.generations.append((generation_days[generation - 1], items))
+    store.created = created
+    for index in r.array('I'):
+        simulation.available_tasks.append(tasks[index])
+
+    # Работники
+    worker_ids = r.array('q')
+    worker_names = r.array('i')
+    enums = r.array('B')
+    floats = r.array('d')
+    current_rooms = r.array('i')
+    current_tasks = r.array('i')
+    pending_counts = r.array('I')
+    pending = iter(r.array('I'))
+    stat_counts = r.array('q')
+    day_counts = r.array('I')
+    day_entries = iter(r.array('q'))
+    name_counts = r.array('I')
+    task_names = iter(r.array('i'))
+    name_entries = iter(r.array('q'))
+
+    workers = []
+    for i in range(len(worker_ids)):
+        department, position, personality, at_office = enums[4 * i : 4 * i + 4]
+        worker = simulation._create_worker(
+            r.string(worker_names[i]),
+            DEPARTMENTS[department],
+            POSITIONS[position],
+        )
+        worker.id = worker_ids[i]
+        worker.personality = PERSONALITIES[personality]
+        worker.is_at_office = bool(at_office)
+        (
+            worker.x,
+            worker.y,
+            worker.target_x,
+            worker.target_y,
+            worker.speed,
+            worker.mood,
+            worker.productivity,
+        ) = floats[7 * i : 7 * i + 7]
+        if current_tasks[i] >= 0:
+            worker.current_task = tasks[current_tasks[i]]
+        worker.pending_failed_tasks = [
+            tasks[next(pending)] for _ in range(pending_counts[i])
+        ]
+        stats = worker.stats
+        stats.completed, stats.failed = stat_counts[2 * i : 2 * i + 2]
+        stats.by_day.clear()
+        for _ in range(day_counts[i]):
+            stats.by_day.append([next(day_entries) for _ in range(3)])
+        stats.by_task = {
+            r.string(next(task_names)): [next(name_entries), next(name_entries)]
+            for _ in range(name_counts[i])
+        }
+        if current_rooms[i] >= 0:
+            rooms[current_rooms[i]].add_occupant(worker)
+        simulation.workers[worker.id] = worker
+        workers.append(worker)
+
+    for task, worker_index in zip(tasks, assigned):
+        if worker_index >= 0:
+            task.assigned_to = workers[worker_index]
+
+    # Создание работников выше расходует ID, поэтому счетчик - в конце
+    simulation.ids.next_id = next_id
+
+    # Состояние генератора восстанавливается последним: создание объектов
+    # выше само тратит случайные числа
+    simulation.rng.setstate((
+        rng_version,
+        rng_internal,
+        gauss if has_gauss else None,
+    ))
+    return simulation
+
+
+def save_snapshot(simulation: OfficeSimulation, path: str) -> None:
+    """Сохранить снимок симуляции в файл"""
+    with open(path, 'wb') as f:
+        f.write(dumps(simulation))
+
+
+def load_snapshot(path: str) -> OfficeSimulation:
+    """Загрузить симуляцию из файла снимка"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
@@ -0,0 +1,304 @@
+"""
+Пространственные индексы для быстрого поиска комнат и работников по
+координатам.
+"""
+
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+
+# Размер ячейки равномерной сетки кандидатов (в единицах офиса)
+ROOM_INDEX_CELL_SIZE = 32
+
+# Максимальное число клеток растра комнат; для больших планировок
+# пакетный поиск идет через сетку кандидатов
+MAX_RASTER_CELLS = 16_000_000
+
+# Размер ячейки сетки работников (в единицах офиса)
+WORKER_GRID_CELL_SIZE = 16
+# Множитель упаковки номера ячейки по x в ключ сетки работников
+CELL_KEY_STRIDE = 1 << 32
+
+
+class RoomIndex:
+    """
+    Индекс комнат, построенный один раз для планировки.
+
+    Для поиска одной точки используется равномерная сетка, где каждая ячейка
+    хранит комнаты-кандидаты в исходном порядке. Для пакетного поиска по
+    массивам координат лениво строится растр с номером комнаты в каждой
+    клетке. Если точка попадает в несколько комнат, побеждает комната,
+    стоящая раньше в списке - как при линейном переборе. Готовую сетку
+    (ячейка -> номера комнат по порядку) можно передать в cells, например
+    из кэша планировок.
+    """
+
+    def __init__(
+        self,
+        rooms: Iterable,
+        cell_size: int = ROOM_INDEX_CELL_SIZE,
+        cells: Optional[dict[tuple[int, int], Iterable[int]]] = None,
+    ):
+        self.rooms = list(rooms)
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list] = {}
+        self._room_ids = {id(room): i for i, room in enumerate(self.rooms)}
+        self._raster: Optional[np.ndarray] = None
+        self._raster_origin = (0, 0)
+        # Растр не строится: планировка больше MAX_RASTER_CELLS
+        self._raster_too_large = False
+
+        if cells is not None:
+            rooms = self.rooms
+            self.cells = {
+                cell: [rooms[i] for i in ids] for cell, ids in cells.items()
+            }
+            return
+        for room in self.rooms:
+            for cell in self._cells_for_rect(
+                room.x, room.y, room.width, room.height
+            ):
+                self.cells.setdefault(cell, []).append(room)
+
+    def _cells_for_rect(self, x, y, width, height):
+        """Перечислить ячейки сетки, которые покрывает прямоугольник"""
+        cs = self.cell_size
+        x0 = int(x // cs)
+        y0 = int(y // cs)
+        x1 = int((x + width - 1) // cs)
+        y1 = int((y + height - 1) // cs)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield cx, cy
+
+    def find_room(self, x: float, y: float):
+        """Найти комнату, содержащую точку, или None"""
+        # Ключи-целые совпадают с результатом // для float (hash(1.0) == hash(1))
+        cs = self.cell_size
+        candidates = self.cells.get((x // cs, y // cs))
+        if candidates:
+            for room in candidates:
+                if room.contains_point(x, y):
+                    return room
+        return None
+
+    def find_room_ids(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Найти индексы комнат (в self.rooms) для массивов координат
+
+        Returns:
+            Массив индексов комнат, -1 для точек вне комнат
+        """
+        if not self.rooms:
+            return np.full(len(xs), -1, dtype=np.int32)
+
+        raster = self._get_raster()
+        if raster is None:
+            return np.array(
+                [
+                    self._room_ids[id(room)] if room is not None else -1
+                    for room in map(self.find_room, xs.tolist(), ys.tolist())
+                ],
+                dtype=np.int32,
+            )
+
+        origin_x, origin_y = self._raster_origin
+        height, width = raster.shape
+        cx = np.floor(xs).astype(np.int64) - origin_x
+        cy = np.floor(ys).astype(np.int64) - origin_y
+        inside = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+
+        result = np.full(len(xs), -1, dtype=np.int32)
+        result[inside] = raster[cy[inside], cx[inside]]
+        return result
+
+    def _get_raster(self) -> Optional[np.ndarray]:
+        """Построить (один раз) растр номеров комнат"""
+        if self._raster is not None or self._raster_too_large:
+            return self._raster
+
+        min_x = min(int(r.x) for r in self.rooms)
+        min_y = min(int(r.y) for r in self.rooms)
+        max_x = max(int(r.x + r.width) for r in self.rooms)
+        max_y = max(int(r.y + r.height) for r in self.rooms)
+        if (max_x - min_x) * (max_y - min_y) > MAX_RASTER_CELLS:
+            self._raster_too_large = True
+            return None
+
+        raster = np.full((max_y - min_y, max_x - min_x), -1, dtype=np.int32)
+        # Рисуем в обратном порядке, чтобы более ранние комнаты перекрывали
+        for room_id in range(len(self.rooms) - 1, -1, -1):
+            room = self.rooms[room_id]
+            x0 = int(room.x) - min_x
+            y0 = int(room.y) - min_y
+            raster[y0 : y0 + room.height, x0 : x0 + room.width] = room_id
+
+        self._raster = raster
+        self._raster_origin = (min_x, min_y)
+        return raster
+
+
+class WorkerGrid:
+    """
+    Равномерная сетка (пространственный хэш) работников в офисе.
+
+    В обычном движке сетка обновляется по ходу симуляции: Worker._move,
+    enter_office и leave_office сообщают ей о перемещениях через move() и
+    remove(). Для векторизованного движка и фоновой симуляции она целиком
+    перестраивается из массивов координат (rebuild) при первом запросе
+    после шага. Если запросу подходят несколько работников, побеждает
+    стоящий раньше в порядке работников - как при линейном переборе.
+    """
+
+    def __init__(self, cell_size: int = WORKER_GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        # Ячейка -> {работник: его координаты на момент учета}
+        self.cells: dict[tuple[int, int], dict[Any, tuple]] = {}
+        self._worker_cells: dict[Any, tuple[int, int]] = {}
+        self._order: dict[Any, int] = {}
+        # Отметка состояния, из которого сетка перестроена (для rebuild)
+        self.version: Any = None
+        # Отсортированные по ячейкам массивы после rebuild(): ключи ячеек,
+        # строки, x, y и список работников; None - обновляемый режим
+        self._arrays: Optional[tuple] = None
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        cs = self.cell_size
+        return int(x // cs), int(y // cs)
+
+    def track(self, workers: Iterable) -> None:
+        """Подключить работников: дальше они сами сообщают о перемещениях"""
+        for worker in workers:
+            self._order[worker] = len(self._order)
+            worker.grid = self
+            self._arrays = None
+            if worker.is_at_office:
+                self.move(worker)
+
+    def move(self, worker) -> None:
+        """Учесть новую позицию работника"""
+        x = worker.x
+        y = worker.y
+        cell = self._cell(x, y)
+        old = self._worker_cells.get(worker)
+        if old != cell:
+            if old is not None:
+                self._discard(worker, old)
+            self._worker_cells[worker] = cell
+        workers = self.cells.get(cell)
+        if workers is None:
+            workers = self.cells[cell] = {}
+        workers[worker] = (x, y)
+
+    def remove(self, worker) -> None:
+        """Убрать работника из сетки (ушел из офиса)"""
+        old = self._worker_cells.pop(worker, None)
+        if old is not None:
+            self._discard(worker, old)
+
+    def _discard(self, worker, cell: tuple[int, int]) -> None:
+        workers = self.cells[cell]
+        del workers[worker]
+        if not workers:
+            del self.cells[cell]
+
+    def rebuild(
+        self,
+        workers: list,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        present: np.ndarray,
+        version: Any = None,
+    ) -> None:
+        """
+        Перестроить сетку из массивов координат
+
+        Args:
+            workers: Работники в порядке строк массивов
+            xs, ys: Координаты
+            present: Маска работников в офисе
+            version: Отметка состояния (например, номер тика)
+        """
+        self.cells = {}
+        self._worker_cells = {}
+        self._order = {}
+        rows = np.flatnonzero(present)
+        row_x = xs[rows]
+        row_y = ys[rows]
+        keys = self._pack(
+            np.floor_divide(row_x, self.cell_size).astype(np.int64),
+            np.floor_divide(row_y, self.cell_size).astype(np.int64),
+        )
+        # Устойчивая сортировка сохраняет порядок работников внутри ячейки
+        order = np.argsort(keys, kind='stable')
+        self._arrays = (
+            keys[order],
+            rows[order],
+            row_x[order],
+            row_y[order],
+            workers,
+        )
+        self.version = version
+
+    @staticmethod
+    def _pack(cells_x, cells_y):
+        """Упаковать номера ячеек в один 64-битный ключ"""
+        return cells_x * CELL_KEY_STRIDE + (cells_y + CELL_KEY_STRIDE // 2)
+
+    def _candidates(
+        self, x0: float, y0: float, x1: float, y1: float
+    ) -> Iterator[tuple[int, Any, float, float]]:
+        """(порядок, работник, x, y) из ячеек, покрытых прямоугольником"""
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        if self._arrays is not None:
+            keys, rows, row_x, row_y, workers = self._arrays
+            for cx in range(cx0, cx1 + 1):
+                # Ячейки одного столбца лежат в keys подряд
+                lo = np.searchsorted(keys, self._pack(cx, cy0), 'left')
+                hi = np.searchsorted(keys, self._pack(cx, cy1), 'right')
+                for row, x, y in zip(
+                    rows[lo:hi].tolist(),
+                    row_x[lo:hi].tolist(),
+                    row_y[lo:hi].tolist(),
+                ):
+                    yield row, workers[row], x, y
+            return
+
+        order = self._order
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                workers = self.cells.get((cx, cy))
+                if workers:
+                    for worker, (x, y) in workers.items():
+                        yield order[worker], worker, x, y
+
+    def find(self, x: float, y: float, radius: float):
+        """Найти работника не дальше radius от точки или None"""
+        found = None
+        found_order = 0
+        radius_sq = radius * radius
+        for order, worker, worker_x, worker_y in self._candidates(
+            x - radius, y - radius, x + radius, y + radius
+        ):
+            dx = worker_x - x
+            dy = worker_y - y
+            if dx * dx + dy * dy <= radius_sq:
+                if found is None or order < found_order:
+                    found = worker
+                    found_order = order
+        return found
+
+    def find_in_rect(
+        self, x: float, y: float, width: float, height: float
+    ) -> list:
+        """Работники внутри прямоугольника в порядке работников"""
+        found = [
+            (order, worker)
+            for order, worker, worker_x, worker_y in self._candidates(
+                x, y, x + width, y + height
+            )
+            if x <= worker_x < x + width and y <= worker_y < y + height
+        ]
+        found.sort(key=lambda item: item[0])
+        return [worker for _, worker in found]
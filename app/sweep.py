@@ -0,0 +1,289 @@
+"""
+Многопроцессный перебор сидов (Монте-Карло) с агрегированной статистикой.
+
+Каждый прогон OfficeSimulation выполняется в отдельном процессе пула,
+сводки возвращаются по мере готовности и сразу сливаются в статистику
+распределений по каждому штатному составу.
+"""
+
+import argparse
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Iterable, Iterator, Optional
+
+from headless import run_headless
+from layout_cache import LAYOUT_CACHE
+from models import Position
+from scenario_loader import SCENARIO_CACHE, ScenarioLoader
+
+# Метрики прогона, по которым строятся распределения
+SWEEP_METRICS = ('completed', 'failed', 'avg_productivity', 'avg_mood')
+
+
+def simulate_run(
+    seed: int, worker_count: int, days: int, event_driven: bool = False
+) -> dict[str, Any]:
+    """
+    Выполнить один прогон и вернуть его сводку
+
+    Средняя продуктивность считается как число выполненных заданий на
+    работника за день: Worker.productivity обнуляется в конце каждого дня.
+    """
+    result = run_headless(
+        seed, days, worker_count, verbose=False, event_driven=event_driven
+    )
+    simulation = result['simulation']
+    workers = list(simulation.workers.values())
+    staff = [w for w in workers if w.position != Position.SECURITY]
+
+    completed = sum(d['completed'] for d in result['day_summaries'])
+    failed = sum(d['failed'] for d in result['day_summaries'])
+
+    fail_events: dict[str, int] = {}
+    for room in simulation.rooms:
+        if room.events:
+            key = room.room_type.value
+            fail_events[key] = fail_events.get(key, 0) + len(room.events)
+
+    return {
+        'seed': seed,
+        'worker_count': worker_count,
+        'days': days,
+        'completed': completed,
+        'failed': failed,
+        'avg_productivity': (
+            completed / (len(staff) * days) if staff and days else 0.0
+        ),
+        'avg_mood': (
+            sum(w.mood for w in workers) / len(workers) if workers else 0.0
+        ),
+        'fail_events': fail_events,
+    }
+
+
+def _init_worker_process(
+    scenario_snapshot: bytes, layout_dir: Optional[str] = None
+) -> None:
+    """
+    Заполнить кэш сценариев дочернего процесса из снимка родителя и
+    подключить общий каталог кэша планировок
+    """
+    SCENARIO_CACHE.loads(scenario_snapshot)
+    LAYOUT_CACHE.directory = layout_dir
+
+
+def _run_chunk(jobs: list[tuple[int, int, int, bool]]) -> list[dict[str, Any]]:
+    """Выполнить пачку прогонов в дочернем процессе"""
+    logging.disable(logging.WARNING)
+    return [simulate_run(*job) for job in jobs]
+
+
+class RunningStats:
+    """Потоковые среднее, дисперсия, минимум и максимум (алгоритм Уэлфорда)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'std': self.std,
+            'min': self.min,
+            'max': self.max,
+        }
+
+
+class SweepStatistics:
+    """Статистика перебора, сгруппированная по числу работников"""
+
+    def __init__(self):
+        self.metrics: dict[int, dict[str, RunningStats]] = {}
+        self.fail_events: dict[int, dict[str, RunningStats]] = {}
+        self.runs = 0
+
+    def add(self, summary: dict[str, Any]) -> None:
+        """Слить сводку одного прогона"""
+        self.runs += 1
+        worker_count = summary['worker_count']
+        metrics = self.metrics.setdefault(
+            worker_count, {name: RunningStats() for name in SWEEP_METRICS}
+        )
+        for name in SWEEP_METRICS:
+            metrics[name].add(summary[name])
+
+        events = self.fail_events.setdefault(worker_count, {})
+        # Комнаты без событий в этом прогоне дают ноль
+        for room_type in set(events) | set(summary['fail_events']):
+            stats = events.get(room_type)
+            if stats is None:
+                stats = events[room_type] = RunningStats()
+                # Ранее виденные прогоны этого состава событий не имели
+                for _ in range(metrics['completed'].count - 1):
+                    stats.add(0)
+            stats.add(summary['fail_events'].get(room_type, 0))
+
+    def as_dict(self) -> dict[int, dict[str, Any]]:
+        return {
+            worker_count: {
+                **{name: s.as_dict() for name, s in metrics.items()},
+                'fail_events': {
+                    room_type: s.as_dict()
+                    for room_type, s in self.fail_events[worker_count].items()
+                },
+            }
+            for worker_count, metrics in self.metrics.items()
+        }
+
+
+def iter_sweep(
+    seeds: Iterable[int],
+    worker_counts: Iterable[int],
+    days: int,
+    max_workers: Optional[int] = None,
+    chunksize: int = 4,
+    event_driven: bool = False,
+    layout_dir: Optional[str] = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Запустить перебор в пуле процессов и выдавать сводки по мере готовности
+
+    Args:
+        seeds: Сиды
+        worker_counts: Варианты числа работников
+        days: Количество дней в каждом прогоне
+        max_workers: Число процессов (по умолчанию - число ядер)
+        chunksize: Количество прогонов в одной задаче пула
+        event_driven: Использовать событийный режим
+        layout_dir: Каталог кэша планировок, общий для процессов: планировка
+            сида генерируется один раз для всех штатных составов
+    """
+    # Сиды перебираются для каждого числа работников, поэтому одноразовые
+    # итераторы (генераторы) нужно сохранить
+    seeds = list(seeds)
+    worker_counts = list(worker_counts)
+    jobs = [
+        (seed, worker_count, days, event_driven)
+        for worker_count in worker_counts
+        for seed in seeds
+    ]
+    chunks = [jobs[i : i + chunksize] for i in range(0, len(jobs), chunksize)]
+
+    # Разбираем сценарии один раз и передаем снимок кэша в дочерние процессы
+    ScenarioLoader().load_all_scenarios()
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker_process,
+        initargs=(SCENARIO_CACHE.dumps(), layout_dir),
+    ) as executor:
+        futures = [executor.submit(_run_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def run_sweep(
+    seeds: Iterable[int],
+    worker_counts: Iterable[int],
+    days: int,
+    max_workers: Optional[int] = None,
+    chunksize: int = 4,
+    event_driven: bool = False,
+    layout_dir: Optional[str] = None,
+) -> SweepStatistics:
+    """Выполнить перебор и вернуть агрегированную статистику"""
+    statistics = SweepStatistics()
+    for summary in iter_sweep(
+        seeds,
+        worker_counts,
+        days,
+        max_workers,
+        chunksize,
+        event_driven,
+        layout_dir,
+    ):
+        statistics.add(summary)
+    return statistics
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Точка входа командной строки"""
+    parser = argparse.ArgumentParser(
+        description='Перебор сидов WorkSpaceSim в нескольких процессах'
+    )
+    parser.add_argument(
+        '--seeds', default='1:101', help='Диапазон сидов НАЧАЛО:КОНЕЦ'
+    )
+    parser.add_argument(
+        '--workers',
+        default='10',
+        help='Числа работников через запятую, например 10,20,50',
+    )
+    parser.add_argument('--days', type=int, default=5, help='Дней в прогоне')
+    parser.add_argument(
+        '--jobs', type=int, default=os.cpu_count(), help='Число процессов'
+    )
+    parser.add_argument(
+        '--chunksize', type=int, default=4, help='Прогонов в задаче пула'
+    )
+    parser.add_argument(
+        '--events', action='store_true', help='Событийный режим'
+    )
+    parser.add_argument(
+        '--layout-cache',
+        default=None,
+        help='Каталог дискового кэша планировок офиса',
+    )
+    args = parser.parse_args(argv)
+
+    start, end = (int(part) for part in args.seeds.split(':'))
+    worker_counts = [int(part) for part in args.workers.split(',')]
+
+    statistics = SweepStatistics()
+    for summary in iter_sweep(
+        range(start, end),
+        worker_counts,
+        args.days,
+        args.jobs,
+        args.chunksize,
+        args.events,
+        args.layout_cache,
+    ):
+        statistics.add(summary)
+        print(
+            f'Сид {summary["seed"]}, работников {summary["worker_count"]}: '
+            f'выполнено {summary["completed"]}, провалено {summary["failed"]}'
+        )
+
+    for worker_count, result in statistics.as_dict().items():
+        print(f'\nРаботников: {worker_count}')
+        for name in SWEEP_METRICS:
+            s = result[name]
+            print(
+                f'  {name}: {s["mean"]:.2f} ± {s["std"]:.2f} '
+                f'[{s["min"]:.2f}; {s["max"]:.2f}]'
+            )
+        for room_type, s in result['fail_events'].items():
+            print(f'  События ({room_type}): {s["mean"]:.2f} ± {s["std"]:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Индексированный пул доступных заданий.
+"""
+
+import random
+from typing import Any, Iterator, Optional
+
+
+class TaskPool:
+    """
+    Пул доступных заданий, разбитый на корзины по требуемой должности.
+
+    Задания без требований лежат в корзине с ключом None. Выбор случайного
+    подходящего задания и удаление выполняются за O(1): позиция каждого
+    задания в корзине хранится отдельно, а удаление переставляет последний
+    элемент корзины на место удаленного.
+    """
+
+    def __init__(self, tasks=()):
+        self._buckets: dict[Any, list] = {}
+        self._slots: dict[int, tuple[Any, int]] = {}  # id(task) -> (ключ, индекс)
+        for task in tasks:
+            self.append(task)
+
+    def append(self, task) -> None:
+        """Добавить задание в пул (повторное добавление игнорируется)"""
+        if id(task) in self._slots:
+            return
+        key = task.required_position
+        bucket = self._buckets.setdefault(key, [])
+        self._slots[id(task)] = (key, len(bucket))
+        bucket.append(task)
+
+    def remove(self, task) -> None:
+        """Удалить задание из пула"""
+        key, index = self._slots.pop(id(task))
+        bucket = self._buckets[key]
+        last = bucket.pop()
+        if last is not task:
+            bucket[index] = last
+            self._slots[id(last)] = (key, index)
+
+    def pick(self, position, rng=random) -> Optional[Any]:
+        """
+        Выбрать случайное задание, доступное работнику с указанной должностью
+
+        Args:
+            position: Должность работника
+            rng: Источник случайных чисел
+
+        Returns:
+            Задание или None, если подходящих нет
+        """
+        unrestricted = self._buckets.get(None, ())
+        restricted = (
+            self._buckets.get(position, ()) if position is not None else ()
+        )
+        total = len(unrestricted) + len(restricted)
+        if total == 0:
+            return None
+
+        index = rng.randrange(total)
+        if index < len(restricted):
+            return restricted[index]
+        return unrestricted[index - len(restricted)]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __bool__(self) -> bool:
+        return bool(self._slots)
+
+    def __contains__(self, task) -> bool:
+        return id(task) in self._slots
+
+    def __iter__(self) -> Iterator:
+        for bucket in self._buckets.values():
+            yield from bucket
@@ -0,0 +1,107 @@
+"""
+Хранилище заданий симуляции с поколениями.
+
+Живые задания (ожидающие и выполняемые) лежат в словаре по ID. В конце
+каждого дня compact() переносит завершенные задания в поколение этого
+дня и учитывает их в сводных счетчиках; поколения старше срока хранения
+отбрасываются, поэтому память не растет с длиной прогона.
+"""
+
+from collections import deque
+from typing import Any, Iterable, Iterator, Optional
+
+# Сколько последних дней хранить завершенные задания (0 - не хранить)
+TASK_RETENTION_DAYS = 1
+
+
+class TaskStore:
+    """
+    Задания симуляции: живые по ID и завершенные по поколениям (дням).
+
+    Поиск по ID работает для живых заданий и для завершенных, которые
+    еще не вытеснены политикой хранения.
+    """
+
+    def __init__(
+        self,
+        finished_statuses: Iterable[Any],
+        retention_days: int = TASK_RETENTION_DAYS,
+    ):
+        """
+        Args:
+            finished_statuses: Статусы завершенных заданий
+            retention_days: Сколько дней хранить завершенные задания
+        """
+        self.finished_statuses = tuple(finished_statuses)
+        self.retention_days = retention_days
+        self._live: dict[Any, Any] = {}
+        # Поколения завершенных заданий: (день, {ID: задание})
+        self.generations: deque[tuple[int, dict[Any, Any]]] = deque()
+        # Сводные счетчики: всего создано и завершено по статусам
+        self.created = 0
+        self.finished: dict[Any, int] = {
+            status: 0 for status in self.finished_statuses
+        }
+
+    def add(self, task, key: Any = None) -> None:
+        """Добавить новое задание (по умолчанию под его собственным ID)"""
+        self._live[task.id if key is None else key] = task
+        self.created += 1
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Найти задание по ID среди живых и хранимых завершенных"""
+        task = self._live.get(key)
+        if task is None:
+            for _, finished in reversed(self.generations):
+                task = finished.get(key)
+                if task is not None:
+                    break
+        return task
+
+    def __getitem__(self, key: Any):
+        task = self.get(key)
+        if task is None:
+            raise KeyError(key)
+        return task
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        """Количество живых заданий"""
+        return len(self._live)
+
+    def __iter__(self) -> Iterator[Any]:
+        """ID живых заданий"""
+        return iter(self._live)
+
+    def live_items(self) -> Iterator[tuple[Any, Any]]:
+        """Пары (ID, задание) живых заданий"""
+        return iter(self._live.items())
+
+    def compact(self, day: int) -> int:
+        """
+        Перенести завершенные задания в поколение дня и вытеснить старые
+
+        Args:
+            day: День, которым помечается новое поколение
+
+        Returns:
+            Количество перенесенных заданий
+        """
+        finished = {
+            key: task
+            for key, task in self._live.items()
+            if task.status in self.finished_statuses
+        }
+        for key, task in finished.items():
+            del self._live[key]
+            self.finished[task.status] += 1
+
+        if finished and self.retention_days > 0:
+            self.generations.append((day, finished))
+        while self.generations and (
+            self.generations[0][0] <= day - self.retention_days
+        ):
+            self.generations.popleft()
+        return len(finished)
@@ -0,0 +1,131 @@
+"""
+Реестр шаблонов заданий.
+
+Объединяет встроенные шаблоны симуляции и JSON-файлы из data/tasks.
+Директория читается целиком один раз, дальше шаблоны выдаются из памяти;
+изменения файлов подхватываются по времени изменения не чаще, чем раз
+в refresh_interval секунд.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Iterable, Optional
+
+# Как часто (в секундах) проверять директорию шаблонов на изменения
+TEMPLATE_REFRESH_INTERVAL = 1.0
+
+
+def template_id_from_name(name: str) -> str:
+    """Получить ID шаблона из названия задания: 'Coffee break' -> 'coffee_break'"""
+    return re.sub(r'\W+', '_', name.strip().lower()).strip('_')
+
+
+class TaskTemplateStore:
+    """
+    Хранилище шаблонов заданий с кэшированием в памяти.
+
+    Шаблоны из файлов переопределяют встроенные шаблоны с тем же ID.
+    Возвращаемые словари общие для всех вызовов и не должны изменяться.
+    """
+
+    def __init__(
+        self,
+        templates_dir: str = 'data/tasks',
+        builtin_templates: Iterable[dict[str, Any]] = (),
+        refresh_interval: float = TEMPLATE_REFRESH_INTERVAL,
+    ):
+        """
+        Args:
+            templates_dir: Директория с JSON-файлами шаблонов
+            builtin_templates: Встроенные шаблоны (ID берется из названия)
+            refresh_interval: Минимальный интервал между проверками директории
+        """
+        self.templates_dir = templates_dir
+        self.refresh_interval = refresh_interval
+        self.builtin: list[dict[str, Any]] = list(builtin_templates)
+        self._builtin_by_id = {
+            template_id_from_name(t['name']): t for t in self.builtin
+        }
+        # Имя файла -> (mtime_ns, размер, ID, шаблон)
+        self._files: dict[
+            str, tuple[int, int, str, Optional[dict[str, Any]]]
+        ] = {}
+        self._templates: dict[str, dict[str, Any]] = dict(self._builtin_by_id)
+        self._last_refresh: Optional[float] = None
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, template_id: str) -> Optional[dict[str, Any]]:
+        """
+        Получает шаблон по ID
+
+        Args:
+            template_id: ID шаблона (имя файла без расширения
+                или ID встроенного шаблона)
+
+        Returns:
+            Данные шаблона или None, если шаблон не найден
+        """
+        self.refresh()
+        return self._templates.get(template_id)
+
+    def refresh(self, force: bool = False) -> None:
+        """Перечитать измененные файлы, если пора проверить директорию"""
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_refresh is not None
+            and now - self._last_refresh < self.refresh_interval
+        ):
+            return
+        self._last_refresh = now
+
+        if not os.path.isdir(self.templates_dir):
+            if self._files:
+                self._files = {}
+                self._templates = dict(self._builtin_by_id)
+            return
+
+        files = {}
+        changed = False
+        with os.scandir(self.templates_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json') or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                cached = self._files.get(entry.name)
+                if (
+                    cached is not None
+                    and cached[0] == stat.st_mtime_ns
+                    and cached[1] == stat.st_size
+                ):
+                    files[entry.name] = cached
+                    continue
+
+                changed = True
+                try:
+                    with open(entry.path, 'r', encoding='utf-8') as f:
+                        template = json.load(f)
+                except Exception as e:
+                    self.logger.error(
+                        f'Ошибка при загрузке шаблона {entry.path}: {str(e)}'
+                    )
+                    # Запоминаем сбой, чтобы не разбирать файл заново,
+                    # пока он не изменится
+                    template = None
+                template_id = os.path.splitext(entry.name)[0]
+                files[entry.name] = (
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    template_id,
+                    template,
+                )
+
+        if changed or files.keys() != self._files.keys():
+            self._files = files
+            self._templates = dict(self._builtin_by_id)
+            for _, _, template_id, template in files.values():
+                if template is not None:
+                    self._templates[template_id] = template
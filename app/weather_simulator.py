@@ -21,15 +21,18 @@ class WeatherSimulator:
     текущего дня и предыдущих погодных условий.
     """
 
-    def __init__(self, seed: Optional[int] = None):
+    def __init__(
+        self, seed: Optional[int] = None, rng: Optional[random.Random] = None
+    ):
         """
         Инициализация симулятора погоды
 
         Args:
             seed: Seed для генератора случайных чисел (опционально)
+            rng: Генератор случайных чисел симуляции; если не указан,
+                создается собственный из seed
         """
-        if seed is not None:
-            random.seed(seed)
+        self.rng = rng if rng is not None else random.Random(seed)
 
         self.current_weather = WeatherType.SUNNY
         self.update_interval = 60  # интервал обновления погоды в минутах
@@ -87,7 +90,7 @@ class WeatherSimulator:
         probabilities = self.season_probabilities[current_season]
 
         # Генерация случайного числа
-        r = random.random()
+        r = self.rng.random()
 
         # Определение новой погоды на основе вероятностей
         cumulative_prob = 0
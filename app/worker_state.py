@@ -0,0 +1,163 @@
+"""
+Векторизованный движок состояния работников.
+
+Координаты, цели, скорость, настроение и продуктивность всех работников
+хранятся в столбцах NumPy, которыми владеет OfficeSimulation. Перемещение,
+привязка к цели при прибытии и ограничение настроения выполняются одной
+пакетной операцией за тик, а объекты ArrayWorker остаются тонкими
+представлениями строк для интерфейса.
+"""
+
+import random
+from typing import Optional
+
+import numpy as np
+
+from models import Department, Position, Worker
+
+# Начальная емкость столбцов (удваивается при заполнении)
+INITIAL_CAPACITY = 64
+
+
+class WorkerStateArrays:
+    """Состояние работников в виде набора столбцов (structure of arrays)"""
+
+    FLOAT_COLUMNS = (
+        'x',
+        'y',
+        'target_x',
+        'target_y',
+        'speed',
+        'mood',
+        'productivity',
+    )
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.size = 0
+        self.workers: list['ArrayWorker'] = []  # работник каждой строки
+        self.capacity = capacity
+        for column in self.FLOAT_COLUMNS:
+            setattr(self, column, np.zeros(capacity, dtype=np.float64))
+        self.is_at_office = np.zeros(capacity, dtype=bool)
+
+    def allocate(self) -> int:
+        """Выделить строку для нового работника и вернуть ее индекс"""
+        if self.size == self.capacity:
+            self._grow(self.capacity * 2)
+        index = self.size
+        self.size += 1
+        return index
+
+    def _grow(self, capacity: int) -> None:
+        """Увеличить емкость всех столбцов"""
+        for column in self.FLOAT_COLUMNS + ('is_at_office',):
+            old = getattr(self, column)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, column, new)
+        self.capacity = capacity
+
+    def create_worker(
+        self,
+        name: str,
+        department: Department,
+        position: Position,
+        rng: Optional[random.Random] = None,
+        id: Optional[int] = None,
+    ) -> 'ArrayWorker':
+        """Создать работника, чье состояние хранится в этих столбцах"""
+        worker = ArrayWorker(self, name, department, position, rng, id)
+        self.workers.append(worker)
+        return worker
+
+    def step(self, elapsed_time: int) -> None:
+        """Переместить всех работников в офисе и ограничить настроение"""
+        n = self.size
+        if n == 0:
+            return
+
+        x = self.x[:n]
+        y = self.y[:n]
+        target_x = self.target_x[:n]
+        target_y = self.target_y[:n]
+        active = self.is_at_office[:n]
+
+        dx = target_x - x
+        dy = target_y - y
+        distance = np.sqrt(dx * dx + dy * dy)
+
+        # Достаточно близко к цели - привязываем к ней
+        arrived = active & (distance < 1)
+        x[arrived] = target_x[arrived]
+        y[arrived] = target_y[arrived]
+
+        # Остальные двигаются в сторону цели со своей скоростью
+        moving = active & (distance >= 1)
+        move_distance = np.minimum(
+            distance, self.speed[:n] * elapsed_time / 60
+        )
+        scale = np.zeros(n)
+        np.divide(move_distance, distance, out=scale, where=moving)
+        x += dx * scale
+        y += dy * scale
+
+        np.clip(self.mood[:n], 0.0, 1.0, out=self.mood[:n])
+
+
+def _column_property(column: str) -> property:
+    """Свойство, читающее и пишущее значение работника в столбец"""
+
+    def getter(self):
+        return getattr(self._state, column)[self._index]
+
+    def setter(self, value):
+        getattr(self._state, column)[self._index] = value
+
+    return property(getter, setter)
+
+
+class ArrayWorker(Worker):
+    """Работник, чье изменяемое состояние хранится в WorkerStateArrays"""
+
+    __slots__ = ('_state', '_index')
+
+    x = _column_property('x')
+    y = _column_property('y')
+    target_x = _column_property('target_x')
+    target_y = _column_property('target_y')
+    speed = _column_property('speed')
+    mood = _column_property('mood')
+    productivity = _column_property('productivity')
+
+    def __init__(
+        self,
+        state: WorkerStateArrays,
+        name: str,
+        department: Department,
+        position: Position,
+        rng: Optional[random.Random] = None,
+        id: Optional[int] = None,
+    ):
+        # Строка в столбцах должна существовать до инициализации атрибутов
+        self._state = state
+        self._index = state.allocate()
+        super().__init__(name, department, position, rng, id)
+
+    @property
+    def is_at_office(self) -> bool:
+        return bool(self._state.is_at_office[self._index])
+
+    @is_at_office.setter
+    def is_at_office(self, value: bool) -> None:
+        self._state.is_at_office[self._index] = value
+
+    def update(self, elapsed_time: int) -> None:
+        """Обновить задание; перемещение выполняется пакетно в step"""
+        if not self.is_at_office:
+            return
+
+        self._update_task(elapsed_time)
+
+    def _change_mood(self, delta: float) -> None:
+        """Изменить настроение; ограничение выполняется пакетно в step"""
+        self.mood += delta
@@ -0,0 +1,140 @@
+"""
+Статистика работников ограниченного размера.
+
+Вместо списков всех выполненных и проваленных заданий работник хранит
+счетчики и скользящие гистограммы: по последним дням и по названиям
+заданий. Память на работника не растет с длиной прогона. Полная история
+при необходимости дописывается в архив на диске (TaskHistoryArchive).
+"""
+
+import csv
+from collections import deque
+from typing import Any, Iterator, Optional
+
+# Сколько последних дней хранится в дневной гистограмме
+WORKER_HISTORY_DAYS = 30
+# Сколько разных названий заданий учитывается отдельно
+MAX_TASK_NAMES = 64
+# Корзина для названий сверх MAX_TASK_NAMES
+OTHER_TASKS = '*'
+
+# Размер буфера записи архива (байт)
+ARCHIVE_BUFFER_SIZE = 64 * 1024
+ARCHIVE_FIELDS = ('day', 'time', 'worker_id', 'task_id', 'task', 'status')
+
+
+class WorkerStats:
+    """
+    Счетчики и скользящие гистограммы заданий одного работника.
+
+    Дневная гистограмма - очередь [день, выполнено, провалено] длиной не
+    больше history_days; гистограмма по названиям - словарь
+    название -> [выполнено, провалено] не больше чем на max_task_names
+    названий, остальные попадают в корзину OTHER_TASKS.
+    """
+
+    __slots__ = ('completed', 'failed', 'max_task_names', 'by_day', 'by_task')
+
+    def __init__(
+        self,
+        day: int = 1,
+        history_days: int = WORKER_HISTORY_DAYS,
+        max_task_names: int = MAX_TASK_NAMES,
+    ):
+        self.completed = 0
+        self.failed = 0
+        self.max_task_names = max_task_names
+        self.by_day: deque[list[int]] = deque(
+            [[day, 0, 0]], maxlen=history_days
+        )
+        self.by_task: dict[str, list[int]] = {}
+
+    @property
+    def day(self) -> int:
+        """Текущий день статистики"""
+        return self.by_day[-1][0]
+
+    @property
+    def total(self) -> int:
+        """Всего завершенных заданий (выполненных и проваленных)"""
+        return self.completed + self.failed
+
+    @property
+    def success_ratio(self) -> float:
+        """Доля выполненных заданий среди завершенных"""
+        return self.completed / self.total if self.total else 0.0
+
+    def start_day(self, day: int) -> None:
+        """Открыть корзину нового дня (самый старый день вытесняется)"""
+        if day != self.day:
+            self.by_day.append([day, 0, 0])
+
+    def record(self, task_name: str, success: bool) -> None:
+        """Учесть завершенное задание"""
+        column = 1 if success else 2
+        if success:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.by_day[-1][column] += 1
+
+        counts = self.by_task.get(task_name)
+        if counts is None:
+            if len(self.by_task) >= self.max_task_names:
+                task_name = OTHER_TASKS
+            counts = self.by_task.setdefault(task_name, [0, 0])
+        counts[column - 1] += 1
+
+    def day_counts(self, day: int) -> tuple[int, int]:
+        """(выполнено, провалено) за день, если он еще в гистограмме"""
+        for entry_day, completed, failed in self.by_day:
+            if entry_day == day:
+                return completed, failed
+        return 0, 0
+
+
+class TaskHistoryArchive:
+    """
+    Полная история заданий в файле на диске.
+
+    Записи только дописываются в файл с разделителями-табуляциями
+    (поля ARCHIVE_FIELDS) через буфер, память не накапливается.
+    """
+
+    def __init__(self, path: str, buffer_size: int = ARCHIVE_BUFFER_SIZE):
+        self.path = path
+        self._file = open(
+            path, 'a', encoding='utf-8', newline='', buffering=buffer_size
+        )
+        self._writer = csv.writer(self._file, delimiter='\t')
+        if self._file.tell() == 0:
+            self._writer.writerow(ARCHIVE_FIELDS)
+
+    def append(self, day: int, time: float, worker, task) -> None:
+        """Дописать завершенное задание работника"""
+        self._writer.writerow(
+            (day, time, worker.id, task.id, task.name, task.status.name)
+        )
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> 'TaskHistoryArchive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_task_history(
+    path: str, worker_id: Optional[int] = None
+) -> Iterator[dict[str, Any]]:
+    """Прочитать архив истории (при указании worker_id - одного работника)"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f, delimiter='\t'):
+            if worker_id is None or row['worker_id'] == str(worker_id):
+                yield row
@@ -16,12 +16,19 @@ if __name__ == "__main__":
     from app.constants import BASE_SIMULATION_SPEED, SPEED_MULTIPLIER_1
     from app.main import WorkSpaceSimApp
 
+    # Флаг --background запускает симуляцию в отдельном процессе,
+    # флаг --campus генерирует кампус из многих зданий
+    flags = {"--background", "--campus"}
+    args = [arg for arg in sys.argv[1:] if arg not in flags]
+    background = "--background" in sys.argv[1:]
+    campus = "--campus" in sys.argv[1:]
+
     # Вы можете указать конкретный сид как аргумент командной строки
-    if len(sys.argv) > 1:
+    if args:
         try:
-            seed = int(sys.argv[1])
+            seed = int(args[0])
         except ValueError:
-            print(f"Некорректное значение сида: {sys.argv[1]}")
+            print(f"Некорректное значение сида: {args[0]}")
             print("Используется случайный сид вместо указанного")
             seed = random.randint(1, 1000000)
     else:
@@ -32,5 +39,11 @@ if __name__ == "__main__":
     print(f"Начальный множитель скорости: ×{SPEED_MULTIPLIER_1}")
     print(f"Используйте клавиши 1, 2, 3 для изменения скорости симуляции")
 
-    app = WorkSpaceSimApp(seed)
+    if background:
+        print("Симуляция считается в фоновом процессе")
+
+    if campus:
+        print("Кампус: блоки комнат генерируются по мере прокрутки вида")
+
+    app = WorkSpaceSimApp(seed, background=background, campus=campus)
     app.run()
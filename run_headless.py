@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Запуск WorkSpaceSim без графического интерфейса
+Пример: python run_headless.py --seed 42 --days 30 --workers 50
+"""
+
+import os
+import sys
+
+# Добавляем директорию app в путь
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+if __name__ == "__main__":
+    from app.headless import main
+
+    main()
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Многопроцессный перебор сидов WorkSpaceSim
+Пример: python run_sweep.py --seeds 1:1001 --workers 10,20,50 --days 5
+"""
+
+import os
+import sys
+
+# Добавляем директорию app в путь
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+if __name__ == "__main__":
+    from app.sweep import main
+
+    main()
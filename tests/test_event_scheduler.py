@@ -0,0 +1,86 @@
+"""
+Событийный режим против тикового на одних и тех же заданиях.
+
+Запуск: python -m unittest discover tests
+"""
+
+import logging
+import os
+import sys
+import unittest
+
+# Добавляем директорию app в путь
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'app'))
+
+from event_scheduler import EventDrivenSimulation
+from models import OfficeSimulation, Position, TaskStatus
+
+# Задание сценария с несколькими исполнителями
+SHARED_TASK = {'name': 'Общий созвон', 'duration': 30}
+
+
+def run_shared_task(event_driven: bool, seed: int = 1) -> tuple:
+    """
+    Выдать общее задание трем работникам и прогнать день до конца
+
+    Returns:
+        (учтен ли итог задания у каждого исполнителя, свободен ли каждый
+        исполнитель после задания, вернулось ли задание в пул к концу дня)
+    """
+    simulation = OfficeSimulation(seed)
+    simulation.initialize(worker_count=4)
+    # Пустой пул: исполнители заняты только общим заданием
+    for task in list(simulation.available_tasks):
+        simulation.available_tasks.remove(task)
+    assignees = [
+        w
+        for w in simulation.workers.values()
+        if w.position != Position.SECURITY
+    ][:3]
+    simulation._create_task_from_scenario(
+        {**SHARED_TASK, 'assignees': [w.id for w in assignees]}, 'test'
+    )
+    task = assignees[0].current_task
+
+    engine = None
+    if event_driven:
+        engine = EventDrivenSimulation(
+            simulation, scenario_check_probability=0
+        )
+        engine.run_until(engine.now + task.duration + 1)
+    else:
+        for _ in range(task.duration + 1):
+            simulation.step(1)
+
+    expected = [1, 0] if task.status == TaskStatus.COMPLETED else [0, 1]
+    credited = [w.stats.by_task.get(task.name) == expected for w in assignees]
+    freed = [w.current_task is not task for w in assignees]
+
+    if engine is not None:
+        engine.run_days(1)
+    else:
+        day = simulation.day
+        while simulation.day == day:
+            simulation.step(1)
+    return credited, freed, task in simulation.available_tasks
+
+
+class SharedTaskTest(unittest.TestCase):
+    """Задание с несколькими исполнителями"""
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.WARNING)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_event_mode_matches_tick_mode(self):
+        ticks = run_shared_task(event_driven=False)
+        self.assertEqual(ticks, ([True] * 3, [True] * 3, False))
+        self.assertEqual(run_shared_task(event_driven=True), ticks)
+
+
+if __name__ == '__main__':
+    unittest.main()